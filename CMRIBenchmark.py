@@ -0,0 +1,291 @@
+# Software configuration
+from library import config as sw_cfg
+# Simulated CMRI bus
+from library.bus.simulator import SimulatedBus
+# Live-address index
+from library.bus.discovery import set_live
+# Device table and polling thread
+from library.polling.table import build_table
+from library.polling.poller import BusPoller, Reading
+from library.polling.presence import PresenceTracker
+# Instrumentation of the polling
+from library.polling.metrics import PollMetrics
+
+# System-specific parameters and functions
+import sys
+import platform
+# The GUI benchmarks run without the display
+from os import environ
+# Command line arguments
+from argparse import ArgumentParser
+# Results in JSON
+from json import dump, dumps, load
+# Queue of the readings published by the polling thread
+from collections import deque
+# Measuring
+from time import perf_counter, sleep, time
+
+# Seat numbers of the polling benchmark
+SEATS = (16, 64, 256, 1024)
+# Seats per stand of the simulated configuration
+STAND_SEATS = 16
+
+
+def bench_polling(seats, duration, metrics=False):
+    """
+    Measuring the polling thread against the simulated bus without the latency
+
+    Args:
+        :param seats: The number of seats
+        :type seats: int
+        :param duration: Duration of the measuring, s
+        :type duration: float
+        :param metrics: Measuring with the polling instrumentation
+        :type metrics: bool
+
+    Returns:
+        :return: {"seats", "metrics", "cycles_per_s", "reads_per_s", "us_per_read"}
+        :rtype: dict
+    """
+
+    bus = SimulatedBus(size=seats, seed=1)
+    git_config = sw_cfg.get_git_config(SimulatedBus.stand_config(-(-seats // STAND_SEATS), STAND_SEATS))
+    stands = git_config.sections()
+    devices = build_table(stands, git_config, {stand: "SIM1" for stand in stands})[:seats]
+    # All seats are known to be live, the discovery pass is not measured
+    live_index = dict()
+    for stand in stands:
+        set_live(live_index, "SIM1", stand, [device.address for device in devices if device.stand == stand])
+
+    readings = deque()
+    poller = BusPoller(bus, "SIM1", devices, PresenceTracker(), live_index, [readings.append],
+                       metrics=PollMetrics() if metrics else None)
+    start = perf_counter()
+    poller.start()
+    sleep(duration)
+    poller.do_run = False
+    poller.join()
+    elapsed = perf_counter() - start
+    reads = len(readings)
+    return {"seats": seats, "metrics": metrics, "cycles_per_s": reads / seats / elapsed,
+            "reads_per_s": reads / elapsed, "us_per_read": elapsed / reads * 1e6 if reads else None}
+
+
+def frame_summary(durations):
+    """
+    Getting the summary of the frame durations
+
+    Args:
+        :param durations: Duration of every frame, s
+        :type durations: list
+
+    Returns:
+        :return: {"frames", "ms_per_frame", "p95_ms", "frames_per_s"}
+        :rtype: dict
+    """
+
+    durations = sorted(durations)
+    mean = sum(durations) / len(durations)
+    return {"frames": len(durations), "ms_per_frame": mean * 1000,
+            "p95_ms": durations[int(len(durations) * 0.95) - 1] * 1000, "frames_per_s": 1 / mean}
+
+
+def bench_display(app, stand_qty, frames):
+    """
+    Measuring the stand display update with every device updated in every frame
+
+    The "changing" frames alternate the normal and the fault readings of all devices,
+    the "steady" frames repeat the same readings.
+
+    Args:
+        :param app: Application of the offscreen platform
+        :type app: QApplication
+        :param stand_qty: The number of stands
+        :type stand_qty: int
+        :param frames: The number of frames of every mode
+        :type frames: int
+
+    Returns:
+        :return: Summary of the frames of every mode
+        :rtype: dict
+    """
+
+    from library.stand.StandUI import StandUI
+
+    # Connected stands without the polling threads and the telemetry log
+    sw_cfg.git_config = sw_cfg.get_git_config(SimulatedBus.stand_config(stand_qty, STAND_SEATS))
+    sw_cfg.stand_list = sw_cfg.git_config.sections()
+    sw_cfg.stand_ports = {stand: "SIM1" for stand in sw_cfg.stand_list}
+    sw_cfg.bus_list = dict()
+    sw_cfg.polling_threads = dict()
+    sw_cfg.device_table = build_table(sw_cfg.stand_list, sw_cfg.git_config, sw_cfg.stand_ports)
+    widget = StandUI()
+    widget.frame_timer.stop()
+    widget.resize(891, 480)
+    widget.show()
+    app.processEvents()
+
+    normal = [Reading(device.index, True, 0, (57.7, 57.7, 57.7), (1.0, 1.0, 1.0), 25.0, 0.0)
+              for device in sw_cfg.device_table]
+    fault = [Reading(device.index, True, 7, (0.0, 70.0, 57.7), (0.0, 1.5, 1.0), 80.0, 0.0)
+             for device in sw_cfg.device_table]
+    results = dict()
+    for mode in ("changing", "steady"):
+        durations = list()
+        for frame in range(frames):
+            batch = fault if mode == "changing" and frame % 2 else normal
+            start = perf_counter()
+            widget.readings.extend(batch)
+            widget.apply_readings()
+            widget.repaint()
+            app.processEvents()
+            durations.append(perf_counter() - start)
+        results[mode] = frame_summary(durations)
+    results["devices"] = len(sw_cfg.device_table)
+    widget.close()
+    widget.deleteLater()
+    app.processEvents()
+    return results
+
+
+def bench_led(paints):
+    """
+    Measuring the seat cell painting of the stand display into the pixmap
+
+    Args:
+        :param paints: The number of paints of every LED state
+        :type paints: int
+
+    Returns:
+        :return: Duration of one paint of every LED state, us
+        :rtype: dict
+    """
+
+    from library.stand.delegate import LedDelegate, CELL_SIZE
+    from library.stand.model import LEDS_ROLE
+    from PyQt5.QtGui import QColor, QPixmap, QPainter, QStandardItemModel, QStandardItem
+    from PyQt5.QtCore import QRect
+    from PyQt5.QtWidgets import QStyleOptionViewItem, QStyle
+
+    delegate = LedDelegate()
+    model = QStandardItemModel(1, 1)
+    item = QStandardItem("1 - 1")
+    model.setItem(0, 0, item)
+    option = QStyleOptionViewItem()
+    option.rect = QRect(0, 0, CELL_SIZE.width(), CELL_SIZE.height())
+    option.state = QStyle.State_Enabled
+    pixmap = QPixmap(CELL_SIZE)
+    painter = QPainter(pixmap)
+    results = dict()
+    for name, color, state in (("green", "green", True), ("red", "red", True), ("off", "orange", False)):
+        item.setData([(QColor(color), state)] * 3, LEDS_ROLE)
+        index = model.index(0, 0)
+        start = perf_counter()
+        for _ in range(paints):
+            delegate.paint(painter, option, index)
+        results[name] = (perf_counter() - start) / paints * 1e6
+    painter.end()
+    return {"us_per_paint": results, "paints": paints}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Comparing the results with the baseline results
+
+    Args:
+        :param results: Current results
+        :type results: dict
+        :param baseline: Baseline results
+        :type baseline: dict
+        :param tolerance: Allowed slowdown fraction, e.g. 0.2
+        :type tolerance: float
+
+    Returns:
+        :return: Descriptions of the regressions
+        :rtype: list
+    """
+
+    # (name, value, higher is better) of every compared figure
+    def figures(data):
+        for item in data.get("polling", []):
+            yield "polling {0} seats{1}".format(item["seats"], " metrics" if item["metrics"] else ""), \
+                item["cycles_per_s"], True
+        for mode, item in data.get("display", {}).items():
+            if isinstance(item, dict):
+                yield "display {0}".format(mode), item["ms_per_frame"], False
+        for name, value in data.get("led", {}).get("us_per_paint", {}).items():
+            yield "led {0}".format(name), value, False
+
+    previous = {name: value for name, value, higher in figures(baseline)}
+    regressions = list()
+    for name, value, higher in figures(results):
+        if name not in previous or not previous[name]:
+            continue
+        change = value / previous[name] - 1
+        if (change < -tolerance) if higher else (change > tolerance):
+            regressions.append("{0}: {1:.4g} -> {2:.4g} ({3:+.1%})".format(name, previous[name], value, change))
+    return regressions
+
+
+def main(argv):
+    """
+    Running the benchmarks and writing the results
+
+    Args:
+        :param argv: Command line arguments
+        :type argv: list
+
+    Returns:
+        :return: Exit status, 1 if the results regressed against the baseline
+    """
+
+    parser = ArgumentParser(description="Benchmarks of the polling, the stand display update and the LED rendering")
+    parser.add_argument("--seats", type=int, nargs="+", default=list(SEATS), help="seat numbers of the polling")
+    parser.add_argument("--duration", type=float, default=2.0, help="duration of every polling benchmark, s")
+    parser.add_argument("--frames", type=int, default=200, help="frames of every display benchmark mode")
+    parser.add_argument("--stands", type=int, default=4, help="stands of the display benchmark")
+    parser.add_argument("--paints", type=int, default=2000, help="paints of every LED state")
+    parser.add_argument("--no-gui", action="store_true", help="skipping the display and LED benchmarks")
+    parser.add_argument("--output", default="", help="JSON file of the results, the standard output by default")
+    parser.add_argument("--baseline", default="", help="JSON file of the previous results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    sw_cfg.auth_config = sw_cfg.get_auth_config()
+    sw_cfg.auth_config["TELEMETRY"] = {"ENABLED": "no"}
+    sw_cfg.auth_config["DIAGNOSTICS"] = {"ENABLED": "no"}
+
+    results = {"time": time(), "python": platform.python_version(), "platform": platform.platform(), "polling": []}
+    for seats in args.seats:
+        for metrics in (False, True):
+            results["polling"].append(bench_polling(seats, args.duration, metrics))
+            print(dumps(results["polling"][-1]), file=sys.stderr)
+
+    if not args.no_gui:
+        environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtCore import QT_VERSION_STR
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication(sys.argv[:1])
+        results["qt"] = QT_VERSION_STR
+        results["display"] = bench_display(app, args.stands, args.frames)
+        print(dumps(results["display"]), file=sys.stderr)
+        results["led"] = bench_led(args.paints)
+        print(dumps(results["led"]), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            dump(results, output_file, indent=2)
+    else:
+        print(dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print("Regression: " + regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,16 +1,17 @@
+# System-specific parameters and functions
+from sys import exit, argv, stderr
+# Startup profiler, started before the other imports with --profile, --startup-check or CMRI_PROFILE=1
+from library import profiler
+profiler.start("--profile" in argv or "--startup-check" in argv)
+
 # Software configuration
 from library import config as sw_cfg
-# Connection widget
-from library.connection.ConnectionUI import ConnectionUI
 
-# System-specific parameters and functions
-from sys import exit, argv
-# Threading interface
-from queue import Queue
-from threading import Thread
+# Concurrent initialization stages
+from concurrent.futures import ThreadPoolExecutor
 # PyQt5 modules
 from PyQt5.QtGui import QIcon, QPixmap
-from PyQt5.QtCore import QSize, Qt
+from PyQt5.QtCore import QSize, Qt, QObject, pyqtSignal
 from PyQt5.QtWidgets import QMainWindow, QApplication, QSplashScreen, QMessageBox
 
 
@@ -27,7 +28,8 @@ class ProgramUI(QMainWindow):
         self.setMaximumSize(QSize(hor_size, ver_size))
         # Calling centering window function
         sw_cfg.program_center(self)
-        # Setting the connection widget as a central widget
+        # Setting the connection widget as a central widget, the widget is imported after the splash screen appears
+        from library.connection.ConnectionUI import ConnectionUI
         self.setCentralWidget(ConnectionUI())
         # Stylesheet of the tooltip with the current transformer readings
         # self.setStyleSheet("QToolTip {background-color: black; color: white; border: black solid 1px}")
@@ -36,15 +38,125 @@ class ProgramUI(QMainWindow):
 
     # Actions when the program window closed
     def closeEvent(self, event):
-        # Setting the stopping attribute of the polling thread and waiting for the completion
-        try:
-            sw_cfg.polling_thread.do_run = False
-            sw_cfg.polling_thread.join()
-        # Exception when the program window closed without starting the polling thread
-        except AttributeError:
-            pass
-        # Closing the connection to the CMRI
-        sw_cfg.cmri_dll.CMRI_PortClose()
+        # Stopping the polling threads and closing the connections to the CMRI
+        sw_cfg.polling_stop()
+        # Stopping the configuration checking
+        if sw_cfg.config_watcher is not None:
+            sw_cfg.config_watcher.stop()
+
+
+class InitNotifier(QObject):
+    # Completion of the initialization stage, emitted from the stage thread and delivered to the GUI thread
+    stage_done = pyqtSignal(str)
+
+
+def show_error(text):
+    """
+    Showing the message box with initialization error
+
+    Args:
+        :param text: Error text
+        :type text: str
+
+    Returns:
+        :return: None
+    """
+
+    error_dialog = QMessageBox(sw_cfg.main_app)
+    error_dialog.setIcon(QMessageBox.Critical)
+    error_dialog.setWindowTitle("Initialization error")
+    error_dialog.setText(text)
+    error_dialog.setStandardButtons(QMessageBox.Ok)
+    error_dialog.show()
+    errors.append(error_dialog)
+
+
+def stage_done(stage):
+    """
+    Actions when the initialization stage completed
+
+    Args:
+        :param stage: Stage name
+        :type stage: str
+
+    Returns:
+        :return: None
+    """
+
+    profiler.mark("stage \"{0}\"".format(stage))
+
+    if stage == "git":
+        # The configuration is applied when the main window appears
+        if sw_cfg.main_app is None:
+            return
+        if stages["git"].exception() is not None:
+            show_error(str(stages["git"].exception()))
+        else:
+            sw_cfg.main_app.centralWidget().set_git_config()
+            set_git_title()
+            profiler.mark("configuration applied")
+        finish_startup()
+        return
+
+    # Waiting for the other local stages
+    local_stages = [stages["backend"], stages["ports"]]
+    if not all(future.done() for future in local_stages) or sw_cfg.main_app is not None or errors:
+        return
+    local_errors = [str(future.exception()) for future in local_stages if future.exception() is not None]
+    if local_errors:
+        splash.close()
+        show_error("\n".join(local_errors))
+        finish_startup()
+        return
+
+    # Showing the main window GUI
+    sw_cfg.main_app = ProgramUI()
+    sw_cfg.main_app.show()
+    profiler.mark("main window")
+    # Hiding the splash screen after the local initialization
+    splash.finish(sw_cfg.main_app)
+    # The configuration from the GitLab server received before the main window appeared
+    if stages["git"].done():
+        if stages["git"].exception() is not None:
+            show_error(str(stages["git"].exception()))
+        else:
+            set_git_title()
+        finish_startup()
+
+
+def finish_startup():
+    """
+    Reporting the startup profile when the main window and the configuration are ready
+
+    With --startup-check the software exits after the report, the exit status is 1 if the startup failed
+    or exceeded the STARTUP_BUDGET.
+
+    Returns:
+        :return: None
+    """
+
+    startup = profiler.profiler
+    if startup is None:
+        return
+    profiler.profiler = None
+    startup.uninstall()
+    budget = sw_cfg.auth_config.getfloat("SETTING", "STARTUP_BUDGET", fallback=0) or None
+    print(startup.report(sw_cfg.stage_times, budget), file=stderr)
+    if "--startup-check" in argv:
+        app.exit(1 if errors or (budget is not None and startup.elapsed() > budget) else 0)
+
+
+def set_git_title():
+    """
+    Showing the offline start with the cached configuration in the window title
+
+    Returns:
+        :return: None
+    """
+
+    if sw_cfg.git_offline:
+        sw_cfg.main_app.setWindowTitle("{0} - Main window (offline, configuration {1})".format(
+            sw_cfg.program_title, sw_cfg.git_entry["commit"][:8]))
 
 
 if __name__ == "__main__":
@@ -55,29 +167,17 @@ if __name__ == "__main__":
     splash = QSplashScreen(splash_pix, Qt.WindowStaysOnTopHint)
     splash.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
     splash.show()
+    profiler.mark("splash screen")
+
+    # Message boxes with initialization errors
+    errors = list()
+    # Starting the software initialization stages, their completion is delivered by the signal
+    notifier = InitNotifier()
+    notifier.stage_done.connect(stage_done)
+    executor = ThreadPoolExecutor(max_workers=3)
+    stages = sw_cfg.sw_init(executor)
+    for name, future in stages.items():
+        future.add_done_callback(lambda x, y=name: notifier.stage_done.emit(y))
+    executor.shutdown(wait=False)
 
-    # Preparing and starting the software initialization thread
-    queue = Queue()
-    init_thread = Thread(target=sw_cfg.sw_init, daemon=True, args=(queue,))
-    init_thread.start()
-
-    # Process events during software initialization
-    while init_thread.isAlive():
-        app.processEvents()
-
-    try:
-        # Showing the main window GUI
-        sw_cfg.main_app = ProgramUI()
-        sw_cfg.main_app.show()
-    except AttributeError:
-        # Showing the message box with initialization error
-        error_dialog = QMessageBox()
-        error_dialog.setIcon(QMessageBox.Critical)
-        error_dialog.setWindowTitle("Initialization error")
-        error_dialog.setText(queue.get())
-        error_dialog.setStandardButtons(QMessageBox.Ok)
-        error_dialog.show()
-
-    # Hiding the splash screen after software initialization
-    splash.finish(sw_cfg.main_app)
     exit(app.exec_())
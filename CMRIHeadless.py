@@ -0,0 +1,281 @@
+# Software configuration
+from library import config as sw_cfg
+# Summary of the polling metrics
+from library.polling.metrics import snapshot
+# JSON representation of the reading
+from library.polling.fanout import reading_record
+
+# System-specific parameters and functions
+import sys
+# Stopping on the termination signals
+import signal
+# Command line arguments
+from argparse import ArgumentParser
+# JSON lines output
+from json import dump, dumps
+# Lock-free queue of the readings published by the polling threads
+from collections import deque
+# Commands thread
+from threading import Thread, Event
+# Concurrent initialization stages
+from concurrent.futures import ThreadPoolExecutor
+
+
+def get_args(argv):
+    """
+    Parsing the command line arguments, the defaults are read from the [HEADLESS] section
+
+    Args:
+        :param argv: Command line arguments
+        :type argv: list
+
+    Returns:
+        :return: Parsed arguments
+        :rtype: argparse.Namespace
+    """
+
+    parser = ArgumentParser(description="Polling the current transformers without the GUI, every reading is written "
+                                        "as a JSON line. Commands of the standard input: reset [<stand> <place>], "
+                                        "metrics [<JSON file>], quit.")
+    parser.add_argument("stands", nargs="+", help="stand names of the configuration")
+    parser.add_argument("--port", default=sw_cfg.auth_config.get("SETTING", "DEFAULT_COM", fallback="COM3"),
+                        help="COM-port of the stands without the assigned port")
+    parser.add_argument("--rate", type=float, default=sw_cfg.auth_config.getfloat("HEADLESS", "RATE", fallback=1),
+                        help="output frames per second, the latest reading of every device is written, "
+                             "0 - every reading")
+    parser.add_argument("--output", default=sw_cfg.auth_config.get("HEADLESS", "OUTPUT", fallback=""),
+                        help="file the readings are appended to, the standard output by default")
+    parser.add_argument("--offline", action="store_true",
+                        help="using the cached configuration without requesting the GitLab server")
+    return parser.parse_args(argv)
+
+
+def write_readings(output, readings, coalesce):
+    """
+    Writing the readings published since the previous frame
+
+    Args:
+        :param output: Output file
+        :param readings: Readings published by the polling threads
+        :type readings: collections.deque
+        :param coalesce: Writing only the latest reading of every device
+        :type coalesce: bool
+
+    Returns:
+        :return: None
+    """
+
+    frame = list()
+    while readings:
+        frame.append(readings.popleft())
+    if coalesce:
+        frame = list({reading.index: reading for reading in frame}.values())
+    if not frame:
+        return
+    device_table = sw_cfg.device_table
+    output.write("".join(dumps(reading_record(device_table[x.index], x), separators=(",", ":")) + "\n"
+                         for x in frame))
+    output.flush()
+
+
+def reset(words):
+    """
+    Resetting the current transformer of the given seat or all current transformers
+
+    Args:
+        :param words: Stand name and seat number or nothing for all current transformers
+        :type words: list
+
+    Returns:
+        :return: Command result
+        :rtype: str
+    """
+
+    if not words:
+        # Broadcast address of every port
+        for thread in sw_cfg.polling_threads.values():
+            thread.reset()
+        return "reset: all"
+    if len(words) != 2:
+        return "reset: expected <stand> <place>"
+    for device in sw_cfg.device_table:
+        if device.active and [device.stand, device.place] == words:
+            if not sw_cfg.polling_threads[device.port].reset(device.address):
+                return "reset: {0:X} already pending".format(device.address)
+            return "reset: {0:X}".format(device.address)
+    return "reset: unknown seat {0} {1}".format(*words)
+
+
+def report_schedule(infeasible):
+    """
+    Reporting the ports whose target refresh period became infeasible or feasible again
+
+    Args:
+        :param infeasible: Reported infeasible ports, updated
+        :type infeasible: set
+
+    Returns:
+        :return: None
+    """
+
+    for port, thread in sw_cfg.polling_threads.items():
+        scheduler = thread.scheduler
+        if not scheduler.feasible and port not in infeasible:
+            infeasible.add(port)
+            print("schedule: {0} infeasible, load {1:.0%} exceeds utilization {2:.0%}".format(
+                port, scheduler.load, scheduler.utilization), file=sys.stderr)
+        elif scheduler.feasible and port in infeasible:
+            infeasible.discard(port)
+            print("schedule: {0} feasible".format(port), file=sys.stderr)
+
+
+def report_restarts(restarts):
+    """
+    Reporting the restarts of the worker processes polling the ports
+
+    Args:
+        :param restarts: Reported restarts of every port, updated
+        :type restarts: dict
+
+    Returns:
+        :return: None
+    """
+
+    for port, thread in sw_cfg.polling_threads.items():
+        count = getattr(thread, "restarts", 0)
+        if count != restarts.get(port, 0):
+            restarts[port] = count
+            print("worker: {0} exited with code {1}, restarted".format(port, thread.exitcode), file=sys.stderr)
+
+
+def export_metrics(words):
+    """
+    Writing the snapshot of the polling metrics, the measuring is started by the first command
+
+    Args:
+        :param words: Path to the JSON file or nothing for the standard error output
+        :type words: list
+
+    Returns:
+        :return: Command result
+        :rtype: str
+    """
+
+    started = any(thread.metrics is None for thread in sw_cfg.polling_threads.values())
+    sw_cfg.set_diagnostics(True)
+    if started:
+        return "metrics: measuring started"
+    metrics = snapshot(sw_cfg.polling_threads)
+    if not words:
+        return "metrics: " + dumps(metrics, separators=(",", ":"))
+    with open(words[0], "w", encoding="utf-8") as metrics_file:
+        dump(metrics, metrics_file, indent=2)
+    return "metrics: {0}".format(words[0])
+
+
+def read_commands(stop):
+    """
+    Executing the commands of the standard input, the end of the input does not stop the polling
+
+    Args:
+        :param stop: Stopping event of the polling
+        :type stop: threading.Event
+
+    Returns:
+        :return: None
+    """
+
+    for line in sys.stdin:
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == "quit":
+            stop.set()
+            return
+        if words[0] == "reset":
+            print(reset(words[1:]), file=sys.stderr)
+        elif words[0] == "metrics":
+            print(export_metrics(words[1:]), file=sys.stderr)
+        else:
+            print("unknown command: {0}".format(words[0]), file=sys.stderr)
+
+
+def main(argv):
+    """
+    Polling the stands until the quit command or the termination signal
+
+    Args:
+        :param argv: Command line arguments
+        :type argv: list
+
+    Returns:
+        :return: Exit status
+    """
+
+    # Reading the configuration file and loading the backend and the configuration concurrently
+    sw_cfg.auth_config = sw_cfg.get_auth_config()
+    args = get_args(argv)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stages = [executor.submit(sw_cfg.timed_stage, "backend", sw_cfg.init_backend),
+                  executor.submit(sw_cfg.timed_stage, "git",
+                                  sw_cfg.init_git_cached if args.offline else sw_cfg.init_git)]
+    errors = [str(future.exception()) for future in stages if future.exception() is not None]
+    if errors:
+        return "\n".join(errors)
+    unknown = [stand for stand in args.stands if not sw_cfg.git_config.has_section(stand)]
+    if unknown:
+        return "Stands not found in the configuration: {0}".format(", ".join(unknown))
+
+    # Connecting to the CMRI and starting the polling threads
+    sw_cfg.polling_connect(args.stands, args.port)
+    readings = deque()
+    listeners = [readings.append]
+    sw_cfg.telemetry_writer = sw_cfg.get_telemetry_writer(sw_cfg.auth_config, sw_cfg.device_table)
+    if sw_cfg.telemetry_writer is not None:
+        listeners.append(sw_cfg.telemetry_writer.publish)
+        sw_cfg.telemetry_writer.start()
+    try:
+        sw_cfg.fanout_server = sw_cfg.get_fanout_server(sw_cfg.auth_config, sw_cfg.device_table)
+    except OSError as error:
+        print("The readings server is not started: {0}".format(error), file=sys.stderr)
+    if sw_cfg.fanout_server is not None:
+        listeners.append(sw_cfg.fanout_server.publish)
+        sw_cfg.fanout_server.start()
+        print("Readings server: {0}:{1}".format(*sw_cfg.fanout_server.address[:2]), file=sys.stderr)
+    for port in sw_cfg.bus_list:
+        devices = [device for device in sw_cfg.device_table if device.port == port]
+        if devices:
+            sw_cfg.polling_threads[port] = sw_cfg.get_bus_poller(port, devices, listeners)
+    for polling_thread in sw_cfg.polling_threads.values():
+        polling_thread.start()
+    print("Polling {0} seats, ports: {1}, initialization: {2}".format(
+        len(sw_cfg.device_table), ", ".join(sw_cfg.polling_threads),
+        ", ".join("{0} {1:.3f} s".format(*x) for x in sw_cfg.stage_times.items())), file=sys.stderr)
+
+    # Stopping on the quit command, Ctrl+C and the termination signal
+    stop = Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    Thread(target=read_commands, args=(stop,), daemon=True).start()
+
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        # Writing the frames with the given rate, every reading is written as soon as possible with the zero rate
+        period = 1 / args.rate if args.rate > 0 else 0.05
+        infeasible = set()
+        restarts = dict()
+        while not stop.wait(period):
+            write_readings(output, readings, args.rate > 0)
+            report_schedule(infeasible)
+            report_restarts(restarts)
+    finally:
+        # Stopping the polling threads and closing the connections to the CMRI
+        sw_cfg.polling_stop()
+        write_readings(output, readings, args.rate > 0)
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
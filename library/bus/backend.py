@@ -0,0 +1,267 @@
+# Foreign C compatible data types for the current transformers library
+from ctypes import Structure, byref, sizeof, c_int, c_long, c_double
+# Private copies of the CMRI library for the additional COM-ports
+from os.path import basename, join
+from shutil import copyfile, rmtree
+from tempfile import mkdtemp
+
+
+class CmriSnapshot(Structure):
+    """
+    Readings of the current transformer received in one bus transaction
+    """
+
+    _fields_ = [("status", c_int),
+                ("voltage", c_double * 3),
+                ("current", c_double * 3),
+                ("temp", c_double)]
+
+
+class CmriBackend(object):
+    """
+    CMRI bus interface used by the polling thread
+
+    Every method corresponds to the function of the CMRI library with the same name.
+    The readings are returned as Python values instead of the C pointers.
+    """
+
+    def port_set_params(self, baudrate, data_bits, parity, stop_bits):
+        """
+        Setting the parameters of the COM-port connection (CMRI_PortSetParams)
+
+        Args:
+            :param baudrate: Baud rate
+            :type baudrate: int
+            :param data_bits: Number of data bits
+            :type data_bits: int
+            :param parity: Parity checking
+            :type parity: int
+            :param stop_bits: Number of stop bits
+            :type stop_bits: int
+
+        Returns:
+            :return: None
+        """
+
+        raise NotImplementedError
+
+    def port_open(self, port):
+        """
+        Opening the connection to the CMRI (CMRI_PortOpen)
+
+        Args:
+            :param port: COM-port number
+            :type port: int
+
+        Returns:
+            :return: Returned code of the CMRI library
+            :rtype: int
+        """
+
+        raise NotImplementedError
+
+    def port_close(self):
+        """
+        Closing the connection to the CMRI (CMRI_PortClose)
+
+        Returns:
+            :return: None
+        """
+
+        raise NotImplementedError
+
+    def get_status(self, address):
+        """
+        Getting the status of the current transformer (CMRI_GetStatus)
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+
+        Returns:
+            :return: Returned code of the CMRI library (0 - device answered) and the status bits
+            :rtype: tuple
+        """
+
+        raise NotImplementedError
+
+    def get_voltage(self, address, phase):
+        """
+        Getting the phase voltage of the current transformer (CMRI_GetVoltage)
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+            :param phase: Phase number 1..3
+            :type phase: int
+
+        Returns:
+            :return: Voltage, V
+            :rtype: float
+        """
+
+        raise NotImplementedError
+
+    def get_current(self, address, phase):
+        """
+        Getting the phase current of the current transformer (CMRI_GetCurrent)
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+            :param phase: Phase number 1..3
+            :type phase: int
+
+        Returns:
+            :return: Current, A
+            :rtype: float
+        """
+
+        raise NotImplementedError
+
+    def get_temp(self, address):
+        """
+        Getting the temperature of the current transformer (CMRI_GetTemp)
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+
+        Returns:
+            :return: Temperature, °C
+            :rtype: float
+        """
+
+        raise NotImplementedError
+
+    def read_snapshot(self, address, snapshot):
+        """
+        Getting the status, voltages, currents and temperature of the current transformer
+
+        The readings are written into the preallocated snapshot, the voltages, currents and temperature
+        are requested only when the device answered the status request.
+        Backends supporting a batched read override this method with a single bus transaction.
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+            :param snapshot: Preallocated readings of the current transformer
+            :type snapshot: CmriSnapshot
+
+        Returns:
+            :return: Returned code of the status request (0 - device answered)
+            :rtype: int
+        """
+
+        code, snapshot.status = self.get_status(address)
+        if code != 0:
+            return code
+        for phase in range(3):
+            snapshot.voltage[phase] = self.get_voltage(address, phase + 1)
+        for phase in range(3):
+            snapshot.current[phase] = self.get_current(address, phase + 1)
+        snapshot.temp = self.get_temp(address)
+        return code
+
+    def reset(self, address):
+        """
+        Resetting the current transformer (CMRI_Reset)
+
+        Args:
+            :param address: Address of the current transformer, 0 - broadcast address
+            :type address: int
+
+        Returns:
+            :return: None
+        """
+
+        raise NotImplementedError
+
+
+class DllBackend(CmriBackend):
+    """
+    CMRI bus via the CMRI library (cmridll.dll)
+
+    The library keeps a single COM-port connection per loaded module,
+    so every additional port is served by a private copy of the library file.
+    """
+
+    def __init__(self, path, private=False):
+        # Loading the CMRI library only on demand, the library exists for Windows only
+        from ctypes import windll
+        # Directory of the private copy of the library, it is removed when the port is closed
+        self._private_dir = None
+        if private:
+            self._private_dir = mkdtemp(prefix="cmridll_")
+            private_path = join(self._private_dir, basename(path))
+            copyfile(path, private_path)
+            path = private_path
+        self.dll = windll.LoadLibrary(path)
+        # Initializing pointers for CMRI library
+        self._status = c_int()
+        self._value = c_double()
+        # Preallocated arguments of the snapshot read
+        self._address = c_long()
+        self._address_ref = byref(self._address)
+        self._phases = [c_int(phase) for phase in range(1, 4)]
+        self._snapshot = None
+        self._snapshot_refs = None
+
+    def port_set_params(self, baudrate, data_bits, parity, stop_bits):
+        self.dll.CMRI_PortSetParams(c_int(baudrate), c_int(data_bits), c_int(parity), c_int(stop_bits))
+
+    def port_open(self, port):
+        return self.dll.CMRI_PortOpen(c_int(port))
+
+    def port_close(self):
+        self.dll.CMRI_PortClose()
+        # The private copy is unloaded and removed, the backend is not used after its port is closed
+        if self._private_dir is not None:
+            from _ctypes import FreeLibrary
+            FreeLibrary(self.dll._handle)
+            self.dll = None
+            rmtree(self._private_dir, ignore_errors=True)
+            self._private_dir = None
+
+    def get_status(self, address):
+        code = self.dll.CMRI_GetStatus(byref(c_long(address)), byref(self._status))
+        return code, self._status.value
+
+    def get_voltage(self, address, phase):
+        self.dll.CMRI_GetVoltage(c_long(address), c_int(phase), byref(self._value))
+        return self._value.value
+
+    def get_current(self, address, phase):
+        self.dll.CMRI_GetCurrent(c_long(address), c_int(phase), byref(self._value))
+        return self._value.value
+
+    def get_temp(self, address):
+        self.dll.CMRI_GetTemp(c_long(address), byref(self._value))
+        return self._value.value
+
+    def read_snapshot(self, address, snapshot):
+        # Pointers to the snapshot fields are created once for the snapshot used by the polling thread
+        if snapshot is not self._snapshot:
+            self._snapshot = snapshot
+            # Offset of every phase in the arrays of the snapshot
+            step = sizeof(c_double)
+            self._snapshot_refs = (byref(snapshot, CmriSnapshot.status.offset),
+                                   [byref(snapshot, CmriSnapshot.voltage.offset + phase * step) for phase in range(3)],
+                                   [byref(snapshot, CmriSnapshot.current.offset + phase * step) for phase in range(3)],
+                                   byref(snapshot, CmriSnapshot.temp.offset))
+        status_ref, voltage_refs, current_refs, temp_ref = self._snapshot_refs
+        self._address.value = address
+        dll = self.dll
+
+        code = dll.CMRI_GetStatus(self._address_ref, status_ref)
+        if code != 0:
+            return code
+        for phase, ref in zip(self._phases, voltage_refs):
+            dll.CMRI_GetVoltage(self._address, phase, ref)
+        for phase, ref in zip(self._phases, current_refs):
+            dll.CMRI_GetCurrent(self._address, phase, ref)
+        dll.CMRI_GetTemp(self._address, temp_ref)
+        return code
+
+    def reset(self, address):
+        self.dll.CMRI_Reset(c_long(address))
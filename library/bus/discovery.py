@@ -0,0 +1,108 @@
+# Reading and writing the live-address index
+from json import dump, load
+from os import makedirs, replace
+from os.path import dirname, join
+
+# Default location of the live-address index
+INDEX_PATH = join("cache", "live_index.json")
+
+
+def discover(bus, addresses):
+    """
+    Finding the addresses answering the status request
+
+    Args:
+        :param bus: CMRI bus backend with the opened port
+        :type bus: library.bus.backend.CmriBackend
+        :param addresses: Configured addresses of the current transformers
+        :type addresses: list
+
+    Returns:
+        :return: Answered addresses
+        :rtype: list
+    """
+
+    return [address for address in addresses if bus.get_status(address)[0] == 0]
+
+
+def load_index(path=INDEX_PATH):
+    """
+    Reading the live-address index
+
+    Args:
+        :param path: Path to the index file
+        :type path: str
+
+    Returns:
+        :return: Live addresses of every stand of every port {port: {stand: [address, ...]}}
+        :rtype: dict
+    """
+
+    try:
+        with open(path, encoding="utf-8") as index_file:
+            return load(index_file)
+    except (OSError, ValueError):
+        return dict()
+
+
+def save_index(index, path=INDEX_PATH):
+    """
+    Writing the live-address index
+
+    Args:
+        :param index: Live addresses of every stand of every port
+        :type index: dict
+        :param path: Path to the index file
+        :type path: str
+
+    Returns:
+        :return: None
+    """
+
+    makedirs(dirname(path) or ".", exist_ok=True)
+    # Writing the temporary file first, an interrupted write keeps the previous index
+    with open(path + ".tmp", "w", encoding="utf-8") as index_file:
+        dump(index, index_file, indent=2, sort_keys=True)
+    replace(path + ".tmp", path)
+
+
+def get_live(index, port, stand):
+    """
+    Getting the live addresses of the stand
+
+    Args:
+        :param index: Live-address index
+        :type index: dict
+        :param port: COM-port name
+        :type port: str
+        :param stand: Stand name
+        :type stand: str
+
+    Returns:
+        :return: Live addresses or None if the stand was not discovered on the port
+        :rtype: list
+    """
+
+    live = index.get(port, dict()).get(stand)
+    return None if live is None else [int(address, 16) for address in live]
+
+
+def set_live(index, port, stand, live):
+    """
+    Setting the live addresses of the stand
+
+    Args:
+        :param index: Live-address index
+        :type index: dict
+        :param port: COM-port name
+        :type port: str
+        :param stand: Stand name
+        :type stand: str
+        :param live: Live addresses
+        :type live: list
+
+    Returns:
+        :return: None
+    """
+
+    index.setdefault(port, dict())[stand] = ["{0:X}".format(address) for address in sorted(live)]
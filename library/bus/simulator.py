@@ -0,0 +1,137 @@
+# CMRI bus interface
+from library.bus.backend import CmriBackend
+
+# Pseudo-random numbers for the simulated readings
+from random import Random
+# Suspending execution for the simulated bus latency
+from time import sleep
+# Exclusive access to the simulated bus line
+from threading import Lock
+
+
+class SimulatedBus(CmriBackend):
+    """
+    Simulated CMRI bus for running and load-testing the polling thread without the hardware
+
+    Devices are located at the addresses 1..size, the absent seats are chosen randomly with the given fraction.
+    Every call occupies the bus for the given latency, a call to the absent seat occupies it for the timeout.
+    """
+
+    def __init__(self, size=16, latency=0.0, timeout=None, absent=0.0, fault_bits=(0,), seed=None):
+        """
+        Args:
+            :param size: Number of the addresses on the bus
+            :type size: int
+            :param latency: Duration of one bus call, s
+            :type latency: float
+            :param timeout: Duration of the call to the absent seat, s (the latency by default)
+            :type timeout: float
+            :param absent: Fraction of the absent seats 0..1
+            :type absent: float
+            :param fault_bits: Status bits patterns returned by the present devices
+            :type fault_bits: list
+            :param seed: Random generator seed
+            :type seed: int
+        """
+
+        self.size = size
+        self.latency = latency
+        self.timeout = latency if timeout is None else timeout
+        self.fault_bits = list(fault_bits) or [0]
+        self._random = Random(seed)
+        self._lock = Lock()
+        # Choosing the absent seats
+        addresses = list(range(1, size + 1))
+        self.absent = set(self._random.sample(addresses, int(round(size * absent))))
+        self.present = set(addresses) - self.absent
+        # Opened port number
+        self.port = None
+        # Number of the bus calls
+        self.calls = 0
+
+    @staticmethod
+    def stand_config(stand_qty=1, seats=16, prefix="SIM"):
+        """
+        Stand configuration matching the simulated bus in the format of the GitLab server configuration
+
+        Args:
+            :param stand_qty: The number of stands
+            :type stand_qty: int
+            :param seats: The number of seats per stand
+            :type seats: int
+            :param prefix: Stand name prefix
+            :type prefix: str
+
+        Returns:
+            :return: Raw configuration
+            :rtype: str
+        """
+
+        lines = list()
+        for stand in range(stand_qty):
+            lines.append("[{0}{1}]".format(prefix, stand + 1))
+            for place in range(1, seats + 1):
+                lines.append("{0} = {1:X}".format(place, stand * seats + place))
+        return "\n".join(lines) + "\n"
+
+    def _transaction(self, address):
+        """
+        Occupying the bus for one call
+
+        Args:
+            :param address: Address of the current transformer, 0 - broadcast address
+            :type address: int
+
+        Returns:
+            :return: Presence of the device at the address
+            :rtype: bool
+        """
+
+        present = address == 0 or address in self.present
+        with self._lock:
+            self.calls += 1
+            delay = self.latency if present else self.timeout
+            if delay:
+                sleep(delay)
+        return present
+
+    def port_set_params(self, baudrate, data_bits, parity, stop_bits):
+        pass
+
+    def port_open(self, port):
+        self.port = port
+        return 0
+
+    def port_close(self):
+        self.port = None
+
+    def get_status(self, address):
+        if not self._transaction(address):
+            return 1, 0
+        return 0, self._random.choice(self.fault_bits)
+
+    def get_voltage(self, address, phase):
+        self._transaction(address)
+        return round(self._random.gauss(57.7, 0.2), 2)
+
+    def get_current(self, address, phase):
+        self._transaction(address)
+        return round(self._random.gauss(1.0, 0.01), 3)
+
+    def get_temp(self, address):
+        self._transaction(address)
+        return round(self._random.gauss(25.0, 0.5), 1)
+
+    def read_snapshot(self, address, snapshot):
+        # All readings are returned by one bus transaction
+        if not self._transaction(address):
+            return 1
+        snapshot.status = self._random.choice(self.fault_bits)
+        for phase in range(3):
+            snapshot.voltage[phase] = round(self._random.gauss(57.7, 0.2), 2)
+            snapshot.current[phase] = round(self._random.gauss(1.0, 0.01), 3)
+        snapshot.temp = round(self._random.gauss(25.0, 0.5), 1)
+        return 0
+
+    def reset(self, address):
+        self._transaction(address)
@@ -1,18 +1,34 @@
-# Finding the paths in the system according to the specified template
-from glob import glob
-# System-specific parameters and functions
-from sys import platform
-# Access to the GitLab server API
-from gitlab import Gitlab
+# Looking for regular expression pattern
+from re import search
+# Dictionary that remembers the insertion order
+from collections import OrderedDict
+# Measuring the initialization stages and the probing of the ports
+from time import perf_counter, monotonic
 # Interaction with the configuration *.ini files
 from configparser import ConfigParser
-# Foreign C compatible data types for the current transformers library
-from ctypes import windll, c_int, c_double
-# Data exchange with CMRI via COM-port
-from serial import Serial, SerialException
-# PyQt5 modules
-from PyQt5.QtCore import QSize, QObject, pyqtSignal, QEvent
-from PyQt5.QtWidgets import QDesktopWidget
+# Cached configuration from the GitLab server
+from library.gitcache import cache_path, load_cached, save_cached, revalidate
+# CMRI bus backends
+from library.bus.backend import DllBackend
+from library.bus.simulator import SimulatedBus
+# Live-address index
+from library.bus.discovery import load_index, save_index, set_live
+# Presence of the current transformers on the line
+from library.polling.presence import PresenceTracker
+# Deadlines of the device reads
+from library.polling.scheduler import PollScheduler
+# Change detection of the readings
+from library.polling.deadband import DeadbandFilter
+# Device table
+from library.polling.table import build_table, stand_devices
+# Current transformer polling thread
+from library.polling.poller import BusPoller
+# Instrumentation of the polling
+from library.polling.metrics import PollMetrics
+# Live reload of the configuration from the GitLab server
+from library.reload import ConfigWatcher
+# Background probing of the ports
+from threading import Thread, Event
 
 
 def program_center(self):
@@ -27,6 +43,9 @@ def program_center(self):
         :return: None
     """
 
+    # PyQt5 modules are imported by the GUI functions only, the headless polling does not load them
+    from PyQt5.QtWidgets import QDesktopWidget
+
     # Get a rectangle that defines the geometry of the window
     rectangle = self.frameGeometry()
     # Get the current screen resolution and calculate the center point
@@ -37,59 +56,183 @@ def program_center(self):
     self.move(rectangle.topLeft())
 
 
-def resize_window(self, stand_qty):
+def resize_window(self, row_qty):
     """
     Resizing the software interface after completing the connection
 
+    Up to [SETTING] VISIBLE_ROWS rows of the stand display are shown, the window with the stands is resizable
+    and the stand display scrolls the other rows.
+
     Args:
         :param self: ProgramUI QMainWindow class
         :type self: __main__.ProgramUI
-        :param stand_qty: The number of stands
-        :type stand_qty: int
+        :param row_qty: The number of rows of the stand display
+        :type row_qty: int
 
     Returns:
         :return: None
     """
 
+    # PyQt5 modules
+    from PyQt5.QtCore import QSize
+
     # Updating program window dimensions
     hor_size = 909
-    ver_size = 82 + stand_qty * 160
-    self.resize(hor_size, ver_size)
-    self.setMinimumSize(QSize(hor_size, ver_size))
-    self.setMaximumSize(QSize(hor_size, ver_size))
+    ver_size = 82
+    if not row_qty:
+        self.resize(hor_size, ver_size)
+        self.setMinimumSize(QSize(hor_size, ver_size))
+        self.setMaximumSize(QSize(hor_size, ver_size))
+    else:
+        visible_rows = min(row_qty, auth_config.getint("SETTING", "VISIBLE_ROWS", fallback=8))
+        self.setMinimumSize(QSize(hor_size, ver_size + 70))
+        self.setMaximumSize(QSize(16777215, 16777215))
+        self.resize(hor_size, ver_size + 12 + visible_rows * 60)
     # Calling centering window function
     program_center(self)
 
 
-def available_serial():
+def port_sort_key(device):
+    """
+    Sorting key of the port names in the natural order, e.g. COM2 before COM10
+
+    Args:
+        :param device: Port name
+        :type device: str
+
+    Returns:
+        :return: Sorting key
+        :rtype: tuple
+    """
+
+    number = search(r"\d+$", device)
+    return (device[:number.start()], int(number.group(0))) if number else (device, -1)
+
+
+def probe_serial(device):
+    """
+    Checking that the port can be opened
+
+    Args:
+        :param device: Port name
+        :type device: str
+
+    Returns:
+        :return: The port is available for connection
+        :rtype: bool
+    """
+
+    # Data exchange with CMRI via COM-port, imported on the first use
+    from serial import Serial, SerialException
+
+    try:
+        s = Serial(device)
+        s.close()
+        return True
+    except (OSError, SerialException):
+        return False
+
+
+def probe_port(device):
+    """
+    Probing the port in the background and recording the result
+
+    Args:
+        :param device: Port name
+        :type device: str
+
+    Returns:
+        :return: None
+    """
+
+    probed_ports[device] = probe_serial(device)
+    del probing_ports[device]
+
+
+def wait_probes(threads, timeout, done):
+    """
+    Waiting for the probing of the ports and reporting the completion
+
+    Args:
+        :param threads: Probing threads of the ports
+        :type threads: list
+        :param timeout: Maximum duration of the waiting, s
+        :type timeout: float
+        :param done: Called when the probes returned or the timeout expired
+        :type done: callable
+
+    Returns:
+        :return: None
+    """
+
+    deadline = monotonic() + timeout
+    for thread in threads:
+        thread.join(max(deadline - monotonic(), 0))
+    done()
+
+
+def available_serial(probe=False, timeout=0.5, done=None):
     """
     Getting the list of ports available for connection
 
+    The ports are enumerated by the operating system without opening them.
+    The optional probing opens the newly appeared ports in the background, the results are cached for every port.
+    The probing port is not listed until its probe returns, and it is not probed again while the probe is stuck.
+
+    Args:
+        :param probe: Checking that the ports can be opened
+        :type probe: bool
+        :param timeout: Waiting for the probes before the completion is reported, s
+        :type timeout: float
+        :param done: Called from the background thread when the started probes returned or the timeout expired
+        :type done: callable
+
     Returns:
-        :return: List of ports available for connection
+        :return: List of ports available for connection according to the completed probes
         :rtype: list
     """
 
-    # Initializing an empty list of ports available for connection
-    available_com = list()
+    # Enumeration of the ports, imported on the first use
+    from serial.tools.list_ports import comports
 
-    if platform.startswith("win"):
-        com_list = ["COM%s" % (i + 1) for i in range(256)]
-    elif platform.startswith("linux") or platform.startswith("cygwin"):
-        com_list = glob("/dev/tty[A-Za-z]*")
-    elif platform.startswith("darwin"):
-        com_list = glob("/dev/tty.*")
-    else:
-        raise EnvironmentError("Unsupported platform")
+    com_list = sorted((port.device for port in comports()), key=port_sort_key)
+    if not probe:
+        return com_list
 
+    # Forgetting the disconnected ports
+    for device in list(probed_ports):
+        if device not in com_list:
+            del probed_ports[device]
+    # Probing the new ports, the ports being probed are not submitted again
+    threads = list()
     for device in com_list:
-        try:
-            s = Serial(device)
-            s.close()
-            available_com.append(device)
-        except (OSError, SerialException):
-            pass
-    return available_com
+        if device not in probed_ports and device not in probing_ports:
+            thread = Thread(target=probe_port, args=(device,), name="Probe " + device, daemon=True)
+            probing_ports[device] = thread
+            thread.start()
+            threads.append(thread)
+    if threads and done is not None:
+        Thread(target=wait_probes, args=(threads, timeout, done), name="Probe waiting", daemon=True).start()
+    return [device for device in com_list if probed_ports.get(device)]
+
+
+def get_ports(done=None):
+    """
+    Getting the list of ports available for connection according to the software settings
+
+    Args:
+        :param done: Called from the background thread when the probing of the new ports completed
+        :type done: callable
+
+    Returns:
+        :return: List of ports available for connection
+        :rtype: list
+    """
+
+    if auth_config.get("SETTING", "BACKEND", fallback="dll") == "sim":
+        return ["SIM{0}".format(x + 1) for x in range(4)]
+    return available_serial(probe=auth_config.getboolean("SETTING", "PROBE_PORTS", fallback=False),
+                            timeout=auth_config.getfloat("SETTING", "PROBE_TIMEOUT", fallback=0.5), done=done)
 
 
 def get_auth_config():
@@ -125,6 +268,385 @@ def get_git_config(config_raw):
     return config
 
 
+def get_backend(config, private=False):
+    """
+    Creating the CMRI bus backend according to the software settings
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+        :param private: Loading a private copy of the CMRI library for an additional COM-port
+        :type private: bool
+
+    Returns:
+        :return: CMRI bus backend
+        :rtype: library.bus.backend.CmriBackend
+    """
+
+    # The CMRI library by default
+    if config.get("SETTING", "BACKEND", fallback="dll") != "sim":
+        return DllBackend("library\\dll\\cmridll.dll", private)
+
+    # Simulated bus settings
+    if not config.has_section("SIMULATOR"):
+        config.add_section("SIMULATOR")
+    sim_config = config["SIMULATOR"]
+    seed = sim_config.get("SEED", "")
+    return SimulatedBus(size=sim_config.getint("SIZE", 64),
+                        latency=sim_config.getfloat("LATENCY", 0.0),
+                        timeout=sim_config.getfloat("TIMEOUT", None),
+                        absent=sim_config.getfloat("ABSENT", 0.0),
+                        fault_bits=[int(x) for x in sim_config.get("FAULT_BITS", "0").split(",")],
+                        seed=int(seed) if seed else None)
+
+
+def get_presence_tracker(config):
+    """
+    Creating the presence tracker of the current transformers according to the software settings
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+
+    Returns:
+        :return: Presence tracker with the configured backoff of the absent seats
+        :rtype: PresenceTracker
+    """
+
+    if not config.has_section("PRESENCE"):
+        config.add_section("PRESENCE")
+    presence_config = config["PRESENCE"]
+    return PresenceTracker(interval=presence_config.getfloat("PROBE_INTERVAL", 1.0),
+                           factor=presence_config.getfloat("BACKOFF_FACTOR", 2.0),
+                           max_interval=presence_config.getfloat("MAX_INTERVAL", 60.0),
+                           misses=presence_config.getint("MISSES", 1))
+
+
+def get_scheduler(config):
+    """
+    Creating the schedule of the device reads according to the software settings
+
+    The target refresh period of the [SCHEDULE] section is overridden by the [SCHEDULE <stand name>] section
+    of the stand.
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+
+    Returns:
+        :return: Schedule with the target refresh periods and the maximum bus utilization
+        :rtype: PollScheduler
+    """
+
+    cycle_time = config.getfloat("SCHEDULE", "CYCLE_TIME", fallback=0)
+    stand_cycle_times = {section[len("SCHEDULE "):]: config.getfloat(section, "CYCLE_TIME", fallback=cycle_time)
+                         for section in config.sections() if section.startswith("SCHEDULE ")}
+    return PollScheduler(cycle_time, config.getfloat("SCHEDULE", "UTILIZATION", fallback=100) / 100,
+                         stand_cycle_times)
+
+
+def get_deadband(config):
+    """
+    Creating the change detection of the readings according to the software settings
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+
+    Returns:
+        :return: Deadband filter of the polling thread, None if every reading is passed on
+        :rtype: DeadbandFilter
+    """
+
+    if not config.getboolean("DEADBAND", "ENABLED", fallback=False):
+        return None
+    return DeadbandFilter(voltage=config.getfloat("DEADBAND", "VOLTAGE", fallback=0),
+                          current=config.getfloat("DEADBAND", "CURRENT", fallback=0),
+                          temp=config.getfloat("DEADBAND", "TEMP", fallback=0),
+                          max_age=config.getfloat("DEADBAND", "MAX_AGE", fallback=0))
+
+
+def get_rules_engine(config, devices):
+    """
+    Creating the limit and fault evaluation engine according to the software settings
+
+    The limits of the [LIMITS] section are overridden by the [LIMITS <stand name>] section of the stand,
+    an empty limit is not checked.
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+        :param devices: Devices in the polling order
+        :type devices: list
+
+    Returns:
+        :return: Limit and fault evaluation engine
+        :rtype: library.polling.rules.RulesEngine
+    """
+
+    # Arrays of the limits and the engine are imported at the connection, the startup does not load numpy
+    import numpy as np
+    from library.polling.rules import RulesEngine, LIMIT_NAMES
+
+    stand_limits = dict()
+    limits = np.empty((len(devices), len(LIMIT_NAMES)))
+    for device in devices:
+        if device.stand not in stand_limits:
+            row = list()
+            for idx, name in enumerate(LIMIT_NAMES):
+                value = config.get("LIMITS", name, fallback="")
+                value = config.get("LIMITS " + device.stand, name, fallback=value)
+                # Minimum limits are in the even columns, maximum limits are in the odd columns
+                row.append(float(value) if value.strip() else (np.inf if idx % 2 else -np.inf))
+            stand_limits[device.stand] = row
+        limits[device.index] = stand_limits[device.stand]
+    return RulesEngine(limits, phase_bits)
+
+
+def get_history(config, size):
+    """
+    Creating the readings history according to the software settings
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+        :param size: The number of devices
+        :type size: int
+
+    Returns:
+        :return: Readings history of every device
+        :rtype: library.polling.history.History
+    """
+
+    # Readings history of every device, imported at the connection
+    from library.polling.history import History
+
+    raw = config.getint("HISTORY", "RAW", fallback=300)
+    tiers = config.get("HISTORY", "TIERS", fallback="1:900, 60:720")
+    tiers = [(float(x.split(":")[0]), int(x.split(":")[1])) for x in tiers.split(",") if x.strip()]
+    return History(size, raw, tiers)
+
+
+def get_telemetry_writer(config, devices):
+    """
+    Creating the telemetry log according to the software settings
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+        :param devices: Devices in the polling order
+        :type devices: list
+
+    Returns:
+        :return: Telemetry log or None if the log is disabled
+        :rtype: library.polling.telemetry.TelemetryWriter
+    """
+
+    if not config.getboolean("TELEMETRY", "ENABLED", fallback=False):
+        return None
+    # Telemetry log of the readings, imported at the connection
+    from library.polling.telemetry import TelemetryWriter
+    return TelemetryWriter(devices,
+                           directory=config.get("TELEMETRY", "DIRECTORY", fallback="telemetry"),
+                           max_size=int(config.getfloat("TELEMETRY", "MAX_SIZE", fallback=64) * 1024 * 1024),
+                           max_age=config.getfloat("TELEMETRY", "MAX_AGE", fallback=3600),
+                           max_files=config.getint("TELEMETRY", "MAX_FILES", fallback=24),
+                           flush_interval=config.getfloat("TELEMETRY", "FLUSH_INTERVAL", fallback=1))
+
+
+def get_fanout_server(config, devices):
+    """
+    Creating the local server streaming the readings to the subscribers according to the software settings
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+        :param devices: Devices in the polling order
+        :type devices: list
+
+    Returns:
+        :return: Listening server, not started, or None if the server is disabled
+        :rtype: library.polling.fanout.FanoutServer
+
+    Raises:
+        OSError: The port can not be listened
+    """
+
+    if not config.getboolean("SERVER", "ENABLED", fallback=False):
+        return None
+    # Server of the subscribers, imported at the connection
+    from library.polling.fanout import FanoutServer
+    return FanoutServer(devices, host=config.get("SERVER", "HOST", fallback="127.0.0.1"),
+                        port=config.getint("SERVER", "PORT", fallback=8765),
+                        interval=config.getfloat("SERVER", "INTERVAL", fallback=0.2))
+
+
+def get_stand_ports(stand_list, default_port):
+    """
+    Assigning the stands to the COM-ports according to the software settings
+
+    Args:
+        :param stand_list: List of stands
+        :type stand_list: list
+        :param default_port: COM-port of the stands without the assigned port
+        :type default_port: str
+
+    Returns:
+        :return: Stands of every COM-port, the default port goes first
+        :rtype: OrderedDict
+    """
+
+    port_stands = OrderedDict([(default_port, list())])
+    for stand in stand_list:
+        port = auth_config.get("PORTS", stand, fallback=default_port)
+        port_stands.setdefault(port, list()).append(stand)
+    return port_stands
+
+
+def open_port(bus, port_name):
+    """
+    Opening the COM-port of the CMRI bus
+
+    Args:
+        :param bus: CMRI bus backend
+        :type bus: library.bus.backend.CmriBackend
+        :param port_name: COM-port name
+        :type port_name: str
+
+    Returns:
+        :return: None
+    """
+
+    bus.port_set_params(9600, 8, 0, 0)
+    bus.port_open(int(search(r"\d+(\.\d+)?", port_name).group(0)))
+
+
+def polling_connect(stands, default_port):
+    """
+    Connecting to the CMRI of the stands and building the device table
+
+    Args:
+        :param stands: List of stands
+        :type stands: list
+        :param default_port: COM-port of the stands without the assigned port
+        :type default_port: str
+
+    Returns:
+        :return: None
+    """
+
+    global stand_list, stand_ports, live_index, device_table
+    # Re-initializing the list of stands when reconnecting during one session
+    stand_list = list(stands)
+    # Assigning the stands to the COM-ports, the default port serves the stands without the assigned port
+    port_stands = get_stand_ports(stand_list, default_port)
+    stand_ports = {stand: port for port, stands in port_stands.items() for stand in stands}
+    # Reading the live addresses found during the previous connections
+    live_index = load_index()
+    # Setting connection to the CMRI for every port
+    for idx, port_name in enumerate(port_stands):
+        # The worker processes open their ports themselves
+        if auth_config.getboolean("WORKER", "ENABLED", fallback=False):
+            bus_list[port_name] = None
+            continue
+        # The primary backend serves the default port, additional ports get their own backends
+        bus = cmri_bus if not idx else get_backend(auth_config, private=True)
+        open_port(bus, port_name)
+        bus_list[port_name] = bus
+
+    # Building the device table of the connected stands
+    device_table = build_table(stand_list, git_config, stand_ports)
+
+
+def get_bus_poller(port, devices, listeners):
+    """
+    Creating the polling thread of the connected port according to the software settings
+
+    Args:
+        :param port: COM-port name
+        :type port: str
+        :param devices: Devices of the stands connected to the port in the polling order
+        :type devices: list
+        :param listeners: Callables receiving every reading from the polling thread
+        :type listeners: list
+
+    Returns:
+        :return: Polling thread or the supervisor of the worker process polling the port, not started
+        :rtype: BusPoller
+    """
+
+    metrics = auth_config.getboolean("DIAGNOSTICS", "ENABLED", fallback=False)
+    if auth_config.getboolean("WORKER", "ENABLED", fallback=False):
+        # Polling in the worker process, imported at the connection
+        from library.polling.worker import BusWorker
+        settings = {section: dict(auth_config.items(section, raw=True)) for section in auth_config.sections()}
+        return BusWorker(port, devices, len(device_table), settings, live_index, listeners,
+                         get_scheduler(auth_config), metrics, get_deadband(auth_config),
+                         scan_interval=auth_config.getfloat("WORKER", "SCAN_INTERVAL", fallback=0.02),
+                         restart_delay=auth_config.getfloat("WORKER", "RESTART_DELAY", fallback=1))
+    return BusPoller(bus_list[port], port, devices, get_presence_tracker(auth_config), live_index, listeners,
+                     get_scheduler(auth_config), PollMetrics() if metrics else None, get_deadband(auth_config))
+
+
+def set_diagnostics(enabled):
+    """
+    Starting or stopping the instrumentation of the running polling threads
+
+    The started instrumentation keeps the collected metrics, the stopped one discards them.
+
+    Args:
+        :param enabled: Measuring the polling
+        :type enabled: bool
+
+    Returns:
+        :return: None
+    """
+
+    for thread in polling_threads.values():
+        if not enabled:
+            thread.metrics = None
+        elif thread.metrics is None:
+            thread.metrics = PollMetrics()
+
+
+def polling_stop():
+    """
+    Stopping all polling threads and closing the connections to the CMRI
+
+    Returns:
+        :return: None
+    """
+
+    # Setting the stopping attribute of the polling threads and waiting for the completion
+    for thread in polling_threads.values():
+        thread.do_run = False
+    for thread in polling_threads.values():
+        thread.join()
+    # Saving the live addresses for the next connection
+    for port, thread in polling_threads.items():
+        absent = thread.presence.absent
+        for stand, devices in stand_devices(thread.devices).items():
+            set_live(live_index, port, stand, [x.address for x in devices if x.address not in absent])
+    if polling_threads:
+        save_index(live_index)
+    polling_threads.clear()
+    # Writing the rest of the telemetry log
+    global telemetry_writer
+    if telemetry_writer is not None:
+        telemetry_writer.stop()
+        telemetry_writer = None
+    # Disconnecting the subscribers
+    global fanout_server
+    if fanout_server is not None:
+        fanout_server.stop()
+        fanout_server = None
+    # Closing the connections to the CMRI, the ports of the worker processes are closed by them
+    for bus in bus_list.values():
+        if bus is not None:
+            bus.port_close()
+    bus_list.clear()
+
+
 def clickable_widget(widget):
     """
     Setting mouse click events for widgets that do not support this function
@@ -136,6 +658,9 @@ def clickable_widget(widget):
         :return: Widget with installed event filter
     """
 
+    # PyQt5 modules
+    from PyQt5.QtCore import QObject, pyqtSignal, QEvent
+
     class Filter(QObject):
         clicked = pyqtSignal()
 
@@ -152,58 +677,211 @@ def clickable_widget(widget):
     return filt.clicked
 
 
-def sw_init(queue):
+def init_backend():
     """
-    Software initialization
+    Initialization stage: loading the CMRI bus backend
 
     Returns:
         :return: None
     """
 
-    # Loading the CMRI library
-    global cmri_dll
-    cmri_dll = windll.LoadLibrary("library\\dll\\cmridll.dll")
+    global cmri_bus
+    cmri_bus = get_backend(auth_config)
+
+
+def init_ports():
+    """
+    Initialization stage: getting the list of ports available for connection
+
+    Returns:
+        :return: None
+    """
 
-    # Getting the list of ports available for connection
     global avail_com
-    avail_com = available_serial()
-    # Reading the configuration file for access to the GitLab server
-    global auth_config
-    auth_config = get_auth_config()
+    # The stage runs in the background, the ports are listed again when the started probes complete
+    probed = Event()
+    avail_com = get_ports(probed.set)
+    if probing_ports or probed_ports:
+        probed.wait()
+        avail_com = get_ports()
+
+
+def get_git_project():
+    """
+    Connecting to the project in the GitLab server according to the software settings
+
+    Returns:
+        :return: GitLab project, it is not requested until its first use
+        :rtype: gitlab.v4.objects.Project
+    """
 
     # Getting the settings for the connection to the GitLab server
     git_server = auth_config["AUTH"]["GIT_SERVER"]
     git_token = auth_config["AUTH"]["GIT_TOKEN"]
     git_api_version = auth_config["AUTH"]["GIT_API_VERSION"]
-    git_proj_id = auth_config["AUTH"]["PROJ_ID"]
+    git_timeout = auth_config.getfloat("AUTH", "GIT_TIMEOUT", fallback=5)
+
+    # Access to the GitLab server API, imported on the first request
+    from gitlab import Gitlab
+
+    # Initializing the connection to the GitLab server
+    gitlab_auth = Gitlab(git_server, git_token, timeout=git_timeout, api_version=git_api_version)
+    # Getting the project in the GitLab server without requesting it
+    return gitlab_auth.projects.get(auth_config["AUTH"]["PROJ_ID"], lazy=True)
+
+
+def fetch_git_entry(cached):
+    """
+    Getting the configuration from the GitLab server only if it was changed, the changed configuration is cached
+
+    Args:
+        :param cached: Last known good configuration or None
+        :type cached: dict
+
+    Returns:
+        :return: Actual configuration, the cached one if it was not changed
+        :rtype: dict
+    """
+
+    entry = revalidate(get_git_project(), cached)
+    if entry is not cached:
+        save_cached(cache_path(auth_config["AUTH"]["GIT_SERVER"], auth_config["AUTH"]["PROJ_ID"]), entry)
+    return entry
+
+
+def get_config_watcher(config, changed):
+    """
+    Creating the background checking of the configuration in the GitLab server according to the software settings
+
+    Args:
+        :param config: Read configuration
+        :type config: ConfigParser
+        :param changed: Callable receiving the changed configuration from the watcher thread
+        :type changed: callable
 
+    Returns:
+        :return: Configuration watcher or None if the live reload is disabled
+        :rtype: ConfigWatcher
+    """
+
+    interval = config.getfloat("AUTH", "GIT_RELOAD", fallback=0)
+    if interval <= 0 or git_entry is None:
+        return None
+    return ConfigWatcher(fetch_git_entry, git_entry, changed, interval)
+
+
+def init_git():
+    """
+    Initialization stage: getting the configuration from the GitLab server
+
+    Returns:
+        :return: None
+    """
+
+    # Last known good configuration of the project
+    global git_entry, git_offline
+    cached = load_cached(cache_path(auth_config["AUTH"]["GIT_SERVER"], auth_config["AUTH"]["PROJ_ID"]))
     try:
-        # Initializing the connection to the GitLab server
-        gitlab_auth = Gitlab(git_server, git_token, api_version=git_api_version)
-        # Reading the project in the GitLab server
-        project = gitlab_auth.projects.get(git_proj_id)
-    except Exception as error:
-        queue.put(str(error))
-        return
-
-    # Getting the configuration from the GitLab server
-    raw = project.files.get(file_path="config.ini", ref="master").decode()
-    raw = raw.decode("utf-8")
+        # Getting the configuration from the GitLab server only if it was changed
+        git_entry = fetch_git_entry(cached)
+        git_offline = False
+    except Exception:
+        # Starting with the last known good configuration when the GitLab server is unavailable
+        if cached is None:
+            raise
+        git_entry = cached
+        git_offline = True
 
     # Representing a configuration from the GitLab server in the ConfigParser format
     global git_config
-    git_config = get_git_config(raw)
+    git_config = get_git_config(git_entry["raw"])
+
+
+def init_git_cached():
+    """
+    Initialization stage: using the cached configuration without requesting the GitLab server
+
+    Returns:
+        :return: None
+    """
+
+    global git_entry, git_offline, git_config
+    cached = load_cached(cache_path(auth_config["AUTH"]["GIT_SERVER"], auth_config["AUTH"]["PROJ_ID"]))
+    if cached is None:
+        raise FileNotFoundError("The cached configuration is not found, start with the GitLab server available")
+    git_entry = cached
+    git_offline = True
+    git_config = get_git_config(git_entry["raw"])
+
+
+def timed_stage(stage, function):
+    """
+    Running the initialization stage and measuring its duration
+
+    Args:
+        :param stage: Stage name
+        :type stage: str
+        :param function: Stage function
+        :type function: callable
+
+    Returns:
+        :return: None
+    """
+
+    start = perf_counter()
+    try:
+        function()
+    finally:
+        stage_times[stage] = perf_counter() - start
+
+
+def sw_init(executor):
+    """
+    Software initialization
+
+    The local configuration is read at once, the other stages run concurrently.
+    The local stages are "backend" and "ports", the remote stage is "git".
+
+    Args:
+        :param executor: Executor of the initialization stages
+        :type executor: concurrent.futures.Executor
+
+    Returns:
+        :return: Future of every initialization stage, the exception of the failed stage is set to its future
+        :rtype: OrderedDict
+    """
+
+    # Reading the configuration file for access to the GitLab server
+    global auth_config
+    auth_config = get_auth_config()
+
+    stages = OrderedDict()
+    for stage, function in (("backend", init_backend), ("ports", init_ports), ("git", init_git)):
+        stages[stage] = executor.submit(timed_stage, stage, function)
+    return stages
 
 
 # List of ports available for connection
 avail_com = None
+# Probing results of the ports {port: available}
+probed_ports = dict()
+# Ports being probed {port: probing thread}, the stuck probes stay here until they return
+probing_ports = dict()
 # Configuration file for access to the GitLab server
 auth_config = None
 # Configuration from the GitLab server in the ConfigParser format
 git_config = None
-
-# CMRI library
-cmri_dll = None
+# Configuration from the GitLab server with its commit {"project", "ref", "commit", "blob_id", "raw"}
+git_entry = None
+# The GitLab server was unavailable and the cached configuration is used
+git_offline = False
+# Background checking of the configuration in the GitLab server
+config_watcher = None
+
+# CMRI bus backend
+cmri_bus = None
+# Duration of every initialization stage, s
+stage_times = dict()
 
 # Software title
 program_title = "CMRIChecker"
@@ -212,28 +890,21 @@ main_app = None
 
 # List of stands when reconnecting during one session
 stand_list = list()
-
-# Primary polling thread
-polling_thread = None
-# Suspending execution of the polling thread for the given number of seconds
-polling_time = 0
-
-# Initializing pointers for CMRI library
-# Voltage
-GetVoltage_1 = c_double()
-GetVoltage_2 = c_double()
-GetVoltage_3 = c_double()
-# Current
-GetCurrent_1 = c_double()
-GetCurrent_2 = c_double()
-GetCurrent_3 = c_double()
-# Status
-GetStatus = c_int()
-# Temperature
-GetTemp = c_double()
-
-# Default CMRI reset ID
-reset_id = 0
+# COM-port of every stand
+stand_ports = dict()
+# CMRI bus backend of every opened COM-port, None - the port is opened by its worker process
+bus_list = dict()
+# Devices of the connected stands in the polling order
+device_table = list()
+
+# Polling thread of every opened COM-port
+polling_threads = dict()
+# Live addresses of every stand of every port {port: {stand: [address, ...]}}
+live_index = dict()
+# Telemetry log of the readings
+telemetry_writer = None
+# Server streaming the readings to the subscribers
+fanout_server = None
 
 # CMRI returned status bits
 phase_bits = [1, 2, 4]
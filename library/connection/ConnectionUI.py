@@ -1,15 +1,15 @@
 # Software configuration
 from library import config as sw_cfg
-# Stand widget
-from library.stand.StandUI import StandUI
+# Differences between the configurations from the GitLab server
+from library.reload import diff_config
 
-# Looking for regular expression pattern
-from re import search
-# Foreign C compatible data types for the current transformers library
-from ctypes import c_int
 # PyQt5 modules
-from PyQt5.QtCore import QSize, QRect
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QLabel, QComboBox, QFrame, QPushButton
+from PyQt5.QtCore import Qt, QSize, QRect, QTimer, pyqtSignal
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QLabel, QComboBox, QFrame, QPushButton, QToolButton,
+                             QListWidget, QListWidgetItem, QMenu, QWidgetAction)
+
+# The number of stands shown in the drop-down list without scrolling
+STANDS_VISIBLE = 15
 
 
 def reset_action():
@@ -20,10 +20,9 @@ def reset_action():
         :return: None
     """
 
-    # Broadcast address
-    sw_cfg.reset_id = 0
-    # Setting the pause for the main polling thread
-    sw_cfg.polling_thread.do_pause = True
+    # Queuing the reset to the broadcast address of every port
+    for thread in sw_cfg.polling_threads.values():
+        thread.reset()
 
 
 class ConnectionUI(QWidget):
@@ -31,6 +30,12 @@ class ConnectionUI(QWidget):
     interface = dict()
     # The flag of adding a stand widget
     stand_widget = None
+    # Polling diagnostics window
+    diagnostics_widget = None
+    # Changed configuration received by the watcher thread and delivered to the GUI thread
+    config_changed = pyqtSignal(object)
+    # Probing of the new ports completed in the background
+    ports_probed = pyqtSignal()
 
     def __init__(self, parent=None):
         super(ConnectionUI, self).__init__(parent)
@@ -45,43 +50,28 @@ class ConnectionUI(QWidget):
         self.interface["com_label"].setGeometry(QRect(20, 20, 31, 22))
         self.interface["com_combo"] = QComboBox(self.interface["connection_box"])
         self.interface["com_combo"].setGeometry(QRect(60, 20, 71, 22))
-        self.interface["com_combo"].addItems(sw_cfg.avail_com)
-        if sw_cfg.auth_config["SETTING"]["DEFAULT_COM"] in sw_cfg.avail_com:
-            com_id = sw_cfg.avail_com.index(sw_cfg.auth_config["SETTING"]["DEFAULT_COM"])
-            self.interface["com_combo"].setCurrentIndex(com_id)
+        self.fill_ports(sw_cfg.auth_config["SETTING"]["DEFAULT_COM"])
         # Spacer
         self.interface["spacer_1"] = QFrame(self.interface["connection_box"])
         self.interface["spacer_1"].setGeometry(QRect(140, 16, 16, 31))
         self.interface["spacer_1"].setFrameShape(QFrame.VLine)
         self.interface["spacer_1"].setFrameShadow(QFrame.Sunken)
-        # Stand №1
-        self.interface["stand_1_label"] = QLabel("№1:", self.interface["connection_box"])
-        self.interface["stand_1_label"].setGeometry(QRect(160, 20, 31, 22))
-        self.interface["stand_1_combo"] = QComboBox(self.interface["connection_box"])
-        self.interface["stand_1_combo"].setGeometry(QRect(190, 20, 71, 22))
-        self.interface["stand_1_combo"].addItem("No")
-        self.interface["stand_1_combo"].addItems(sw_cfg.git_config.sections())
-        # Stand №2
-        self.interface["stand_2_label"] = QLabel("№2:", self.interface["connection_box"])
-        self.interface["stand_2_label"].setGeometry(QRect(270, 20, 31, 22))
-        self.interface["stand_2_combo"] = QComboBox(self.interface["connection_box"])
-        self.interface["stand_2_combo"].setGeometry(QRect(300, 20, 71, 22))
-        self.interface["stand_2_combo"].addItem("No")
-        self.interface["stand_2_combo"].addItems(sw_cfg.git_config.sections())
-        # Stand №3
-        self.interface["stand_3_label"] = QLabel("№3:", self.interface["connection_box"])
-        self.interface["stand_3_label"].setGeometry(QRect(380, 20, 31, 22))
-        self.interface["stand_3_combo"] = QComboBox(self.interface["connection_box"])
-        self.interface["stand_3_combo"].setGeometry(QRect(410, 20, 71, 22))
-        self.interface["stand_3_combo"].addItem("No")
-        self.interface["stand_3_combo"].addItems(sw_cfg.git_config.sections())
-        # Stand №4
-        self.interface["stand_4_label"] = QLabel("№4:", self.interface["connection_box"])
-        self.interface["stand_4_label"].setGeometry(QRect(490, 20, 31, 22))
-        self.interface["stand_4_combo"] = QComboBox(self.interface["connection_box"])
-        self.interface["stand_4_combo"].setGeometry(QRect(520, 20, 71, 22))
-        self.interface["stand_4_combo"].addItem("No")
-        self.interface["stand_4_combo"].addItems(sw_cfg.git_config.sections())
+        # Stands, the configuration stands are checked in the drop-down list
+        self.interface["stands_label"] = QLabel("Stands:", self.interface["connection_box"])
+        self.interface["stands_label"].setGeometry(QRect(160, 20, 41, 22))
+        self.interface["stands_btn"] = QToolButton(self.interface["connection_box"])
+        self.interface["stands_btn"].setGeometry(QRect(210, 20, 381, 22))
+        self.interface["stands_btn"].setPopupMode(QToolButton.InstantPopup)
+        self.interface["stands_btn"].setToolButtonStyle(Qt.ToolButtonTextOnly)
+        self.interface["stands_btn"].setText("No")
+        self.interface["stands_list"] = QListWidget()
+        self.interface["stands_list"].itemChanged.connect(self.show_stands)
+        # The menu is not closed while the stands are checked
+        self.interface["stands_action"] = QWidgetAction(self.interface["stands_btn"])
+        self.interface["stands_action"].setDefaultWidget(self.interface["stands_list"])
+        self.interface["stands_menu"] = QMenu(self.interface["stands_btn"])
+        self.interface["stands_menu"].addAction(self.interface["stands_action"])
+        self.interface["stands_btn"].setMenu(self.interface["stands_menu"])
         # Spacer
         self.interface["spacer_2"] = QFrame(self.interface["connection_box"])
         self.interface["spacer_2"].setGeometry(QRect(600, 16, 16, 31))
@@ -89,54 +79,129 @@ class ConnectionUI(QWidget):
         self.interface["spacer_2"].setFrameShadow(QFrame.Sunken)
         # Connect/Disconnect button
         self.interface["connect_btn"] = QPushButton("Connect", self.interface["connection_box"])
-        self.interface["connect_btn"].setGeometry(QRect(620, 20, 121, 23))
+        self.interface["connect_btn"].setGeometry(QRect(620, 20, 81, 23))
         self.interface["connect_btn"].setAutoDefault(False)
         self.interface["connect_btn"].clicked.connect(self.connect_action)
         # Reset all current transformers
         self.interface["reset_btn"] = QPushButton("Reset all", self.interface["connection_box"])
         self.interface["reset_btn"].setEnabled(False)
-        self.interface["reset_btn"].setGeometry(QRect(750, 20, 121, 23))
+        self.interface["reset_btn"].setGeometry(QRect(710, 20, 81, 23))
         self.interface["reset_btn"].setAutoDefault(False)
         self.interface["reset_btn"].clicked.connect(reset_action)
+        # Polling diagnostics window
+        self.interface["diagnostics_btn"] = QPushButton("Diagnostics", self.interface["connection_box"])
+        self.interface["diagnostics_btn"].setGeometry(QRect(800, 20, 81, 23))
+        self.interface["diagnostics_btn"].setAutoDefault(False)
+        self.interface["diagnostics_btn"].clicked.connect(self.diagnostics_action)
 
         # Adding the connection settings group to the layout
         self.interface["vertical_layout"].addWidget(self.interface["connection_box"])
 
+        # Applying the changed configuration from the GitLab server
+        self.config_changed.connect(self.apply_git_config)
+
+        # Refreshing the ports available for connection, the probed ports are shown as soon as the probing completes
+        self.ports_probed.connect(self.refresh_ports)
+        self.port_timer = QTimer(self)
+        self.port_timer.timeout.connect(self.refresh_ports)
+        self.port_timer.start(int(sw_cfg.auth_config.getfloat("SETTING", "PORTS_REFRESH", fallback=2) * 1000))
+
+        # Filling in the stands if the configuration from the GitLab server has already been received
+        if sw_cfg.git_config is not None:
+            self.set_git_config()
+        else:
+            self.interface["connect_btn"].setEnabled(False)
+
+    # Filling in the ports available for connection and selecting the given port
+    def fill_ports(self, selected):
+        self.interface["com_combo"].clear()
+        self.interface["com_combo"].addItems(sw_cfg.avail_com)
+        if selected in sw_cfg.avail_com:
+            self.interface["com_combo"].setCurrentIndex(sw_cfg.avail_com.index(selected))
+
+    # Updating the ports when the devices plugged or unplugged
+    def refresh_ports(self):
+        # The ports are not changed during the connection
+        if not self.interface["com_combo"].isEnabled():
+            return
+        ports = sw_cfg.get_ports(self.ports_probed.emit)
+        if ports != sw_cfg.avail_com:
+            selected = self.interface["com_combo"].currentText() or sw_cfg.auth_config["SETTING"]["DEFAULT_COM"]
+            sw_cfg.avail_com = ports
+            self.fill_ports(selected)
+
+    # Filling in the stands of the configuration and checking the given stands
+    def fill_stands(self, selected):
+        stands_list = self.interface["stands_list"]
+        stands_list.blockSignals(True)
+        stands_list.clear()
+        for stand in sw_cfg.git_config.sections():
+            item = QListWidgetItem(stand, stands_list)
+            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if stand in selected else Qt.Unchecked)
+        stands_list.blockSignals(False)
+        row_height = stands_list.sizeHintForRow(0) if stands_list.count() else 0
+        stands_list.setFixedSize(self.interface["stands_btn"].width(),
+                                 min(stands_list.count(), STANDS_VISIBLE) * row_height + 2 * stands_list.frameWidth())
+        self.show_stands()
+
+    # Getting the checked stands in the configuration order
+    def selected_stands(self):
+        stands_list = self.interface["stands_list"]
+        return [stands_list.item(row).text() for row in range(stands_list.count())
+                if stands_list.item(row).checkState() == Qt.Checked]
+
+    # Showing the checked stands on the stands button
+    def show_stands(self):
+        stands = self.selected_stands()
+        text = ", ".join(stands) or "No"
+        metrics = self.interface["stands_btn"].fontMetrics()
+        self.interface["stands_btn"].setText(metrics.elidedText(text, Qt.ElideRight,
+                                                                self.interface["stands_btn"].width() - 12))
+        self.interface["stands_btn"].setToolTip(text)
+
+    # Actions when the configuration from the GitLab server received
+    def set_git_config(self):
+        self.fill_stands([])
+        self.interface["connect_btn"].setEnabled(True)
+        # Checking the configuration changes in the background
+        if sw_cfg.config_watcher is None:
+            sw_cfg.config_watcher = sw_cfg.get_config_watcher(sw_cfg.auth_config, self.config_changed.emit)
+            if sw_cfg.config_watcher is not None:
+                sw_cfg.config_watcher.start()
+
+    # Applying the changed configuration from the GitLab server without reconnecting
+    def apply_git_config(self, entry):
+        git_config = sw_cfg.get_git_config(entry["raw"])
+        diff = diff_config(sw_cfg.git_config, git_config)
+        sw_cfg.git_config = git_config
+        sw_cfg.git_entry = entry
+        # The configuration is received from the GitLab server, the window title does not show the offline start
+        if sw_cfg.git_offline:
+            sw_cfg.git_offline = False
+            sw_cfg.main_app.setWindowTitle(sw_cfg.program_title + " - Main window")
+        # Updating the devices and widgets of the connected stands
+        if self.stand_widget is not None:
+            self.stand_widget.apply_config(diff)
+        # Updating the stands of the connection settings keeping the selected stands
+        self.fill_stands([diff.renamed.get(stand, stand) for stand in self.selected_stands()])
+
     # Actions when the connect button pressed
     def connect_action(self):
-        # Checking stands selection when setting up the connection
-        id_list = [self.interface["stand_{0}_combo".format(x)].currentIndex()
-                   for x in range(1, 5) if self.interface["stand_{0}_combo".format(x)].currentIndex() > 0]
-        if len(id_list) != len(set(id_list)):
-            # TODO Highlighting of repeating stands in the connection settings group
-            return None
-
-        # Re-initializing the list of stands when reconnecting during one session
-        sw_cfg.stand_list = list()
-        # Setting connection to the CMRI
-        sw_cfg.cmri_dll.CMRI_PortSetParams(c_int(9600), c_int(8), c_int(0), c_int(0))
-        port = int(search(r"\d+(\.\d+)?", self.interface["com_combo"].currentText()).group(0))
-        sw_cfg.cmri_dll.CMRI_PortOpen(c_int(port))
-
-        # Setting a list of added stands based on connection settings
-        for stand in range(1, 5):
-            stand_name = self.interface["stand_{0}_combo".format(stand)].currentText()
-            if stand_name != "No":
-                sw_cfg.stand_list.append(stand_name)
+        # Connecting to the CMRI with the checked stands, the selected port serves the stands without the assigned port
+        sw_cfg.polling_connect(self.selected_stands(), self.interface["com_combo"].currentText())
 
-        # Resizing the software interface after completing the connection
-        sw_cfg.resize_window(sw_cfg.main_app, len(sw_cfg.stand_list))
-        # Adding stands to the program window
+        # Adding stands to the program window, the stand widget and the arrays are imported at the first connection
         if len(sw_cfg.stand_list):
+            from library.stand.StandUI import StandUI
             self.stand_widget = StandUI()
             self.interface["vertical_layout"].addWidget(self.stand_widget)
+        # Resizing the software interface after completing the connection
+        sw_cfg.resize_window(sw_cfg.main_app, self.stand_widget.model.rowCount() if self.stand_widget else 0)
 
         # Disabling connection settings
         self.interface["com_combo"].setEnabled(False)
-        self.interface["stand_1_combo"].setEnabled(False)
-        self.interface["stand_2_combo"].setEnabled(False)
-        self.interface["stand_3_combo"].setEnabled(False)
-        self.interface["stand_4_combo"].setEnabled(False)
+        self.interface["stands_btn"].setEnabled(False)
 
         # Switching the connect/disconnect button
         self.interface["connect_btn"].setText("Disconnect")
@@ -145,23 +210,27 @@ class ConnectionUI(QWidget):
         # Enabling the reset button for all current transformers
         self.interface["reset_btn"].setEnabled(True)
 
+    # Showing the polling diagnostics window, the window is imported when it is opened first
+    def diagnostics_action(self):
+        if self.diagnostics_widget is None:
+            from library.diagnostics.DiagnosticsUI import DiagnosticsUI
+            self.diagnostics_widget = DiagnosticsUI(self)
+        self.diagnostics_widget.show()
+        self.diagnostics_widget.raise_()
+
     # Actions when the disconnect button pressed
     def disconnect_action(self):
-        # Setting the stopping attribute of the polling thread and waiting for the completion
-        sw_cfg.polling_thread.do_run = False
-        sw_cfg.polling_thread.join()
-        # Closing the connection to the CMRI
-        sw_cfg.cmri_dll.CMRI_PortClose()
+        # Stopping the polling threads and closing the connections to the CMRI
+        sw_cfg.polling_stop()
 
         # Enabling connection settings
         self.interface["com_combo"].setEnabled(True)
-        self.interface["stand_1_combo"].setEnabled(True)
-        self.interface["stand_2_combo"].setEnabled(True)
-        self.interface["stand_3_combo"].setEnabled(True)
-        self.interface["stand_4_combo"].setEnabled(True)
+        self.interface["stands_btn"].setEnabled(True)
 
         # Removing previously added stands and updating the size of the program window
-        self.stand_widget.deleteLater()
+        if self.stand_widget is not None:
+            self.stand_widget.deleteLater()
+            self.stand_widget = None
         sw_cfg.resize_window(sw_cfg.main_app, 0)
 
         # Switching the connect/disconnect button
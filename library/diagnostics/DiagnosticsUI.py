@@ -0,0 +1,144 @@
+# Software configuration
+from library import config as sw_cfg
+# Summary of the polling metrics
+from library.polling.metrics import snapshot
+
+# Exporting the snapshot
+from json import dump
+# PyQt5 modules
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QPushButton,
+                             QFileDialog, QHeaderView)
+
+# Columns of the ports and stands table
+CYCLE_COLUMNS = ("Port", "Stand", "Samples/s", "Cycle, ms", "Mean, ms", "Max, ms", "Timeouts", "Absent")
+# Columns of the addresses table
+ADDRESS_COLUMNS = ("Port", "Address", "Reads", "Mean, ms", "P95, ms", "Max, ms", "Timeouts", "Absent")
+
+
+def fill_table(table, rows):
+    """
+    Filling in the table with the rows of values
+
+    Args:
+        :param table: Table widget
+        :type table: QTableWidget
+        :param rows: Values of every row
+        :type rows: list
+
+    Returns:
+        :return: None
+    """
+
+    table.setRowCount(len(rows))
+    for row, values in enumerate(rows):
+        for column, value in enumerate(values):
+            text = "{0:.2f}".format(value) if isinstance(value, float) else str(value)
+            item = table.item(row, column)
+            if item is None:
+                table.setItem(row, column, QTableWidgetItem(text))
+            elif item.text() != text:
+                item.setText(text)
+
+
+class DiagnosticsUI(QWidget):
+    """
+    Diagnostics window with the polling metrics of every port, stand and address
+
+    The polling is measured while the window is open or from the connection with [DIAGNOSTICS] ENABLED = yes.
+    """
+
+    def __init__(self, parent=None):
+        super(DiagnosticsUI, self).__init__(parent)
+        # Separate window closed together with the program window
+        self.setWindowFlags(Qt.Window)
+        self.setWindowTitle(sw_cfg.program_title + " - Diagnostics")
+        self.resize(720, 560)
+
+        layout = QVBoxLayout(self)
+        self.summary = QLabel(self)
+        layout.addWidget(self.summary)
+        self.cycle_table = QTableWidget(0, len(CYCLE_COLUMNS), self)
+        self.cycle_table.setHorizontalHeaderLabels(CYCLE_COLUMNS)
+        self.cycle_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.cycle_table, 1)
+        self.address_table = QTableWidget(0, len(ADDRESS_COLUMNS), self)
+        self.address_table.setHorizontalHeaderLabels(ADDRESS_COLUMNS)
+        self.address_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.address_table, 3)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        self.clear_btn = QPushButton("Clear", self)
+        self.clear_btn.setAutoDefault(False)
+        self.clear_btn.clicked.connect(self.clear_action)
+        buttons.addWidget(self.clear_btn)
+        self.export_btn = QPushButton("Export...", self)
+        self.export_btn.setAutoDefault(False)
+        self.export_btn.clicked.connect(self.export_action)
+        buttons.addWidget(self.export_btn)
+        layout.addLayout(buttons)
+
+        # Refreshing the metrics while the window is open
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_interval = int(sw_cfg.auth_config.getfloat("DIAGNOSTICS", "REFRESH", fallback=1) * 1000)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start(self.refresh_interval)
+
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        # Stopping the measuring started by the window
+        if not sw_cfg.auth_config.getboolean("DIAGNOSTICS", "ENABLED", fallback=False):
+            sw_cfg.set_diagnostics(False)
+
+    # Showing the metrics of the running polling threads
+    def refresh(self):
+        # The polling threads started after the window opened are measured as well
+        sw_cfg.set_diagnostics(True)
+        ports = snapshot(sw_cfg.polling_threads)["ports"]
+
+        cycle_rows = list()
+        address_rows = list()
+        for port, summary in ports.items():
+            cycles = summary["cycles"]
+            cycle_rows.append((port, "", summary["samples_per_s"], summary["last_cycle"], cycles["mean"],
+                               cycles["max"], summary["timeouts"], summary["absent"]))
+            for stand, stand_cycles in summary["stands"].items():
+                cycle_rows.append(("", stand, "", "", stand_cycles["mean"], stand_cycles["max"], "", ""))
+            for address, reads in summary["addresses"].items():
+                address_rows.append((port, address, reads["count"], reads["mean"], reads["p95"], reads["max"],
+                                     reads["timeouts"], reads["absent"]))
+        fill_table(self.cycle_table, cycle_rows)
+        fill_table(self.address_table, address_rows)
+
+        samples = sum(x["samples_per_s"] for x in ports.values())
+        summary = "Ports: {0}, samples per second: {1:.1f}, timeouts: {2}, absent: {3}".format(
+            len(ports), samples, sum(x["timeouts"] for x in ports.values()), sum(x["absent"] for x in ports.values()))
+        suppressed = sum(x["deadband"]["suppressed"] for x in ports.values() if x["deadband"] is not None)
+        if suppressed:
+            summary += ", within deadbands: {0}".format(suppressed)
+        # Ports that can not meet the target refresh period with the maximum bus utilization
+        for port, summary_port in ports.items():
+            schedule = summary_port["schedule"]
+            if not schedule["feasible"]:
+                summary += "\nSchedule of {0} is infeasible: load {1:.0%} exceeds utilization {2:.0%}".format(
+                    port, schedule["load"], schedule["utilization"])
+            if summary_port["restarts"]:
+                summary += "\nWorker process of {0} restarted: {1}".format(port, summary_port["restarts"])
+        self.summary.setText(summary)
+
+    # Discarding the collected metrics
+    def clear_action(self):
+        sw_cfg.set_diagnostics(False)
+        self.refresh()
+
+    # Exporting the snapshot of the metrics to the JSON file
+    def export_action(self):
+        path = QFileDialog.getSaveFileName(self, "Export diagnostics", "diagnostics.json", "JSON (*.json)")[0]
+        if not path:
+            return
+        with open(path, "w", encoding="utf-8") as snapshot_file:
+            dump(snapshot(sw_cfg.polling_threads), snapshot_file, indent=2)
@@ -0,0 +1,106 @@
+# Reading and writing the cached configuration
+from json import dump, load
+from os import makedirs, replace
+from os.path import dirname, join
+# Safe file names of the GitLab servers
+from re import sub
+
+# Directory of the cached configurations
+CACHE_DIR = join("cache", "git")
+
+
+def cache_path(server, project_id):
+    """
+    Getting the path to the cached configuration of the project
+
+    Args:
+        :param server: GitLab server URL
+        :type server: str
+        :param project_id: Project ID
+        :type project_id: str
+
+    Returns:
+        :return: Path to the cache file
+        :rtype: str
+    """
+
+    return join(CACHE_DIR, "{0}_{1}.json".format(sub(r"[^A-Za-z0-9]+", "_", server).strip("_"), project_id))
+
+
+def load_cached(path):
+    """
+    Reading the cached configuration
+
+    Args:
+        :param path: Path to the cache file
+        :type path: str
+
+    Returns:
+        :return: Cached configuration {"project", "ref", "commit", "blob_id", "raw"} or None
+        :rtype: dict
+    """
+
+    try:
+        with open(path, encoding="utf-8") as cache_file:
+            return load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached(path, entry):
+    """
+    Writing the cached configuration
+
+    Args:
+        :param path: Path to the cache file
+        :type path: str
+        :param entry: Cached configuration
+        :type entry: dict
+
+    Returns:
+        :return: None
+    """
+
+    makedirs(dirname(path), exist_ok=True)
+    # Writing the temporary file first, an interrupted write keeps the last known good configuration
+    with open(path + ".tmp", "w", encoding="utf-8") as cache_file:
+        dump(entry, cache_file, indent=2)
+    replace(path + ".tmp", path)
+
+
+def revalidate(project, cached, ref="master", file_path="config.ini"):
+    """
+    Getting the configuration from the GitLab server, downloading it only if it was changed
+
+    The latest commit of the configuration file is requested first, the file is downloaded only
+    when the commit differs from the cached one.
+
+    Args:
+        :param project: GitLab project
+        :type project: gitlab.v4.objects.Project
+        :param cached: Cached configuration or None
+        :type cached: dict
+        :param ref: Branch name
+        :type ref: str
+        :param file_path: Path to the configuration file in the repository
+        :type file_path: str
+
+    Returns:
+        :return: Actual configuration, the cached one if it was not changed
+        :rtype: dict
+    """
+
+    # The latest commit changing the configuration file, "path" is passed in the query data because
+    # the keyword argument of the same name overrides the request URL. python-gitlab 1.5 has no
+    # query_parameters, and the later versions drop the other keyword arguments beside it
+    commits = project.commits.list(per_page=1, query_data={"ref_name": ref, "path": file_path})
+    if not commits:
+        raise FileNotFoundError("{0} not found in the {1} branch".format(file_path, ref))
+    commit = commits[0].id
+    if cached is not None and cached.get("ref") == ref and cached.get("commit") == commit:
+        return cached
+
+    # Downloading the configuration of the commit
+    config_file = project.files.get(file_path=file_path, ref=commit)
+    return {"project": str(project.id), "ref": ref, "commit": commit, "blob_id": config_file.blob_id,
+            "raw": config_file.decode().decode("utf-8")}
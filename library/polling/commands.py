@@ -0,0 +1,93 @@
+# Prioritized order of the pending commands
+from heapq import heappush, heappop, heapify
+# Order of the commands with the same priority
+from itertools import count
+# Commands are queued by the GUI and the commands threads and executed by the polling thread
+from threading import Lock
+# Queued command
+from collections import namedtuple
+
+# Broadcast address of the CMRI bus
+BROADCAST = 0
+# Priority of every command, the lower priority is executed first,
+# the command is the name of the CmriBackend method called with the address
+PRIORITIES = {"reset": 0}
+
+# Command of the polling thread
+Command = namedtuple("Command", ["name", "address"])
+
+
+class CommandQueue(object):
+    """
+    Prioritized commands executed by the polling thread between the device reads
+
+    The command that is already pending is coalesced. The broadcast command replaces the pending
+    commands of the same name and covers the commands of the same name queued after it.
+    """
+
+    def __init__(self):
+        # Pending entries [priority, order, command]
+        self._heap = list()
+        self._pending = set()
+        self._order = count()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def put(self, name, address=BROADCAST):
+        """
+        Queuing the command
+
+        Args:
+            :param name: Command name, the key of PRIORITIES
+            :type name: str
+            :param address: Address of the current transformer, 0 - broadcast address
+            :type address: int
+
+        Returns:
+            :return: The command is queued, False if it is coalesced with the pending command
+            :rtype: bool
+        """
+
+        if name not in PRIORITIES:
+            raise ValueError("Unknown command: {0}".format(name))
+        command = Command(name, address)
+        with self._lock:
+            if command in self._pending or Command(name, BROADCAST) in self._pending:
+                return False
+            if address == BROADCAST:
+                self._heap = [entry for entry in self._heap if entry[2].name != name]
+                heapify(self._heap)
+                self._pending = {entry[2] for entry in self._heap}
+            heappush(self._heap, [PRIORITIES[name], next(self._order), command])
+            self._pending.add(command)
+            return True
+
+    def get(self):
+        """
+        Taking the pending command with the highest priority
+
+        Returns:
+            :return: Command, None without the pending commands
+            :rtype: Command
+        """
+
+        with self._lock:
+            if not self._heap:
+                return None
+            command = heappop(self._heap)[2]
+            self._pending.discard(command)
+            return command
+
+    def clear(self):
+        """
+        Discarding the pending commands
+
+        Returns:
+            :return: None
+        """
+
+        with self._lock:
+            self._heap = list()
+            self._pending = set()
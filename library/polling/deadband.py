@@ -0,0 +1,81 @@
+class DeadbandFilter(object):
+    """
+    Change detection of the readings of one COM-port with the deadband of every channel
+
+    The reading is passed on when the presence or the status changed, when any voltage, current or the temperature
+    moved beyond its deadband from the last passed reading of the device, or when the last passed reading is older
+    than the maximum age. The slow drift is passed on as soon as it exceeds the deadband.
+    """
+
+    def __init__(self, voltage=0.0, current=0.0, temp=0.0, max_age=0.0):
+        """
+        Args:
+            :param voltage: Deadband of the phase voltage, V
+            :type voltage: float
+            :param current: Deadband of the phase current, A
+            :type current: float
+            :param temp: Deadband of the temperature, °C
+            :type temp: float
+            :param max_age: The reading is passed on at least once per this interval, s, 0 - only the changes
+            :type max_age: float
+        """
+
+        self.voltage = voltage
+        self.current = current
+        self.temp = temp
+        self.max_age = max_age
+        # Last passed reading of every device {index: Reading}
+        self._last = dict()
+        # Passed and suppressed readings
+        self.passed = 0
+        self.suppressed = 0
+
+    def changed(self, reading):
+        """
+        Checking whether the reading differs from the last passed reading of the device, the passed reading is kept
+
+        Args:
+            :param reading: Readings of the current transformer
+            :type reading: library.polling.poller.Reading
+
+        Returns:
+            :return: The reading is passed on
+            :rtype: bool
+        """
+
+        last = self._last.get(reading.index)
+        if (last is None or last.present != reading.present or not reading.present or last.status != reading.status
+                or (self.max_age and reading.time - last.time >= self.max_age)
+                or abs(reading.temp - last.temp) > self.temp
+                or any(abs(x - y) > self.voltage for x, y in zip(reading.voltage, last.voltage))
+                or any(abs(x - y) > self.current for x, y in zip(reading.current, last.current))):
+            self._last[reading.index] = reading
+            self.passed += 1
+            return True
+        self.suppressed += 1
+        return False
+
+    def forget(self, index):
+        """
+        Discarding the last passed reading of the device, its next reading is passed on
+
+        Args:
+            :param index: Index of the device in the device table
+            :type index: int
+
+        Returns:
+            :return: None
+        """
+
+        self._last.pop(index, None)
+
+    def status(self):
+        """
+        Getting the summary of the filter
+
+        Returns:
+            :return: {"passed", "suppressed"}
+            :rtype: dict
+        """
+
+        return {"passed": self.passed, "suppressed": self.suppressed}
@@ -0,0 +1,295 @@
+# Lock-free queue of the readings to send
+from collections import deque
+# JSON lines of the subscribers
+from json import dumps
+# Local TCP server
+import socket
+import selectors
+# Time of the messages
+from time import time, monotonic
+# Threading interface
+from threading import Thread, Event
+
+# Bytes received from the subscriber at once, the received data is discarded
+RECEIVE_SIZE = 4096
+# Send buffer of the subscriber connection, bytes, the small buffer keeps the slow subscriber close to the latest state
+SEND_BUFFER = 65536
+
+
+def reading_record(device, reading):
+    """
+    Representing the reading of the device as a JSON-compatible dictionary
+
+    Args:
+        :param device: Device of the current transformer
+        :type device: library.polling.table.Device
+        :param reading: Readings of the current transformer
+        :type reading: library.polling.poller.Reading
+
+    Returns:
+        :return: {"time", "stand", "place", "address", "present", "status", "voltage", "current", "temp"}
+        :rtype: dict
+    """
+
+    return {"time": round(reading.time, 3), "stand": device.stand, "place": device.place,
+            "address": format(device.address, "X"), "present": reading.present,
+            "status": reading.status if reading.present else None, "voltage": reading.voltage,
+            "current": reading.current, "temp": reading.temp}
+
+
+class Subscriber(object):
+    """
+    Connection of the read-only subscriber with its unsent output
+    """
+
+    __slots__ = ("connection", "address", "output", "stale")
+
+    def __init__(self, connection, address):
+        self.connection = connection
+        self.address = address
+        self.output = bytearray()
+        # The subscriber missed the deltas and gets the full state when its output is sent
+        self.stale = True
+
+
+class FanoutServer(Thread):
+    """
+    Local TCP server streaming the readings to any number of read-only subscribers as JSON lines
+
+    The polling threads only append the readings to the queue. Every send interval the server thread sends
+    the readings changed since the previous interval as {"type": "delta", "time", "readings": [...]}.
+    The new subscriber, and the subscriber that has not received its previous output yet, gets the full state
+    {"type": "snapshot", "time", "seats": [...], "readings": [...]} instead of the deltas, so the slow subscriber
+    drops to the latest state and its unsent output never exceeds one message.
+    """
+
+    def __init__(self, devices, host="127.0.0.1", port=8765, interval=0.2):
+        """
+        Args:
+            :param devices: Devices in the polling order
+            :type devices: list
+            :param host: Listening address, the local address by default
+            :type host: str
+            :param port: Listening TCP port, 0 - any free port
+            :type port: int
+            :param interval: Interval between the messages, s
+            :type interval: float
+
+        Raises:
+            OSError: The port can not be listened
+        """
+
+        super(FanoutServer, self).__init__(daemon=True)
+        self.set_devices(devices)
+        self.interval = interval
+        self.queue = deque()
+        # Latest reading of every device {index: Reading} and the indices changed since the previous message
+        self.latest = dict()
+        self._changed = set()
+        self.subscribers = dict()
+        self._selector = selectors.DefaultSelector()
+        self._socket = socket.create_server((host, port))
+        self._socket.setblocking(False)
+        self._selector.register(self._socket, selectors.EVENT_READ)
+        # Listening address, the port is known after binding
+        self.address = self._socket.getsockname()
+        self._stop_event = Event()
+
+    def set_devices(self, devices):
+        """
+        Setting the devices of the reading indices, the list is replaced
+
+        Args:
+            :param devices: Devices in the polling order
+            :type devices: list
+
+        Returns:
+            :return: None
+        """
+
+        self.devices = list(devices)
+
+    def publish(self, reading):
+        """
+        Queueing the reading for sending, called from the polling threads
+
+        Args:
+            :param reading: Readings of the current transformer
+            :type reading: library.polling.poller.Reading
+
+        Returns:
+            :return: None
+        """
+
+        self.queue.append(reading)
+
+    def stop(self):
+        """
+        Stopping the server thread and closing the connections
+
+        Returns:
+            :return: None
+        """
+
+        self._stop_event.set()
+        self.join()
+
+    def run(self):
+        try:
+            next_send = monotonic()
+            while not self._stop_event.is_set():
+                # Accepting the subscribers and sending the output until the next message
+                for key, events in self._selector.select(max(next_send - monotonic(), 0)):
+                    if key.fileobj is self._socket:
+                        self.accept()
+                        continue
+                    if events & selectors.EVENT_READ:
+                        self.receive(key.data)
+                    if events & selectors.EVENT_WRITE and key.fileobj in self.subscribers:
+                        self.send(key.data)
+                if monotonic() >= next_send:
+                    self.broadcast()
+                    next_send = monotonic() + self.interval
+        finally:
+            for subscriber in list(self.subscribers.values()):
+                self.close(subscriber)
+            self._selector.unregister(self._socket)
+            self._socket.close()
+            self._selector.close()
+
+    def accept(self):
+        """
+        Accepting the new subscriber, it gets the full state with the next message
+
+        Returns:
+            :return: None
+        """
+
+        try:
+            connection, address = self._socket.accept()
+        except BlockingIOError:
+            return
+        connection.setblocking(False)
+        connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        subscriber = Subscriber(connection, address)
+        self.subscribers[connection] = subscriber
+        self._selector.register(connection, selectors.EVENT_READ, subscriber)
+
+    def receive(self, subscriber):
+        """
+        Discarding the data received from the read-only subscriber, the closed connection is removed
+
+        Args:
+            :param subscriber: Subscriber
+            :type subscriber: Subscriber
+
+        Returns:
+            :return: None
+        """
+
+        try:
+            data = subscriber.connection.recv(RECEIVE_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.close(subscriber)
+
+    def send(self, subscriber):
+        """
+        Sending the unsent output of the subscriber without blocking
+
+        Args:
+            :param subscriber: Subscriber
+            :type subscriber: Subscriber
+
+        Returns:
+            :return: None
+        """
+
+        try:
+            sent = subscriber.connection.send(subscriber.output)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self.close(subscriber)
+            return
+        del subscriber.output[:sent]
+        # Waiting for the socket to be writable only while the output is not sent
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if subscriber.output else 0)
+        self._selector.modify(subscriber.connection, events, subscriber)
+
+    def close(self, subscriber):
+        """
+        Closing the connection of the subscriber
+
+        Args:
+            :param subscriber: Subscriber
+            :type subscriber: Subscriber
+
+        Returns:
+            :return: None
+        """
+
+        self.subscribers.pop(subscriber.connection, None)
+        self._selector.unregister(subscriber.connection)
+        subscriber.connection.close()
+
+    def message(self, message_type, indices):
+        """
+        Encoding the message with the latest readings of the devices
+
+        Args:
+            :param message_type: "snapshot" or "delta"
+            :type message_type: str
+            :param indices: Indices of the devices
+            :type indices: iterable
+
+        Returns:
+            :return: JSON line
+            :rtype: bytes
+        """
+
+        devices = self.devices
+        message = {"type": message_type, "time": round(time(), 3)}
+        if message_type == "snapshot":
+            message["seats"] = [{"stand": x.stand, "place": x.place, "address": format(x.address, "X")}
+                                for x in devices if x.active]
+        message["readings"] = [reading_record(devices[index], self.latest[index]) for index in sorted(indices)
+                               if index < len(devices) and devices[index].active]
+        return (dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def broadcast(self):
+        """
+        Sending the changed readings to the subscribers, the stale subscribers get the full state
+
+        Returns:
+            :return: None
+        """
+
+        queue = self.queue
+        while queue:
+            reading = queue.popleft()
+            self.latest[reading.index] = reading
+            self._changed.add(reading.index)
+        delta = None
+        snapshot = None
+        for subscriber in list(self.subscribers.values()):
+            # The subscriber has not received the previous output, the deltas are dropped
+            if subscriber.output:
+                subscriber.stale = True
+                continue
+            if subscriber.stale:
+                if snapshot is None:
+                    snapshot = self.message("snapshot", self.latest)
+                subscriber.output += snapshot
+                subscriber.stale = False
+            elif self._changed:
+                if delta is None:
+                    delta = self.message("delta", self._changed)
+                subscriber.output += delta
+            else:
+                continue
+            self.send(subscriber)
+        self._changed = set()
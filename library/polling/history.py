@@ -0,0 +1,168 @@
+# Ring buffers of the readings history
+import numpy as np
+
+# Channels of the history in the order of the buffer columns
+CHANNELS = ("V1", "V2", "V3", "I1", "I2", "I3", "T", "S")
+# Aggregates of the downsampling tiers in the order of the buffer columns
+AGGREGATES = ("min", "max", "mean")
+
+
+class History(object):
+    """
+    Readings history of every device in the ring buffers with downsampling
+
+    Tier 0 keeps the raw samples, every next tier keeps the min/max/mean of the samples in the buckets
+    of the given period. All buffers are the views of one preallocated block, unwritten slots are NaN.
+    """
+
+    def __init__(self, size, raw=300, tiers=((1.0, 900), (60.0, 720))):
+        """
+        Args:
+            :param size: The number of devices
+            :type size: int
+            :param raw: Capacity of the raw samples buffer of every device
+            :type raw: int
+            :param tiers: Bucket period, s and capacity of every downsampling tier
+            :type tiers: list
+        """
+
+        self.size = size
+        self.periods = [0.0] + [float(period) for period, capacity in tiers]
+        self.capacities = [raw] + [capacity for period, capacity in tiers]
+        self._allocate(size)
+
+    def _allocate(self, size):
+        """
+        Allocating the block of the buffers of the given number of devices
+
+        Args:
+            :param size: The number of devices
+            :type size: int
+
+        Returns:
+            :return: None
+        """
+
+        raw = self.capacities[0]
+        tiers = len(self.capacities) - 1
+        channels = len(CHANNELS)
+        aggregates = len(AGGREGATES)
+
+        # Layout of the block: (dtype, shape) of every buffer
+        layout = [(np.float64, (size, raw)), (np.float32, (size, raw, channels))]
+        for capacity in self.capacities[1:]:
+            layout += [(np.float64, (size, capacity)), (np.float32, (size, capacity, channels, aggregates))]
+        # Bucket accumulators of the tiers: bucket number, min, max, sum and count of every channel
+        layout += [(np.float64, (tiers, size)), (np.float64, (tiers, size, channels, 4))]
+        nbytes = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for dtype, shape in layout)
+        self.block = np.empty(nbytes, dtype=np.uint8)
+
+        views = list()
+        offset = 0
+        for dtype, shape in layout:
+            view = np.ndarray(shape, dtype=dtype, buffer=self.block, offset=offset)
+            view[...] = np.nan
+            views.append(view)
+            offset += view.nbytes
+        # Timestamps and values of every tier
+        self.times = views[0:-2:2]
+        self.values = views[1:-2:2]
+        self._bucket, self._acc = views[-2:]
+        # Position of the next write of every device in every tier
+        self.positions = np.zeros((len(self.capacities), size), dtype=np.int64)
+
+    def resize(self, size):
+        """
+        Changing the number of devices keeping the history of the remaining devices
+
+        Args:
+            :param size: The number of devices
+            :type size: int
+
+        Returns:
+            :return: None
+        """
+
+        times, values, bucket, acc, positions = self.times, self.values, self._bucket, self._acc, self.positions
+        count = min(size, self.size)
+        self.size = size
+        self._allocate(size)
+        for new, old in zip(self.times + self.values, times + values):
+            new[:count] = old[:count]
+        self._bucket[:, :count] = bucket[:, :count]
+        self._acc[:, :count] = acc[:, :count]
+        self.positions[:, :count] = positions[:, :count]
+
+    def append(self, index, timestamp, row):
+        """
+        Appending the sample of the device
+
+        Args:
+            :param index: Index of the device in the device table
+            :type index: int
+            :param timestamp: Time of the sample, s since the epoch
+            :type timestamp: float
+            :param row: Values of the sample in the order of CHANNELS
+            :type row: list
+
+        Returns:
+            :return: None
+        """
+
+        positions = self.positions
+        # Raw samples
+        slot = positions[0, index] % self.capacities[0]
+        self.times[0][index, slot] = timestamp
+        self.values[0][index, slot] = row
+        positions[0, index] += 1
+
+        # Downsampling tiers
+        for tier in range(1, len(self.capacities)):
+            acc = self._acc[tier - 1, index]
+            bucket = timestamp // self.periods[tier]
+            if self._bucket[tier - 1, index] != bucket:
+                # Flushing the completed bucket into the ring buffer of the tier
+                if acc[0, 3] > 0:
+                    slot = positions[tier, index] % self.capacities[tier]
+                    self.times[tier][index, slot] = self._bucket[tier - 1, index] * self.periods[tier]
+                    self.values[tier][index, slot, :, 0] = acc[:, 0]
+                    self.values[tier][index, slot, :, 1] = acc[:, 1]
+                    self.values[tier][index, slot, :, 2] = acc[:, 2] / acc[:, 3]
+                    positions[tier, index] += 1
+                self._bucket[tier - 1, index] = bucket
+                acc[:, 0] = row
+                acc[:, 1] = row
+                acc[:, 2] = row
+                acc[:, 3] = 1
+                continue
+            acc[:, 0] = np.fmin(acc[:, 0], row)
+            acc[:, 1] = np.fmax(acc[:, 1], row)
+            acc[:, 2] += row
+            acc[:, 3] += 1
+
+    def trend(self, indices, channel, tier=0, samples=60):
+        """
+        Getting the latest samples of the devices
+
+        Args:
+            :param indices: Indices of the devices in the device table, e.g. all devices of a stand
+            :type indices: list
+            :param channel: Channel name from CHANNELS
+            :type channel: str
+            :param tier: Tier number, 0 - raw samples
+            :type tier: int
+            :param samples: The number of the latest samples
+            :type samples: int
+
+        Returns:
+            :return: Timestamps (devices x samples) and values (devices x samples, or devices x samples x
+                     AGGREGATES for the downsampling tiers) in the chronological order, NaN for the missing samples
+            :rtype: tuple
+        """
+
+        indices = np.asarray(indices, dtype=np.int64)
+        samples = min(samples, self.capacities[tier])
+        # Ring buffer slots of the latest samples of every device
+        slots = (self.positions[tier, indices, None] - samples + np.arange(samples)) % self.capacities[tier]
+        rows = indices[:, None]
+        return self.times[tier][rows, slots], self.values[tier][rows, slots, CHANNELS.index(channel)]
@@ -0,0 +1,248 @@
+# Histogram buckets lookup
+from bisect import bisect_left
+# Snapshot time and the collection duration
+from time import time, monotonic
+# Snapshot taken by the GUI thread while the polling thread records
+from threading import Lock
+
+# Upper edges of the latency histogram buckets, s, the last bucket has no upper edge
+BUCKETS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+
+class Histogram(object):
+    """
+    Latency histogram with the fixed logarithmic buckets
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        """
+        Counting the duration
+
+        Args:
+            :param seconds: Duration, s
+            :type seconds: float
+
+        Returns:
+            :return: None
+        """
+
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """
+        Getting the upper edge of the bucket containing the given fraction of the durations
+
+        Args:
+            :param fraction: Fraction of the durations, e.g. 0.95
+            :type fraction: float
+
+        Returns:
+            :return: Upper estimate of the percentile, s, the maximum for the last bucket, 0 without durations
+            :rtype: float
+        """
+
+        rank = fraction * self.count
+        counted = 0
+        for edge, count in zip(BUCKETS, self.counts):
+            counted += count
+            if counted >= rank and counted:
+                return min(edge, self.max)
+        return self.max
+
+    def snapshot(self):
+        """
+        Getting the summary of the histogram
+
+        Returns:
+            :return: {"count", "mean", "p95", "max", "histogram"}, durations in ms
+            :rtype: dict
+        """
+
+        return {"count": self.count, "mean": self.total / self.count * 1000 if self.count else 0.0,
+                "p95": self.percentile(0.95) * 1000, "max": self.max * 1000, "histogram": list(self.counts)}
+
+
+class PollMetrics(object):
+    """
+    Instrumentation of the polling thread of one COM-port
+
+    The polling thread records every bus call, the absent seats and the completed cycles,
+    any thread takes the snapshot. The polling thread without the metrics does not measure anything.
+    """
+
+    def __init__(self):
+        self.started = monotonic()
+        # Latency of every operation and of the read of every address
+        self.operations = dict()
+        self.addresses = dict()
+        # Unanswered reads and absent seats of every address
+        self.timeouts = dict()
+        self.absent = dict()
+        # Time of every stand in the current cycle and the cycle time of every stand and of the port
+        self._stand_time = dict()
+        self.stands = dict()
+        self.cycles = Histogram()
+        self.last_cycle = 0.0
+        # Successful reads, in total and in the last completed cycle
+        self.samples = 0
+        self.last_samples = 0
+        self._cycle_samples = 0
+        self._lock = Lock()
+
+    def _operation(self, name):
+        histogram = self.operations.get(name)
+        if histogram is None:
+            histogram = self.operations[name] = Histogram()
+        return histogram
+
+    def record_read(self, device, seconds, answered):
+        """
+        Recording the read of the current transformer
+
+        Args:
+            :param device: Device of the current transformer
+            :type device: library.polling.table.Device
+            :param seconds: Duration of the read, s
+            :type seconds: float
+            :param answered: The current transformer answered
+            :type answered: bool
+
+        Returns:
+            :return: None
+        """
+
+        address = device.address
+        with self._lock:
+            self._operation("read").add(seconds)
+            histogram = self.addresses.get(address)
+            if histogram is None:
+                histogram = self.addresses[address] = Histogram()
+            histogram.add(seconds)
+            self._stand_time[device.stand] = self._stand_time.get(device.stand, 0.0) + seconds
+            if answered:
+                self.samples += 1
+                self._cycle_samples += 1
+            else:
+                self.timeouts[address] = self.timeouts.get(address, 0) + 1
+
+    def record_call(self, operation, seconds):
+        """
+        Recording the call not related to the device, e.g. the reset or the idle time
+
+        Args:
+            :param operation: Operation name
+            :type operation: str
+            :param seconds: Duration of the call, s
+            :type seconds: float
+
+        Returns:
+            :return: None
+        """
+
+        with self._lock:
+            self._operation(operation).add(seconds)
+
+    def record_absent(self, device):
+        """
+        Recording the current transformer that became absent
+
+        Args:
+            :param device: Device of the current transformer
+            :type device: library.polling.table.Device
+
+        Returns:
+            :return: None
+        """
+
+        with self._lock:
+            self.absent[device.address] = self.absent.get(device.address, 0) + 1
+
+    def end_cycle(self, seconds):
+        """
+        Recording the completed polling cycle
+
+        Args:
+            :param seconds: Duration of the cycle, s
+            :type seconds: float
+
+        Returns:
+            :return: None
+        """
+
+        with self._lock:
+            self.cycles.add(seconds)
+            self.last_cycle = seconds
+            self.last_samples = self._cycle_samples
+            self._cycle_samples = 0
+            for stand, stand_time in self._stand_time.items():
+                histogram = self.stands.get(stand)
+                if histogram is None:
+                    histogram = self.stands[stand] = Histogram()
+                histogram.add(stand_time)
+            self._stand_time = dict()
+
+    def snapshot(self):
+        """
+        Getting the summary of the metrics
+
+        Returns:
+            :return: Summary of the port, durations in ms except the elapsed time in s, addresses in hex
+            :rtype: dict
+        """
+
+        with self._lock:
+            elapsed = monotonic() - self.started
+            addresses = dict()
+            for address, histogram in sorted(self.addresses.items()):
+                summary = histogram.snapshot()
+                summary["timeouts"] = self.timeouts.get(address, 0)
+                summary["absent"] = self.absent.get(address, 0)
+                addresses[format(address, "X")] = summary
+            return {"elapsed": elapsed,
+                    "samples": self.samples,
+                    "samples_per_s": self.samples / elapsed if elapsed else 0.0,
+                    "cycle_samples_per_s": self.last_samples / self.last_cycle if self.last_cycle else 0.0,
+                    "last_cycle": self.last_cycle * 1000,
+                    "timeouts": sum(self.timeouts.values()),
+                    "absent": sum(self.absent.values()),
+                    "cycles": self.cycles.snapshot(),
+                    "stands": {stand: x.snapshot() for stand, x in self.stands.items()},
+                    "operations": {name: x.snapshot() for name, x in self.operations.items()},
+                    "addresses": addresses}
+
+
+def snapshot(polling_threads):
+    """
+    Getting the summary of the metrics of all polling threads with the metrics
+
+    Args:
+        :param polling_threads: Polling thread of every COM-port
+        :type polling_threads: dict
+
+    Returns:
+        :return: {"time", "buckets_ms", "ports": {port: summary with the schedule, deadband and restarts}}
+        :rtype: dict
+    """
+
+    ports = dict()
+    for port, thread in polling_threads.items():
+        metrics = thread.metrics
+        if metrics is not None:
+            ports[port] = metrics.snapshot()
+            ports[port]["schedule"] = thread.scheduler.status()
+            ports[port]["deadband"] = thread.deadband.status() if thread.deadband is not None else None
+            # Restarts of the worker process, the polling thread of the application process is not restarted
+            ports[port]["restarts"] = getattr(thread, "restarts", 0)
+    return {"time": time(), "buckets_ms": [edge * 1000 for edge in BUCKETS], "ports": ports}
@@ -0,0 +1,248 @@
+# Readings of the current transformer
+from library.bus.backend import CmriSnapshot
+# Discovery of the live addresses
+from library.bus.discovery import discover, get_live
+# Device table
+from library.polling.table import stand_devices
+# Commands executed between the device reads
+from library.polling.commands import CommandQueue, BROADCAST
+# Deadlines of the device reads
+from library.polling.scheduler import PollScheduler
+
+# Immutable readings published by the polling thread
+from collections import namedtuple
+# Waiting for the deadline of the next read
+from time import sleep, monotonic, time, perf_counter
+# Threading interface
+from threading import Thread
+
+# Maximum sleep of the idle polling thread, s, the stop and the commands are checked after it
+IDLE_STEP = 0.05
+
+# Readings of one current transformer, index is the index of the device in the device table,
+# voltage and current are tuples of three phases, the absent seat is published with present = False and None readings,
+# time is the time of the reading, s since the epoch
+Reading = namedtuple("Reading", ["index", "present", "status", "voltage", "current", "temp", "time"])
+
+
+class BusPoller(Thread):
+    """
+    Current transformer polling thread of one COM-port
+
+    The thread does not touch the GUI, every reading is passed to the listeners as an immutable Reading.
+    The devices are read at the deadlines of the scheduler, the absent seats are re-probed in the idle time.
+    The polling is stopped by do_run = False, the commands queued by any thread, e.g. reset(), are executed
+    before the next device read and the polling continues with that device.
+    """
+
+    def __init__(self, bus, port, devices, presence, live_index, listeners, scheduler=None, metrics=None,
+                 deadband=None):
+        """
+        Args:
+            :param bus: CMRI bus backend with the opened port
+            :type bus: library.bus.backend.CmriBackend
+            :param port: COM-port name
+            :type port: str
+            :param devices: Devices of the stands connected to the port in the polling order
+            :type devices: list
+            :param presence: Presence tracker of the port
+            :type presence: library.polling.presence.PresenceTracker
+            :param live_index: Live-address index
+            :type live_index: dict
+            :param listeners: Callables receiving every Reading, they are called from the polling thread
+                              and must not block it, e.g. deque.append
+            :type listeners: list
+            :param scheduler: Schedule of the reads, None - reading as fast as possible
+            :type scheduler: library.polling.scheduler.PollScheduler
+            :param metrics: Instrumentation of the polling, None - not measured, it can be set while polling
+            :type metrics: library.polling.metrics.PollMetrics
+            :param deadband: Change detection of the readings, None - every reading is passed to the listeners
+            :type deadband: library.polling.deadband.DeadbandFilter
+        """
+
+        super(BusPoller, self).__init__(daemon=True)
+        self.bus = bus
+        self.port = port
+        self.devices = devices
+        self.presence = presence
+        self.live_index = live_index
+        self.listeners = list(listeners)
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
+        self.metrics = metrics
+        self.deadband = deadband
+        # Default attributes of the polling thread
+        self.do_run = True
+        # Commands queued by other threads
+        self.commands = CommandQueue()
+        # Device of the current polling current transformer
+        self.current = None
+
+    def publish(self, reading):
+        """
+        Passing the reading to the listeners, the reading within the deadbands of the previous one is dropped
+
+        Args:
+            :param reading: Readings of the current transformer
+            :type reading: Reading
+
+        Returns:
+            :return: None
+        """
+
+        deadband = self.deadband
+        if deadband is not None and not deadband.changed(reading):
+            return
+        for listener in self.listeners:
+            listener(reading)
+
+    def reset(self, address=BROADCAST):
+        """
+        Queuing the reset of the current transformer
+
+        Args:
+            :param address: Address of the current transformer, 0 - broadcast address
+            :type address: int
+
+        Returns:
+            :return: The reset is queued, False if the same reset is already pending
+            :rtype: bool
+        """
+
+        return self.commands.put("reset", address)
+
+    def run_commands(self):
+        """
+        Executing the pending commands in the order of their priority
+
+        Returns:
+            :return: None
+        """
+
+        while True:
+            command = self.commands.get()
+            if command is None:
+                return
+            start = perf_counter()
+            getattr(self.bus, command.name)(command.address)
+            metrics = self.metrics
+            if metrics is not None:
+                metrics.record_call(command.name, perf_counter() - start)
+
+    def seed(self):
+        """
+        Seeding the presence from the live-address index or from the discovery pass for the unknown stands
+
+        Returns:
+            :return: None
+        """
+
+        for stand, devices in stand_devices(self.devices).items():
+            live = get_live(self.live_index, self.port, stand)
+            if live is None:
+                live = discover(self.bus, [device.address for device in devices])
+            now = monotonic()
+            for device in devices:
+                if device.address not in live:
+                    self.presence.set_absent(device.address, now)
+                    self.publish(Reading(device.index, False, 0, None, None, None, time()))
+
+    def read(self, device, snapshot, absent):
+        """
+        Reading the current transformer and publishing the reading
+
+        Args:
+            :param device: Device of the current transformer
+            :type device: library.polling.table.Device
+            :param snapshot: Preallocated readings
+            :type snapshot: library.bus.backend.CmriSnapshot
+            :param absent: Devices of the absent seats {index: Device}, updated by the read
+            :type absent: dict
+
+        Returns:
+            :return: None
+        """
+
+        # Getting status, voltage, current and temperature
+        address = device.address
+        metrics = self.metrics
+        self.current = device
+        start = perf_counter()
+        get_status = self.bus.read_snapshot(address, snapshot)
+        seconds = perf_counter() - start
+        self.current = None
+        now = monotonic()
+        self.scheduler.record(now, seconds, get_status == 0)
+        if metrics is not None:
+            metrics.record_read(device, seconds, get_status == 0)
+
+        # Checking for the presence of a current transformer on the line
+        if get_status != 0:
+            if self.presence.mark_absent(address, now):
+                absent[device.index] = device
+                self.publish(Reading(device.index, False, 0, None, None, None, time()))
+                if metrics is not None:
+                    metrics.record_absent(device)
+            return
+        self.presence.mark_present(address)
+        absent.pop(device.index, None)
+
+        # Publishing the readings
+        self.publish(Reading(device.index, True, snapshot.status,
+                             tuple(snapshot.voltage), tuple(snapshot.current), snapshot.temp, time()))
+
+    def run(self):
+        # Preallocated readings of the polled current transformer
+        snapshot = CmriSnapshot()
+        presence = self.presence
+        commands = self.commands
+        scheduler = self.scheduler
+        self.seed()
+        devices = None
+        absent = dict()
+        cycle_start = None
+        # A device was read since the polling cycle started
+        cycle_read = False
+        # The primary polling cycle during the do_run = True
+        while self.do_run:
+            # Scheduling the new list of the devices
+            if devices is not self.devices:
+                devices = self.devices
+                scheduler.plan(devices, monotonic())
+                absent = {device.index: device for device in devices if not presence.is_present(device.address)}
+            # Executing the queued commands between the device reads
+            if commands:
+                self.run_commands()
+
+            now = monotonic()
+            device, wait = scheduler.next(now)
+            if device is None or wait > 0:
+                # Re-probing the absent seat in the idle time before the next deadline
+                probe = scheduler.probe(absent.values(), presence, now, wait)
+                if probe is not None:
+                    self.read(probe, snapshot, absent)
+                    continue
+                start = perf_counter()
+                sleep(min(wait, IDLE_STEP) if device is not None else IDLE_STEP)
+                if self.metrics is not None:
+                    self.metrics.record_call("idle", perf_counter() - start)
+                continue
+
+            # The absent seat is skipped, it is re-probed in its turn without the idle time
+            if device.index not in absent or (not scheduler.idle_probing and presence.is_due(device.address, now)):
+                self.read(device, snapshot, absent)
+                cycle_read = True
+            # Measuring the cycle of the port, the cycle is completed when the first device is scheduled again
+            if scheduler.advance(monotonic()):
+                metrics = self.metrics
+                if metrics is not None and cycle_start is not None:
+                    metrics.end_cycle(perf_counter() - cycle_start)
+                # Every seat of the port is absent, waiting for the earliest re-probe instead of skipping them again
+                if not cycle_read and absent:
+                    next_probe = presence.next_probe(x.address for x in absent.values())
+                    if next_probe is not None:
+                        start = perf_counter()
+                        sleep(min(max(next_probe - monotonic(), 0.0), IDLE_STEP))
+                        if metrics is not None:
+                            metrics.record_call("idle", perf_counter() - start)
+                cycle_start = perf_counter()
+                cycle_read = False
@@ -0,0 +1,147 @@
+class PresenceTracker(object):
+    """
+    Presence of the current transformers on the line with exponential backoff of the absent seats
+
+    A seat is considered absent after the given number of consecutive unanswered requests.
+    The absent seat is re-probed after the probe interval, which is multiplied by the backoff factor
+    after every unanswered re-probe up to the maximum interval.
+    """
+
+    def __init__(self, interval=1.0, factor=2.0, max_interval=60.0, misses=1):
+        """
+        Args:
+            :param interval: Initial re-probe interval of the absent seat, s
+            :type interval: float
+            :param factor: Multiplier of the re-probe interval after every unanswered re-probe
+            :type factor: float
+            :param max_interval: Maximum re-probe interval, s
+            :type max_interval: float
+            :param misses: The number of consecutive unanswered requests to consider the seat absent
+            :type misses: int
+        """
+
+        self.interval = interval
+        self.factor = factor
+        self.max_interval = max_interval
+        self.misses = max(misses, 1)
+        # Unanswered requests, the next probe time and the current re-probe interval of every seat
+        self._seats = dict()
+
+    def is_due(self, address, now):
+        """
+        Checking whether the seat should be requested in the current cycle
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+            :param now: Current monotonic time, s
+            :type now: float
+
+        Returns:
+            :return: The seat is present or its re-probe time has come
+            :rtype: bool
+        """
+
+        seat = self._seats.get(address)
+        return seat is None or seat[1] <= now
+
+    def is_present(self, address):
+        """
+        Checking the presence of the seat
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+
+        Returns:
+            :return: The seat is not considered absent
+            :rtype: bool
+        """
+
+        seat = self._seats.get(address)
+        return seat is None or seat[0] < self.misses
+
+    def mark_present(self, address):
+        """
+        Registering the answer of the seat
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+
+        Returns:
+            :return: The seat was considered absent before
+            :rtype: bool
+        """
+
+        seat = self._seats.pop(address, None)
+        return seat is not None and seat[0] >= self.misses
+
+    def mark_absent(self, address, now):
+        """
+        Registering the unanswered request to the seat
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+            :param now: Current monotonic time, s
+            :type now: float
+
+        Returns:
+            :return: The seat has just become absent
+            :rtype: bool
+        """
+
+        seat = self._seats.setdefault(address, [0, now, self.interval])
+        seat[0] += 1
+        if seat[0] < self.misses:
+            return False
+        # Scheduling the re-probe and increasing the interval for the next one
+        seat[1] = now + seat[2]
+        seat[2] = min(seat[2] * self.factor, self.max_interval)
+        return seat[0] == self.misses
+
+    def set_absent(self, address, now):
+        """
+        Considering the seat absent without requesting it, e.g. according to the live-address index
+
+        Args:
+            :param address: Address of the current transformer
+            :type address: int
+            :param now: Current monotonic time, s
+            :type now: float
+
+        Returns:
+            :return: None
+        """
+
+        self._seats[address] = [self.misses, now + self.interval, min(self.interval * self.factor, self.max_interval)]
+
+    def next_probe(self, addresses):
+        """
+        Getting the earliest re-probe time of the seats
+
+        Args:
+            :param addresses: Addresses of the current transformers
+            :type addresses: iterable
+
+        Returns:
+            :return: Monotonic time, s, None if none of the seats has missed the request
+            :rtype: float
+        """
+
+        seats = self._seats
+        times = [seats[address][1] for address in addresses if address in seats]
+        return min(times) if times else None
+
+    @property
+    def absent(self):
+        """
+        Addresses of the absent seats
+
+        Returns:
+            :return: Set of addresses
+            :rtype: set
+        """
+
+        return {address for address, seat in self._seats.items() if seat[0] >= self.misses}
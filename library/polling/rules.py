@@ -0,0 +1,70 @@
+# Vectorized evaluation of the whole bus
+import numpy as np
+
+# Alarm bits of the device
+PHASE_FAULT = (1 << 0, 1 << 1, 1 << 2)
+VOLTAGE_ALARM = (1 << 3, 1 << 4, 1 << 5)
+CURRENT_ALARM = (1 << 6, 1 << 7, 1 << 8)
+TEMP_ALARM = 1 << 9
+# Alarm bits of every phase
+PHASE_ALARMS = tuple(fault | voltage | current
+                     for fault, voltage, current in zip(PHASE_FAULT, VOLTAGE_ALARM, CURRENT_ALARM))
+
+# Names of the limits in the order of the limits table columns
+LIMIT_NAMES = ("VOLTAGE_MIN", "VOLTAGE_MAX", "CURRENT_MIN", "CURRENT_MAX", "TEMP_MIN", "TEMP_MAX")
+
+
+class RulesEngine(object):
+    """
+    Evaluation of the phase faults and the readings limits of all devices in one pass
+    """
+
+    def __init__(self, limits, phase_bits):
+        """
+        Args:
+            :param limits: Limits of every device in the order of LIMIT_NAMES, -inf/inf - no limit
+            :type limits: numpy.ndarray
+            :param phase_bits: CMRI returned status bits of every phase
+            :type phase_bits: list
+        """
+
+        self.limits = np.asarray(limits, dtype=np.float64)
+        # Phase faults of every status value composed of the phase bits, status values with other bits are not decoded
+        mask = sum(phase_bits)
+        self.phase_table = np.zeros(mask + 1, dtype=np.uint16)
+        for status in range(mask + 1):
+            if status & ~mask:
+                continue
+            for bit, fault in zip(phase_bits, PHASE_FAULT):
+                if status & bit:
+                    self.phase_table[status] |= fault
+        self._phase_shift = np.arange(3, dtype=np.uint16)
+
+    def evaluate(self, state):
+        """
+        Getting the alarm bits of every device
+
+        Args:
+            :param state: Latest readings of the whole bus
+            :type state: library.polling.state.BusState
+
+        Returns:
+            :return: Alarm bits of every device, 0 for the absent devices
+            :rtype: numpy.ndarray
+        """
+
+        limits = self.limits
+        # Phase faults via the status lookup
+        status = state.status.astype(np.int64)
+        valid = (status >= 0) & (status < len(self.phase_table))
+        alarms = np.where(valid, self.phase_table[np.where(valid, status, 0)], 0).astype(np.uint16)
+        # Voltage and current of every phase outside the limits
+        voltage = (state.voltage < limits[:, 0:1]) | (state.voltage > limits[:, 1:2])
+        current = (state.current < limits[:, 2:3]) | (state.current > limits[:, 3:4])
+        alarms |= (voltage.astype(np.uint16) << (self._phase_shift + 3)).sum(axis=1, dtype=np.uint16)
+        alarms |= (current.astype(np.uint16) << (self._phase_shift + 6)).sum(axis=1, dtype=np.uint16)
+        # Temperature outside the limits
+        alarms[(state.temp < limits[:, 4]) | (state.temp > limits[:, 5])] |= TEMP_ALARM
+        # The absent devices have no alarms
+        alarms[state.present == 0] = 0
+        return alarms
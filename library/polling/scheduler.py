@@ -0,0 +1,230 @@
+# Earliest deadline first order of the reads
+from heapq import heapreplace
+
+# Smoothing factor of the measured read durations
+SMOOTHING = 0.1
+
+
+class PollScheduler(object):
+    """
+    Deadline-based schedule of the device reads of one COM-port
+
+    Every seat of the stand is read once per the target refresh period of the stand and the reads of the stand are
+    spread evenly over the period, the zero period reads the seats one after another as fast as possible.
+    Every read is followed by the idle time required by the maximum bus utilization.
+
+    The target is infeasible when the estimated bus time of the reads exceeds the utilization. The absent seats are
+    re-probed in the idle time before the next deadline, without the idle time they are re-probed in their turn.
+    """
+
+    def __init__(self, cycle_time=0.0, utilization=1.0, stand_cycle_times=None):
+        """
+        Args:
+            :param cycle_time: Target refresh period of every stand, s, 0 - as fast as possible
+            :type cycle_time: float
+            :param utilization: Maximum fraction of the time the bus is busy with the reads
+            :type utilization: float
+            :param stand_cycle_times: Target refresh period of the particular stands {stand: period}
+            :type stand_cycle_times: dict
+        """
+
+        self.cycle_time = max(cycle_time, 0.0)
+        self.utilization = min(max(utilization, 0.01), 1.0)
+        self.stand_cycle_times = dict(stand_cycle_times or {})
+        # Smoothed duration of the answered read and of the unanswered read, s
+        self.read_time = 0.0
+        self.probe_time = 0.0
+        # Entries [deadline, position, period, device] of the earliest deadline first
+        self._heap = list()
+        # The bus is not requested before this monotonic time because of the utilization
+        self._not_before = 0.0
+        # Sum of 1/period of the devices with the target period, reads per second
+        self._rate = 0.0
+        # Reads started one period or more after their deadline
+        self.missed = 0
+
+    def period(self, stand):
+        """
+        Getting the target refresh period of the stand
+
+        Args:
+            :param stand: Stand name
+            :type stand: str
+
+        Returns:
+            :return: Period, s, 0 - as fast as possible
+            :rtype: float
+        """
+
+        return max(self.stand_cycle_times.get(stand, self.cycle_time), 0.0)
+
+    def plan(self, devices, now):
+        """
+        Scheduling the devices from the given time, the reads of every stand are spread over its period
+
+        Args:
+            :param devices: Devices of the port in the polling order
+            :type devices: list
+            :param now: Current monotonic time, s
+            :type now: float
+
+        Returns:
+            :return: None
+        """
+
+        counts = dict()
+        for device in devices:
+            counts[device.stand] = counts.get(device.stand, 0) + 1
+        heap = list()
+        numbers = dict()
+        self._rate = 0.0
+        for position, device in enumerate(devices):
+            period = self.period(device.stand)
+            number = numbers.get(device.stand, 0)
+            numbers[device.stand] = number + 1
+            if period:
+                self._rate += 1 / period
+            # The heap is ordered by the deadlines and the positions, the entries of one list are already ordered
+            heap.append([now + period * number / counts[device.stand], position, period, device])
+        heap.sort()
+        self._heap = heap
+
+    @property
+    def idle_probing(self):
+        """
+        Checking whether the absent seats are re-probed in the idle time
+
+        Returns:
+            :return: The schedule has the target periods and is feasible
+            :rtype: bool
+        """
+
+        return self._rate > 0 and self.feasible
+
+    @property
+    def load(self):
+        """
+        Estimated fraction of the time the bus is busy with the reads of the devices with the target period
+
+        Returns:
+            :return: Load, all devices are assumed present
+            :rtype: float
+        """
+
+        return self._rate * self.read_time
+
+    @property
+    def feasible(self):
+        """
+        Checking whether the target periods can be met with the maximum utilization
+
+        Returns:
+            :return: The estimated load does not exceed the utilization
+            :rtype: bool
+        """
+
+        return self.load <= self.utilization
+
+    def next(self, now):
+        """
+        Getting the device with the earliest deadline
+
+        Args:
+            :param now: Current monotonic time, s
+            :type now: float
+
+        Returns:
+            :return: Device and the time until it is read, s, (None, 0) without the devices
+            :rtype: tuple
+        """
+
+        if not self._heap:
+            return None, 0.0
+        entry = self._heap[0]
+        return entry[3], max(entry[0] - now, self._not_before - now, 0.0)
+
+    def advance(self, now):
+        """
+        Scheduling the next read of the device with the earliest deadline, it is read or skipped
+
+        Args:
+            :param now: Current monotonic time, s
+            :type now: float
+
+        Returns:
+            :return: The first device of the list is scheduled, i.e. the polling cycle of the port is completed
+            :rtype: bool
+        """
+
+        deadline, position, period, device = self._heap[0]
+        if not period:
+            deadline = now
+        else:
+            deadline += period
+            # The missed deadline is not caught up, the reads of the device continue from now
+            if deadline < now:
+                self.missed += 1
+                deadline = now
+        heapreplace(self._heap, [deadline, position, period, device])
+        return position == 0
+
+    def record(self, now, seconds, answered):
+        """
+        Registering the read, the bus is idle after it according to the utilization
+
+        Args:
+            :param now: Monotonic time of the read end, s
+            :type now: float
+            :param seconds: Duration of the read, s
+            :type seconds: float
+            :param answered: The current transformer answered
+            :type answered: bool
+
+        Returns:
+            :return: None
+        """
+
+        if answered:
+            self.read_time += (seconds - self.read_time) * SMOOTHING if self.read_time else seconds
+        else:
+            self.probe_time += (seconds - self.probe_time) * SMOOTHING if self.probe_time else seconds
+        self._not_before = now + seconds * (1 / self.utilization - 1)
+
+    def probe(self, absent, presence, now, wait):
+        """
+        Choosing the absent seat re-probed in the idle time
+
+        Args:
+            :param absent: Devices of the absent seats
+            :type absent: iterable
+            :param presence: Presence tracker of the port
+            :type presence: library.polling.presence.PresenceTracker
+            :param now: Current monotonic time, s
+            :type now: float
+            :param wait: Idle time until the next read, s
+            :type wait: float
+
+        Returns:
+            :return: Device of the seat whose re-probe time has come, None if the re-probe does not fit
+            :rtype: library.polling.table.Device
+        """
+
+        if wait < self.probe_time or now < self._not_before:
+            return None
+        for device in absent:
+            if presence.is_due(device.address, now):
+                return device
+        return None
+
+    def status(self):
+        """
+        Getting the summary of the schedule
+
+        Returns:
+            :return: {"cycle_time", "utilization", "load", "feasible", "read_ms", "probe_ms", "missed"}
+            :rtype: dict
+        """
+
+        return {"cycle_time": self.cycle_time, "utilization": self.utilization, "load": self.load,
+                "feasible": self.feasible, "read_ms": self.read_time * 1000, "probe_ms": self.probe_time * 1000,
+                "missed": self.missed}
@@ -0,0 +1,109 @@
+# Arrays of the latest readings of the whole bus
+import numpy as np
+
+# Columns of the readings block
+PRESENT = 0
+STATUS = 1
+VOLTAGE = slice(2, 5)
+CURRENT = slice(5, 8)
+TEMP = 8
+TIME = 9
+# The number of columns of the readings block
+COLUMNS = 10
+
+
+class BusState(object):
+    """
+    Latest readings of every device of the device table in one preallocated block
+
+    Row of the block is the index of the device in the device table,
+    the readings of the device that has never answered are NaN.
+    """
+
+    def __init__(self, size, buffer=None, clear=True):
+        """
+        Args:
+            :param size: The number of devices
+            :type size: int
+            :param buffer: Existing memory for the readings block, allocated when None
+            :type buffer: buffer
+            :param clear: Clearing the existing memory, False - the readings already written into it are kept
+            :type clear: bool
+        """
+
+        self.size = size
+        if buffer is None:
+            values = np.full((size, COLUMNS), np.nan)
+        else:
+            values = np.ndarray((size, COLUMNS), dtype=np.float64, buffer=buffer)
+            if clear:
+                values[:] = np.nan
+        if buffer is None or clear:
+            values[:, PRESENT] = 0
+            values[:, STATUS] = 0
+        self._set_values(values)
+
+    def _set_values(self, values):
+        """
+        Setting the readings block and its views
+
+        Args:
+            :param values: Readings block
+            :type values: numpy.ndarray
+
+        Returns:
+            :return: None
+        """
+
+        self.values = values
+        # Views of the readings block
+        self.present = values[:, PRESENT]
+        self.status = values[:, STATUS]
+        self.voltage = values[:, VOLTAGE]
+        self.current = values[:, CURRENT]
+        self.temp = values[:, TEMP]
+
+    def resize(self, size):
+        """
+        Changing the number of devices keeping the readings of the remaining devices
+
+        The resized block is always allocated, an existing memory is not used anymore.
+
+        Args:
+            :param size: The number of devices
+            :type size: int
+
+        Returns:
+            :return: None
+        """
+
+        values = np.full((size, COLUMNS), np.nan)
+        values[:, PRESENT] = 0
+        values[:, STATUS] = 0
+        count = min(size, self.size)
+        values[:count] = self.values[:count]
+        self.size = size
+        self._set_values(values)
+
+    def update(self, reading):
+        """
+        Writing the reading into the row of the device
+
+        Args:
+            :param reading: Readings of the current transformer
+            :type reading: library.polling.poller.Reading
+
+        Returns:
+            :return: None
+        """
+
+        row = self.values[reading.index]
+        row[TIME] = reading.time
+        if not reading.present:
+            row[PRESENT] = 0
+            return
+        row[PRESENT] = 1
+        row[STATUS] = reading.status
+        row[VOLTAGE] = reading.voltage
+        row[CURRENT] = reading.current
+        row[TEMP] = reading.temp
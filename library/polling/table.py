@@ -0,0 +1,76 @@
+class Device(object):
+    """
+    Record of the device table built at the connection and updated by the configuration reload
+    """
+
+    __slots__ = ("index", "address", "stand", "place", "port", "active")
+
+    def __init__(self, index, address, stand, place, port):
+        """
+        Args:
+            :param index: Index of the device in the device table
+            :type index: int
+            :param address: Address of the current transformer
+            :type address: int
+            :param stand: Stand name
+            :type stand: str
+            :param place: Seat number
+            :type place: str
+            :param port: COM-port name
+            :type port: str
+        """
+
+        self.index = index
+        self.address = address
+        self.stand = stand
+        self.place = place
+        self.port = port
+        # The seat is polled, the seat removed from the configuration keeps its index until the reconnection
+        self.active = True
+
+    def __repr__(self):
+        return "Device({0}, {1:X}, {2!r}, {3!r}, {4!r})".format(self.index, self.address, self.stand, self.place,
+                                                               self.port)
+
+
+def build_table(stand_list, git_config, stand_ports):
+    """
+    Building the device table of the connected stands
+
+    Args:
+        :param stand_list: List of stands
+        :type stand_list: list
+        :param git_config: Configuration from the GitLab server
+        :type git_config: ConfigParser
+        :param stand_ports: COM-port of every stand
+        :type stand_ports: dict
+
+    Returns:
+        :return: Devices in the polling order
+        :rtype: list
+    """
+
+    devices = list()
+    for stand in stand_list:
+        for place, address in git_config[stand].items():
+            devices.append(Device(len(devices), int(address, 16), stand, place, stand_ports[stand]))
+    return devices
+
+
+def stand_devices(devices):
+    """
+    Grouping the devices by the stands
+
+    Args:
+        :param devices: Devices in the polling order
+        :type devices: list
+
+    Returns:
+        :return: Devices of every stand in the polling order {stand: [Device, ...]}
+        :rtype: dict
+    """
+
+    stands = dict()
+    for device in devices:
+        stands.setdefault(device.stand, list()).append(device)
+    return stands
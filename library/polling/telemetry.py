@@ -0,0 +1,240 @@
+# Binary records of the telemetry log
+import numpy as np
+
+# Lock-free queue of the readings to write
+from collections import deque
+# Files of the telemetry log
+from os import makedirs, remove
+from os.path import join, getsize
+from glob import glob
+# Timestamps of the log files
+from time import time, strftime, localtime
+# Threading interface
+from threading import Thread, Event
+
+# Record of the telemetry log: time of the reading (s since the epoch), address, status (-1 - absent device)
+# and V1, V2, V3, I1, I2, I3, temperature
+RECORD = np.dtype([("time", "<f8"), ("address", "<u4"), ("status", "<i4"), ("values", "<f4", (7,))])
+# Columns of the CSV export
+CSV_HEADER = "time,address,status,V1,V2,V3,I1,I2,I3,T"
+# The number of records exported at once
+EXPORT_CHUNK = 65536
+
+
+class TelemetryWriter(Thread):
+    """
+    Append-only binary telemetry log written in batches by its own thread
+
+    The polling threads only append the readings to the queue, the log thread writes them every flush interval.
+    A new log file is started when the current file exceeds the maximum size or age,
+    the oldest log files above the maximum number are removed at the start of the new file.
+    """
+
+    def __init__(self, devices, directory="telemetry", max_size=64 * 1024 * 1024, max_age=3600.0, max_files=24,
+                 flush_interval=1.0):
+        """
+        Args:
+            :param devices: Devices in the polling order
+            :type devices: list
+            :param directory: Directory of the log files
+            :type directory: str
+            :param max_size: Maximum size of the log file, bytes
+            :type max_size: int
+            :param max_age: Maximum age of the log file, s
+            :type max_age: float
+            :param max_files: Maximum number of the log files kept in the directory, 0 - not limited
+            :type max_files: int
+            :param flush_interval: Interval between the batch writes, s
+            :type flush_interval: float
+        """
+
+        super(TelemetryWriter, self).__init__(daemon=True)
+        self.set_devices(devices)
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self.queue = deque()
+        # Current log file
+        self.path = None
+        self._file = None
+        self._opened = 0.0
+        self._stop_event = Event()
+
+    def set_devices(self, devices):
+        """
+        Setting the addresses of the devices written for their indices
+
+        The addresses array is replaced, the log thread keeps writing with the previous array until the next batch.
+
+        Args:
+            :param devices: Devices in the polling order
+            :type devices: list
+
+        Returns:
+            :return: None
+        """
+
+        self.addresses = np.array([device.address for device in devices], dtype=np.uint32)
+
+    def publish(self, reading):
+        """
+        Queueing the reading for writing, called from the polling threads
+
+        Args:
+            :param reading: Readings of the current transformer
+            :type reading: library.polling.poller.Reading
+
+        Returns:
+            :return: None
+        """
+
+        self.queue.append(reading)
+
+    def stop(self):
+        """
+        Stopping the log thread after writing the queued readings
+
+        Returns:
+            :return: None
+        """
+
+        self._stop_event.set()
+        self.join()
+
+    def run(self):
+        try:
+            while not self._stop_event.wait(self.flush_interval):
+                self.flush()
+            self.flush()
+        finally:
+            if self._file is not None:
+                self._file.close()
+
+    def flush(self):
+        """
+        Writing the queued readings into the log file
+
+        Returns:
+            :return: None
+        """
+
+        queue = self.queue
+        count = len(queue)
+        if not count:
+            return
+        records = np.empty(count, dtype=RECORD)
+        times = records["time"]
+        indices = np.empty(count, dtype=np.int64)
+        statuses = records["status"]
+        values = records["values"]
+        for idx in range(count):
+            reading = queue.popleft()
+            times[idx] = reading.time
+            indices[idx] = reading.index
+            if reading.present:
+                statuses[idx] = reading.status
+                values[idx] = reading.voltage + reading.current + (reading.temp,)
+            else:
+                statuses[idx] = -1
+                values[idx] = np.nan
+        records["address"] = self.addresses[indices]
+        self._log_file().write(records.tobytes())
+        self._file.flush()
+
+    def _log_file(self):
+        """
+        Getting the current log file, starting a new file on rotation
+
+        Returns:
+            :return: Opened log file
+        """
+
+        now = time()
+        if self._file is not None and (self._file.tell() >= self.max_size or now - self._opened >= self.max_age):
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            makedirs(self.directory, exist_ok=True)
+            self.path = join(self.directory, "cmri_{0}_{1:03d}.bin".format(
+                strftime("%Y%m%d_%H%M%S", localtime(now)), int(now * 1000) % 1000))
+            self._file = open(self.path, "ab")
+            self._opened = now
+            self._prune()
+        return self._file
+
+    def _prune(self):
+        """
+        Removing the oldest log files above the maximum number, the names of the files are ordered by their start
+
+        Returns:
+            :return: None
+        """
+
+        if self.max_files <= 0:
+            return
+        for path in sorted(glob(join(self.directory, "cmri_*.bin")))[:-self.max_files]:
+            # The file opened by the reader is removed at the next start
+            try:
+                remove(path)
+            except OSError:
+                pass
+
+
+def open_log(path):
+    """
+    Memory-mapping the log file without reading it
+
+    Args:
+        :param path: Path to the log file
+        :type path: str
+
+    Returns:
+        :return: Records of the log file
+        :rtype: numpy.memmap
+    """
+
+    # An incomplete trailing record of the file being written is not mapped
+    count = getsize(path) // RECORD.itemsize
+    if not count:
+        return np.empty(0, dtype=RECORD)
+    return np.memmap(path, dtype=RECORD, mode="r", shape=(count,))
+
+
+def export_csv(path, csv_path):
+    """
+    Exporting the log file to the CSV file
+
+    Args:
+        :param path: Path to the log file
+        :type path: str
+        :param csv_path: Path to the CSV file
+        :type csv_path: str
+
+    Returns:
+        :return: The number of exported records
+        :rtype: int
+    """
+
+    records = open_log(path)
+    with open(csv_path, "w", encoding="utf-8") as csv_file:
+        csv_file.write(CSV_HEADER + "\n")
+        # Exporting by chunks, the mapped file is never loaded completely
+        for start in range(0, len(records), EXPORT_CHUNK):
+            chunk = records[start:start + EXPORT_CHUNK]
+            table = np.empty((len(chunk), 10))
+            table[:, 0] = chunk["time"]
+            table[:, 1] = chunk["address"]
+            table[:, 2] = chunk["status"]
+            table[:, 3:] = chunk["values"]
+            np.savetxt(csv_file, table, delimiter=",", fmt=["%.3f", "%d", "%d"] + ["%.6g"] * 7)
+    return len(records)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m library.polling.telemetry <log file> <CSV file>")
+    print("Exported records: {0}".format(export_csv(sys.argv[1], sys.argv[2])))
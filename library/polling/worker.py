@@ -0,0 +1,588 @@
+# Reading the rows written by the worker process
+import numpy as np
+# Readings block in the shared memory
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+# Commands and status of the worker process
+from queue import Empty
+# The worker process is not interrupted by Ctrl+C of the application, it is stopped by the command
+import signal
+# Settings of the worker process
+from configparser import ConfigParser
+# Waiting for the worker process
+from time import sleep, monotonic
+# Supervisor thread of the worker process
+from threading import Thread
+
+# Readings of the current transformer
+from library.polling.poller import BusPoller, Reading
+# Readings block of the bus
+from library.polling.state import BusState, COLUMNS, PRESENT, STATUS, VOLTAGE, CURRENT, TEMP, TIME
+# Commands executed between the device reads
+from library.polling.commands import CommandQueue, BROADCAST
+# Presence of the current transformers on the line
+from library.polling.presence import PresenceTracker
+# Instrumentation of the polling
+from library.polling.metrics import PollMetrics
+# Device table and the live-address index
+from library.polling.table import stand_devices
+from library.bus.discovery import set_live
+
+# Header of the shared block: readings written by the worker process and the index of the polled device, -1 - none
+WRITES = 0
+CURRENT_INDEX = 1
+HEADER = 2
+# Attempts to read the row while the worker process writes it, the row is read by the next scan after them
+RETRIES = 3
+# Interval of the schedule and metrics status sent by the worker process, s
+STATUS_INTERVAL = 0.5
+# Waiting for the worker process to stop, it is terminated after that, s
+STOP_TIMEOUT = 5.0
+
+
+class SharedBlock(object):
+    """
+    Latest readings of one COM-port in the shared memory with the sequence counter of every row
+
+    The worker process increments the counter of the row before and after writing it, the row is consistent
+    when the counter is even and has not changed while the row was read. The rows are indexed by the device table.
+    """
+
+    def __init__(self, size, name=None):
+        """
+        Args:
+            :param size: The number of devices
+            :type size: int
+            :param name: Name of the existing shared memory, None - the memory is created and cleared
+            :type name: str
+        """
+
+        self.size = size
+        self.shm = SharedMemory(name=name, create=name is None, size=(HEADER + size + size * COLUMNS) * 8)
+        self.name = self.shm.name
+        buffer = self.shm.buf
+        self.header = np.ndarray((HEADER,), dtype=np.int64, buffer=buffer)
+        self.sequence = np.ndarray((size,), dtype=np.int64, buffer=buffer, offset=HEADER * 8)
+        self.state = BusState(size, buffer[(HEADER + size) * 8:], clear=name is None)
+        if name is None:
+            self.header[:] = (0, -1)
+            self.sequence[:] = 0
+
+    def write(self, reading):
+        """
+        Writing the reading into the row of the device, called by the polling thread of the worker process
+
+        Args:
+            :param reading: Readings of the current transformer
+            :type reading: library.polling.poller.Reading
+
+        Returns:
+            :return: None
+        """
+
+        sequence = self.sequence
+        index = reading.index
+        sequence[index] += 1
+        self.state.update(reading)
+        sequence[index] += 1
+        self.header[WRITES] += 1
+
+    def read(self, index):
+        """
+        Reading the row of the device in place
+
+        Args:
+            :param index: Index of the device in the device table
+            :type index: int
+
+        Returns:
+            :return: Sequence counter and the reading of the row, (None, None) if the row is being written
+            :rtype: tuple
+        """
+
+        sequence = self.sequence
+        for _ in range(RETRIES):
+            before = int(sequence[index])
+            if before & 1:
+                continue
+            row = self.state.values[index]
+            if row[PRESENT]:
+                reading = Reading(index, True, int(row[STATUS]), tuple(row[VOLTAGE].tolist()),
+                                  tuple(row[CURRENT].tolist()), float(row[TEMP]), float(row[TIME]))
+            else:
+                reading = Reading(index, False, 0, None, None, None, float(row[TIME]))
+            if int(sequence[index]) == before:
+                return before, reading
+        return None, None
+
+    def repair(self):
+        """
+        Completing the rows left odd by the stopped worker process, their readings are overwritten by the next one
+
+        Returns:
+            :return: None
+        """
+
+        self.sequence[:] += self.sequence & 1
+        self.header[CURRENT_INDEX] = -1
+
+    def close(self, unlink=False):
+        """
+        Releasing the shared memory
+
+        Args:
+            :param unlink: Destroying the shared memory, called by the process that created it
+            :type unlink: bool
+
+        Returns:
+            :return: None
+        """
+
+        # The views of the buffer are released before the memory
+        self.header = self.sequence = self.state = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def run_worker(settings, port, devices, size, name, live_index, commands, status):
+    """
+    Polling one COM-port in the worker process, the readings are written into the shared block
+
+    Args:
+        :param settings: Software settings {section: {option: raw value}}
+        :type settings: dict
+        :param port: COM-port name
+        :type port: str
+        :param devices: Devices of the stands connected to the port in the polling order
+        :type devices: list
+        :param size: The number of rows of the shared block
+        :type size: int
+        :param name: Name of the shared block
+        :type name: str
+        :param live_index: Live-address index
+        :type live_index: dict
+        :param commands: Commands of the supervisor (name, value): "reset", "devices", "metrics" and "stop"
+        :type commands: multiprocessing.Queue
+        :param status: Schedule status, metrics snapshot and its generation sent to the supervisor
+        :type status: multiprocessing.Queue
+
+    Returns:
+        :return: None
+    """
+
+    # Backend and polling factories of the software settings
+    from library import config as sw_cfg
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    config = ConfigParser()
+    config.read_dict(settings)
+    block = SharedBlock(size, name)
+    bus = sw_cfg.get_backend(config)
+    sw_cfg.open_port(bus, port)
+    poller = BusPoller(bus, port, devices, sw_cfg.get_presence_tracker(config), live_index, [block.write],
+                       sw_cfg.get_scheduler(config))
+    poller.start()
+    # Generation of the metrics requested by the supervisor, None - not measured
+    generation = None
+    try:
+        next_status = monotonic()
+        while poller.is_alive():
+            try:
+                command, value = commands.get(timeout=0.01)
+            except Empty:
+                command = None
+            if command == "stop":
+                poller.do_run = False
+            elif command == "devices":
+                poller.devices = value
+            elif command == "metrics":
+                # Every generation is measured from the start, the cleared metrics are not kept
+                generation = value
+                poller.metrics = PollMetrics() if generation is not None else None
+            elif command is not None:
+                poller.commands.put(command, value)
+            current = poller.current
+            block.header[CURRENT_INDEX] = current.index if current is not None else -1
+            if monotonic() >= next_status:
+                metrics = poller.metrics
+                status.put((poller.scheduler.status(), metrics.snapshot() if metrics is not None else None,
+                            generation))
+                next_status = monotonic() + STATUS_INTERVAL
+    finally:
+        bus.port_close()
+        block.close()
+
+
+class RemoteScheduler(object):
+    """
+    Latest status of the schedule of the worker process
+    """
+
+    def __init__(self, status):
+        """
+        Args:
+            :param status: Initial status of the schedule
+            :type status: dict
+        """
+
+        self._status = status
+
+    @property
+    def load(self):
+        return self._status["load"]
+
+    @property
+    def utilization(self):
+        return self._status["utilization"]
+
+    @property
+    def feasible(self):
+        return self._status["feasible"]
+
+    def status(self):
+        return self._status
+
+
+class RemoteMetrics(object):
+    """
+    Latest metrics snapshot of the worker process
+    """
+
+    def __init__(self):
+        # Empty snapshot until the worker process sends its metrics
+        self._snapshot = PollMetrics().snapshot()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def update(self, snapshot):
+        self._snapshot = snapshot
+
+
+class BusWorker(Thread):
+    """
+    Supervisor of the worker process polling one COM-port
+
+    The CMRI library and the polling run in the worker process, the GUI jitter does not delay the reads and the crash
+    of the library does not stop the application. The supervisor thread scans the sequence counters of the shared
+    block, passes the changed rows to the listeners as Reading and restarts the worker process when it exits
+    unexpectedly. The thread has the interface of BusPoller: do_run, devices, reset(), current, presence, scheduler,
+    metrics and deadband. The readings written between two scans are coalesced into the latest one.
+
+    The GUI does not read the shared block in place. Its state and alarms cover the devices of all ports, while every
+    worker process has its own block, and the telemetry, the fanout server and the history take every reading as
+    a listener. The row is copied once under its sequence counter, so the listeners never see a row being written.
+    """
+
+    def __init__(self, port, devices, size, settings, live_index, listeners, scheduler, metrics=False,
+                 deadband=None, scan_interval=0.02, restart_delay=1.0):
+        """
+        Args:
+            :param port: COM-port name
+            :type port: str
+            :param devices: Devices of the stands connected to the port in the polling order
+            :type devices: list
+            :param size: The number of devices of the device table
+            :type size: int
+            :param settings: Software settings of the worker process {section: {option: raw value}}
+            :type settings: dict
+            :param live_index: Live-address index
+            :type live_index: dict
+            :param listeners: Callables receiving every Reading, they are called from the supervisor thread
+                              and must not block it, e.g. deque.append
+            :type listeners: list
+            :param scheduler: Schedule of the reads of the settings, its status is shown until the worker sends one
+            :type scheduler: library.polling.scheduler.PollScheduler
+            :param metrics: Measuring the polling from the start
+            :type metrics: bool
+            :param deadband: Change detection of the readings, None - every changed row is passed to the listeners
+            :type deadband: library.polling.deadband.DeadbandFilter
+            :param scan_interval: Interval between the scans of the shared block, s
+            :type scan_interval: float
+            :param restart_delay: Delay of the restart of the exited worker process, s
+            :type restart_delay: float
+        """
+
+        super(BusWorker, self).__init__(daemon=True)
+        self.port = port
+        self.devices = devices
+        self.size = max([size] + [device.index + 1 for device in devices])
+        self.settings = settings
+        self.live_index = live_index
+        self.listeners = list(listeners)
+        self.scheduler = RemoteScheduler(scheduler.status())
+        self.deadband = deadband
+        self.scan_interval = scan_interval
+        self.restart_delay = restart_delay
+        self._metrics = RemoteMetrics() if metrics else None
+        # Generation of the metrics, it is changed every time the metrics are started again
+        self._generation = 1 if metrics else 0
+        # Default attributes of the polling thread
+        self.do_run = True
+        # Commands queued by other threads, they are passed to the worker process by the supervisor thread
+        self.commands = CommandQueue()
+        # Presence of the seats according to the passed readings, it seeds the restarted worker process
+        self.presence = PresenceTracker()
+        # Indices of the devices with the passed reading
+        self._seen = set()
+        # Restarts of the worker process after its unexpected exit and the exit code of the last one
+        self.restarts = 0
+        self.exitcode = None
+        self._context = get_context("spawn")
+        self._block = None
+        # Index of the polled device copied from the shared block by the supervisor thread
+        self._current_index = -1
+        self._process = None
+        self._commands = None
+        self._status = None
+        self._sent_devices = None
+        self._sent_metrics = None
+        # Devices by their index, rebuilt when the list of the devices is replaced
+        self._indexed = None
+        self._by_index = dict()
+
+    @property
+    def metrics(self):
+        """
+        Latest metrics snapshot of the worker process, None - not measured
+
+        Returns:
+            :return: Metrics with the snapshot() method
+            :rtype: RemoteMetrics
+        """
+
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics):
+        # The worker process starts or stops measuring, the collected metrics are discarded when stopped
+        if metrics is None:
+            self._metrics = None
+        elif self._metrics is None:
+            self._generation += 1
+            self._metrics = RemoteMetrics()
+
+    @property
+    def current(self):
+        """
+        Device of the current polling current transformer
+
+        Returns:
+            :return: Device, None between the reads
+            :rtype: library.polling.table.Device
+        """
+
+        return self.device(self._current_index)
+
+    def device(self, index):
+        """
+        Getting the polled device by its index
+
+        Args:
+            :param index: Index of the device in the device table
+            :type index: int
+
+        Returns:
+            :return: Device, None if the device is not polled by the port
+            :rtype: library.polling.table.Device
+        """
+
+        devices = self.devices
+        if devices is not self._indexed:
+            self._by_index = {device.index: device for device in devices}
+            self._indexed = devices
+        return self._by_index.get(index)
+
+    def reset(self, address=BROADCAST):
+        """
+        Queuing the reset of the current transformer
+
+        Args:
+            :param address: Address of the current transformer, 0 - broadcast address
+            :type address: int
+
+        Returns:
+            :return: The reset is queued, False if the same reset is already pending
+            :rtype: bool
+        """
+
+        return self.commands.put("reset", address)
+
+    def publish(self, reading):
+        """
+        Passing the reading to the listeners, the reading within the deadbands of the previous one is dropped
+
+        Args:
+            :param reading: Readings of the current transformer
+            :type reading: library.polling.poller.Reading
+
+        Returns:
+            :return: None
+        """
+
+        device = self.device(reading.index)
+        if device is not None:
+            self._seen.add(device.index)
+            if reading.present:
+                self.presence.mark_present(device.address)
+            else:
+                self.presence.set_absent(device.address, monotonic())
+        deadband = self.deadband
+        if deadband is not None and not deadband.changed(reading):
+            return
+        for listener in self.listeners:
+            listener(reading)
+
+    def start_worker(self):
+        """
+        Starting the worker process, the live addresses of the passed readings seed its presence
+
+        Returns:
+            :return: None
+        """
+
+        devices = self.devices
+        # The live-address index of the application is not changed
+        live_index = dict(self.live_index)
+        live_index[self.port] = dict(live_index.get(self.port, dict()))
+        absent = self.presence.absent
+        # The stands with the passed reading of every seat are seeded without the discovery pass
+        for stand, seats in stand_devices(devices).items():
+            if all(x.index in self._seen for x in seats):
+                set_live(live_index, self.port, stand, [x.address for x in seats if x.address not in absent])
+        self._commands = self._context.Queue()
+        self._status = self._context.Queue()
+        self._process = self._context.Process(
+            target=run_worker, name="CMRI {0}".format(self.port), daemon=True,
+            args=(self.settings, self.port, devices, self.size, self._block.name, live_index, self._commands,
+                  self._status))
+        self._process.start()
+        self._sent_devices = devices
+        self._sent_metrics = None
+
+    def stop_worker(self):
+        """
+        Stopping the worker process, it is terminated if it does not stop in time
+
+        Returns:
+            :return: None
+        """
+
+        process = self._process
+        if process is None:
+            return
+        if process.is_alive():
+            self._commands.put(("stop", None))
+        deadline = monotonic() + STOP_TIMEOUT
+        # The status queue is drained, the worker process does not exit with the unsent status
+        while process.is_alive() and monotonic() < deadline:
+            self.receive_status()
+            process.join(0.05)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        self.receive_status()
+        self.exitcode = process.exitcode
+        self._commands.close()
+        self._status.close()
+        self._process = None
+        self._current_index = -1
+
+    def send_commands(self):
+        """
+        Passing the changed devices, the metrics state and the queued commands to the worker process
+
+        Returns:
+            :return: None
+        """
+
+        if self.devices is not self._sent_devices:
+            self._sent_devices = self.devices
+            self._commands.put(("devices", self._sent_devices))
+        # The metrics stopped and started again between two scans are cleared by the new generation
+        generation = self._generation if self._metrics is not None else None
+        if generation != self._sent_metrics:
+            self._sent_metrics = generation
+            self._commands.put(("metrics", generation))
+        while True:
+            command = self.commands.get()
+            if command is None:
+                return
+            self._commands.put(command)
+
+    def receive_status(self):
+        """
+        Taking the latest status sent by the worker process
+
+        Returns:
+            :return: None
+        """
+
+        while True:
+            try:
+                schedule, metrics, generation = self._status.get_nowait()
+            except Empty:
+                return
+            self.scheduler = RemoteScheduler(schedule)
+            # The snapshot measured before the metrics were cleared is dropped
+            if metrics is not None and self._metrics is not None and generation == self._generation:
+                self._metrics.update(metrics)
+
+    def scan(self, last):
+        """
+        Passing the rows changed since the previous scan to the listeners
+
+        Args:
+            :param last: Sequence counter of every row passed before, updated
+            :type last: numpy.ndarray
+
+        Returns:
+            :return: None
+        """
+
+        block = self._block
+        for index in np.flatnonzero(block.sequence != last).tolist():
+            sequence, reading = block.read(index)
+            if reading is not None:
+                last[index] = sequence
+                self.publish(reading)
+
+    def run(self):
+        self._block = SharedBlock(self.size)
+        last = np.zeros(self.size, dtype=np.int64)
+        writes = 0
+        self.start_worker()
+        try:
+            while self.do_run:
+                # The shared block of the added devices is larger, the worker process is started with the new one
+                grown = max([device.index + 1 for device in self.devices] + [0]) > self.size
+                if grown or not self._process.is_alive():
+                    self.stop_worker()
+                    self._block.repair()
+                    self.scan(last)
+                    if grown:
+                        self.size = max(device.index + 1 for device in self.devices)
+                        self._block.close(unlink=True)
+                        self._block = SharedBlock(self.size)
+                        last = np.zeros(self.size, dtype=np.int64)
+                        writes = 0
+                    else:
+                        self.restarts += 1
+                        sleep(self.restart_delay)
+                    if not self.do_run:
+                        break
+                    self.start_worker()
+                self.send_commands()
+                self.receive_status()
+                self._current_index = int(self._block.header[CURRENT_INDEX])
+                # The sequence counters are compared only after the new writes
+                if int(self._block.header[WRITES]) != writes:
+                    writes = int(self._block.header[WRITES])
+                    self.scan(last)
+                sleep(self.scan_interval)
+        finally:
+            self.stop_worker()
+            self._block.repair()
+            self.scan(last)
+            self._block.close(unlink=True)
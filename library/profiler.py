@@ -0,0 +1,162 @@
+# Replacing the import function while profiling
+import builtins
+import sys
+# Enabling the profiler with the environment variable
+from os import environ
+# Measuring the imports and the startup milestones
+from time import perf_counter
+# Nested imports of every thread, the initialization stages import concurrently
+from threading import local
+
+
+class StartupProfiler(object):
+    """
+    Time of every import and of the startup milestones
+
+    The import function is replaced while profiling, every absolute import of a module that is not loaded yet
+    is measured including its nested imports (total) and without them (self).
+    """
+
+    def __init__(self):
+        self.start = perf_counter()
+        # Imported modules (name, total, self) in the order of completion, s
+        self.imports = list()
+        # Startup milestones (name, time since the start), s
+        self.marks = list()
+        # Total time of the nested imports of every import in progress of the thread
+        self._thread = local()
+        self._import = builtins.__import__
+
+    def install(self):
+        """
+        Starting measuring the imports
+
+        Returns:
+            :return: None
+        """
+
+        builtins.__import__ = self.profile_import
+
+    def uninstall(self):
+        """
+        Stopping measuring the imports
+
+        Returns:
+            :return: None
+        """
+
+        if builtins.__import__ == self.profile_import:
+            builtins.__import__ = self._import
+
+    def profile_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # The loaded modules and the relative imports are counted in the import in progress
+        if level or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        stack = self._thread.__dict__.setdefault("nested", list())
+        start = perf_counter()
+        stack.append(0.0)
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            total = perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += total
+            self.imports.append((name, total, total - nested))
+
+    def mark(self, name):
+        """
+        Recording the startup milestone
+
+        Args:
+            :param name: Milestone name
+            :type name: str
+
+        Returns:
+            :return: None
+        """
+
+        self.marks.append((name, perf_counter() - self.start))
+
+    def report(self, stage_times, budget=None, top=15):
+        """
+        Getting the report of the startup
+
+        Args:
+            :param stage_times: Duration of every initialization stage, s
+            :type stage_times: dict
+            :param budget: Startup time budget, s, None - not checked
+            :type budget: float
+            :param top: The number of the slowest imports
+            :type top: int
+
+        Returns:
+            :return: Report text
+            :rtype: str
+        """
+
+        lines = ["Startup profile", "Imports, total / self, ms:"]
+        for name, total, own in sorted(self.imports, key=lambda x: x[1], reverse=True)[:top]:
+            lines.append("  {0:<40} {1:9.1f} {2:9.1f}".format(name, total * 1000, own * 1000))
+        lines.append("Initialization stages, ms:")
+        for stage, duration in stage_times.items():
+            lines.append("  {0:<40} {1:9.1f}".format(stage, duration * 1000))
+        lines.append("Milestones since the start, ms:")
+        for name, elapsed in self.marks:
+            lines.append("  {0:<40} {1:9.1f}".format(name, elapsed * 1000))
+        if budget is not None:
+            elapsed = self.elapsed()
+            lines.append("Startup {0:.1f} ms, budget {1:.1f} ms: {2}".format(
+                elapsed * 1000, budget * 1000, "OK" if elapsed <= budget else "EXCEEDED"))
+        return "\n".join(lines)
+
+    def elapsed(self):
+        """
+        Getting the time of the last milestone
+
+        Returns:
+            :return: Time since the start, s
+            :rtype: float
+        """
+
+        return self.marks[-1][1] if self.marks else perf_counter() - self.start
+
+
+def start(enabled=False):
+    """
+    Starting the profiler if it is enabled by the caller or with the CMRI_PROFILE environment variable
+
+    Args:
+        :param enabled: Profiling is requested, e.g. with the command line argument
+        :type enabled: bool
+
+    Returns:
+        :return: Started profiler or None if profiling is disabled
+        :rtype: StartupProfiler
+    """
+
+    global profiler
+    if enabled or environ.get("CMRI_PROFILE", "") not in ("", "0"):
+        profiler = StartupProfiler()
+        profiler.install()
+    return profiler
+
+
+def mark(name):
+    """
+    Recording the startup milestone if profiling is enabled
+
+    Args:
+        :param name: Milestone name
+        :type name: str
+
+    Returns:
+        :return: None
+    """
+
+    if profiler is not None:
+        profiler.mark(name)
+
+
+# Profiler of the current startup, None - profiling is disabled
+profiler = None
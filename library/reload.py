@@ -0,0 +1,133 @@
+# Differences between two configurations
+from collections import namedtuple
+# Threading interface
+from threading import Thread, Event
+
+# Differences between the configurations from the GitLab server:
+#   renamed - stands with the same seats under a new name {old name: new name}
+#   added - new stands, removed - stands missing from the new configuration
+#   seats - changed seats of the remaining stands under their new names {stand: {place: (old address, new address)}},
+#           the address of the added or removed seat is None on the missing side
+ConfigDiff = namedtuple("ConfigDiff", ["renamed", "added", "removed", "seats"])
+
+
+def stand_seats(config, stand):
+    """
+    Getting the seats of the stand
+
+    Args:
+        :param config: Configuration from the GitLab server
+        :type config: ConfigParser
+        :param stand: Stand name
+        :type stand: str
+
+    Returns:
+        :return: Address of every seat {place: address}
+        :rtype: dict
+    """
+
+    return {place: int(address, 16) for place, address in config[stand].items()}
+
+
+def diff_config(old, new):
+    """
+    Comparing the configurations from the GitLab server
+
+    A removed stand is considered renamed when an added stand has exactly the same seats.
+    The rename is not guessed when several removed or added stands have these seats,
+    such stands are reported as removed and added.
+
+    Args:
+        :param old: Applied configuration
+        :type old: ConfigParser
+        :param new: Received configuration
+        :type new: ConfigParser
+
+    Returns:
+        :return: Differences between the configurations
+        :rtype: ConfigDiff
+    """
+
+    old_stands = {stand: stand_seats(old, stand) for stand in old.sections()}
+    new_stands = {stand: stand_seats(new, stand) for stand in new.sections()}
+    removed = [stand for stand in old_stands if stand not in new_stands]
+    added = [stand for stand in new_stands if stand not in old_stands]
+
+    # Removed and added stands by their seats, only the single pair of the same seats is renamed
+    removed_by_seats = dict()
+    for stand in removed:
+        removed_by_seats.setdefault(frozenset(old_stands[stand].items()), list()).append(stand)
+    added_by_seats = dict()
+    for stand in added:
+        added_by_seats.setdefault(frozenset(new_stands[stand].items()), list()).append(stand)
+    renamed = dict()
+    for key, stands in removed_by_seats.items():
+        candidates = added_by_seats.get(key, [])
+        if len(stands) == 1 and len(candidates) == 1:
+            renamed[stands[0]] = candidates[0]
+            removed.remove(stands[0])
+            added.remove(candidates[0])
+
+    seats = dict()
+    for stand, old_seats in old_stands.items():
+        name = renamed.get(stand, stand)
+        if name not in new_stands:
+            continue
+        new_seats = new_stands[name]
+        changes = {place: (old_seats.get(place), new_seats.get(place))
+                   for place in list(old_seats) + [x for x in new_seats if x not in old_seats]
+                   if old_seats.get(place) != new_seats.get(place)}
+        if changes:
+            seats[name] = changes
+    return ConfigDiff(renamed, added, removed, seats)
+
+
+class ConfigWatcher(Thread):
+    """
+    Background checking of the configuration in the GitLab server
+
+    The configuration is revalidated every interval, the changed configuration is passed to the callable
+    from the watcher thread. The unavailable server is checked again on the next interval.
+    """
+
+    def __init__(self, fetch, entry, changed, interval=60.0):
+        """
+        Args:
+            :param fetch: Callable getting the actual configuration for the cached one,
+                          returns the cached configuration itself if it was not changed
+            :type fetch: callable
+            :param entry: Applied configuration {"project", "ref", "commit", "blob_id", "raw"}
+            :type entry: dict
+            :param changed: Callable receiving the changed configuration, it is called from the watcher thread
+            :type changed: callable
+            :param interval: Interval between the checks, s
+            :type interval: float
+        """
+
+        super(ConfigWatcher, self).__init__(daemon=True)
+        self.fetch = fetch
+        self.entry = entry
+        self.changed = changed
+        self.interval = interval
+        self._stop_event = Event()
+
+    def stop(self):
+        """
+        Stopping the watcher thread
+
+        Returns:
+            :return: None
+        """
+
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                entry = self.fetch(self.entry)
+            except Exception:
+                continue
+            if entry is self.entry:
+                continue
+            self.entry = entry
+            self.changed(entry)
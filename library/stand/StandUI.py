@@ -1,38 +1,42 @@
 # Software configuration
 from library import config as sw_cfg
-# LED status widget
-from library.stand.led import LedWidget
-
-# Suspending execution of the polling thread for the given number of seconds
-from time import sleep
-# Getting all possible combinations from the list
-from itertools import combinations
-# Foreign C compatible data types for the current transformers library
-from ctypes import byref, c_int, c_long
-# Threading interface
-from threading import Thread, currentThread
+# Seats model of the connected stands
+from library.stand.model import StandModel
+# Painting of the seat cells
+from library.stand.delegate import LedDelegate, CELL_SIZE
+# Latest readings of the whole bus
+from library.polling.state import BusState
+# Device table
+from library.polling.table import Device
+
+# Lock-free queue of the readings published by the polling threads
+from collections import deque
 # PyQt5 modules
-from PyQt5.QtGui import QColor
-from PyQt5.QtCore import QRect
-from PyQt5.QtWidgets import QWidget, QGroupBox, QHBoxLayout
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView, QAbstractItemView, QMessageBox
+
+# Flash rate of the LEDs, ms
+FLASH_RATE = 100
+# Limits of the frame rate of the display, frames per second: the zero or negative rate shows one frame per second,
+# the frame interval is at least 1 ms
+MIN_FRAME_RATE = 1
+MAX_FRAME_RATE = 1000
 
 
-def cmri_click(box):
+def cmri_click(device):
     """
-    Actions when the CMRI group pressed
+    Actions when the seat cell pressed
 
     Args:
-        :param box: CMRI group widget
-        :type box: QGroupBox
+        :param device: Device of the seat
+        :type device: library.polling.table.Device
 
     Returns:
         :return: None
     """
 
-    # Getting the address of the device from the group title
-    sw_cfg.reset_id = int(box.title().split(" ")[2], 16)
-    # Setting the polling pause
-    sw_cfg.polling_thread.do_pause = True
+    # Queuing the reset of the device, the polling thread executes it before its next read
+    sw_cfg.polling_threads[device.port].reset(device.address)
 
 
 class StandUI(QWidget):
@@ -41,149 +45,276 @@ class StandUI(QWidget):
 
     def __init__(self, parent=None):
         super(StandUI, self).__init__(parent)
+        # Readings published by the polling threads and applied by the GUI thread
+        self.readings = deque()
+        # Latest readings and limit and fault evaluation of the whole bus
+        self.state = BusState(len(sw_cfg.device_table))
+        # Readings history of every device
+        self.history = sw_cfg.get_history(sw_cfg.auth_config, len(sw_cfg.device_table))
+        self.rules = sw_cfg.get_rules_engine(sw_cfg.auth_config, sw_cfg.device_table)
+        # Absent devices
+        self.absent = set()
+        # Connected stands removed from the configuration
+        self.removed = set()
+
         # Setting the GUI
-        # The initial Y coordinate of the rack group offset
-        stand_y = 0
-        for idx, stand in enumerate(sw_cfg.stand_list, start=1):
-            self.interface["stand_{0}".format(idx)] = QGroupBox("Stand \"{0}\"".format(stand), self)
-            self.interface["stand_{0}".format(idx)].setGeometry(QRect(0, stand_y, 891, 151))
-            # The initial X coordinate of the row group offset
-            row_x = 10
-            # Initializing IDs for the CMRI seats
-            id_top = 16
-            id_bot = 1
-            # Setting 8 devices per row
-            for row in range(1, 9):
-                # The initial Y coordinate of the column group offset
-                col_y = 20
-                # Setting 2 rows
-                for col in range(1, 3):
-                    # Setting IDs for the CMRI seats
-                    if col % 2:
-                        box_id = id_top
-                    else:
-                        box_id = id_bot
-
-                    # CMRI group
-                    self.interface["cmri_{0}{1}".format(stand, box_id)] = \
-                        QGroupBox(str(box_id) + " - " + sw_cfg.git_config[stand][box_id],
-                                  self.interface["stand_{0}".format(idx)])
-                    self.interface["cmri_{0}{1}".format(stand, box_id)].setGeometry(QRect(row_x, col_y, 100, 60))
-                    sw_cfg.clickable_widget(self.interface["cmri_{0}{1}".format(stand, box_id)]).connect(
-                        lambda x=self.interface["cmri_{0}{1}".format(stand, box_id)]: cmri_click(x))
-                    # Horizontal layout inside the group
-                    self.interface["layout_{0}{1}".format(stand, box_id)] = \
-                        QHBoxLayout(self.interface["cmri_{0}{1}".format(stand, box_id)])
-                    # Phase №1
-                    self.interface["L1_{0}{1}".format(stand, box_id)] = \
-                        LedWidget(self.interface["cmri_{0}{1}".format(stand, box_id)])
-                    self.interface["layout_{0}{1}".format(stand, box_id)].addWidget(
-                        self.interface["L1_{0}{1}".format(stand, box_id)])
-                    # Phase №2
-                    self.interface["L2_{0}{1}".format(stand, box_id)] = \
-                        LedWidget(self.interface["cmri_{0}{1}".format(stand, box_id)])
-                    self.interface["layout_{0}{1}".format(stand, box_id)].addWidget(
-                        self.interface["L2_{0}{1}".format(stand, box_id)])
-                    # Phase №3
-                    self.interface["L3_{0}{1}".format(stand, box_id)] = \
-                        LedWidget(self.interface["cmri_{0}{1}".format(stand, box_id)])
-                    self.interface["layout_{0}{1}".format(stand, box_id)].addWidget(
-                        self.interface["L3_{0}{1}".format(stand, box_id)])
-                    # Updating Y coordinate of the column group offset
-                    col_y += 60
-                # Updating X coordinate of the row group offset
-                row_x += 110
-                # Updating IDs for the CMRI seats
-                id_top -= 1
-                id_bot += 1
-            # Updating Y coordinate of the rack group offset
-            stand_y += 160
-        # Setting the main polling thread and default attributes
-        sw_cfg.polling_thread = Thread(target=self.device_polling, daemon=True)
-        sw_cfg.polling_thread.do_run = True
-        sw_cfg.polling_thread.do_pause = False
-        sw_cfg.polling_thread.start()
-
-    def device_polling(self):
+        # Seats of the stands in the rows of the fixed length, only the visible cells are painted
+        # and the view scrolls any number of stands
+        self.model = StandModel(self.state, sw_cfg.auth_config.getint("SETTING", "STAND_COLUMNS", fallback=8), self)
+        self.model.set_devices(sw_cfg.stand_list, sw_cfg.device_table)
+        self.interface["vertical_layout"] = QVBoxLayout(self)
+        self.interface["vertical_layout"].setContentsMargins(0, 0, 0, 0)
+        self.interface["stand_view"] = QTableView(self)
+        self.interface["stand_view"].setModel(self.model)
+        self.interface["stand_view"].setItemDelegate(LedDelegate(self.interface["stand_view"]))
+        self.interface["stand_view"].setSelectionMode(QAbstractItemView.NoSelection)
+        self.interface["stand_view"].setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.interface["stand_view"].setFocusPolicy(Qt.NoFocus)
+        self.interface["stand_view"].setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        # The fixed cell size does not require the size of every cell
+        for header, size in ((self.interface["stand_view"].horizontalHeader(), CELL_SIZE.width()),
+                             (self.interface["stand_view"].verticalHeader(), CELL_SIZE.height())):
+            header.setSectionResizeMode(QHeaderView.Fixed)
+            header.setDefaultSectionSize(size)
+        self.interface["stand_view"].horizontalHeader().hide()
+        self.interface["stand_view"].clicked.connect(self.cell_click)
+        self.interface["vertical_layout"].addWidget(self.interface["stand_view"])
+        for stand in sw_cfg.stand_list:
+            self.set_stand_title(stand)
+
+        # Applying the readings in batches with the bounded frame rate
+        self.frame_timer = QTimer(self)
+        self.frame_timer.timeout.connect(self.apply_readings)
+        frame_rate = sw_cfg.auth_config.getfloat("SETTING", "FRAME_RATE", fallback=10)
+        self.frame_timer.start(int(1000 / min(max(frame_rate, MIN_FRAME_RATE), MAX_FRAME_RATE)))
+        # Flashing the LEDs of the temperature outside the limits, the timer runs while the LEDs flash
+        self.flash_timer = QTimer(self)
+        self.flash_timer.timeout.connect(self.model.flash)
+
+        # Setting the telemetry log of the readings
+        self.listeners = [self.readings.append]
+        sw_cfg.telemetry_writer = sw_cfg.get_telemetry_writer(sw_cfg.auth_config, sw_cfg.device_table)
+        if sw_cfg.telemetry_writer is not None:
+            self.listeners.append(sw_cfg.telemetry_writer.publish)
+            sw_cfg.telemetry_writer.start()
+        # Streaming the readings to the subscribers, the polling is not stopped by the busy port
+        try:
+            sw_cfg.fanout_server = sw_cfg.get_fanout_server(sw_cfg.auth_config, sw_cfg.device_table)
+        except OSError as error:
+            QMessageBox.warning(self, sw_cfg.program_title, "The readings server is not started:\n" + str(error))
+        if sw_cfg.fanout_server is not None:
+            self.listeners.append(sw_cfg.fanout_server.publish)
+            sw_cfg.fanout_server.start()
+
+        # Setting the polling thread for every port with the stands
+        self.set_polling(sw_cfg.bus_list)
+
+    # Actions when the seat cell pressed, the empty cells and the absent seats are not pressed
+    def cell_click(self, index):
+        device = self.model.device(index)
+        if device is not None:
+            cmri_click(device)
+
+    def set_polling(self, ports):
+        """
+        Setting the devices of the polling threads, the polling thread is started for the port without it
+
+        The running polling thread gets a new list of the devices and keeps iterating the previous list
+        until the end of its current cycle.
+
+        Args:
+            :param ports: COM-port names
+            :type ports: list
+
+        Returns:
+            :return: None
+        """
+
+        for port in ports:
+            devices = [device for device in sw_cfg.device_table if device.port == port and device.active]
+            if port in sw_cfg.polling_threads:
+                sw_cfg.polling_threads[port].devices = devices
+            elif devices:
+                sw_cfg.polling_threads[port] = sw_cfg.get_bus_poller(port, devices, self.listeners)
+                sw_cfg.polling_threads[port].start()
+
+    def set_stand_title(self, stand):
+        """
+        Showing the number of absent seats in the stand title
+
+        Args:
+            :param stand: Stand name
+            :type stand: str
+
+        Returns:
+            :return: None
+        """
+
+        title = "Stand \"{0}\"".format(stand)
+        if stand in self.removed:
+            title += "\nremoved from the configuration"
+        else:
+            absent_qty = sum(1 for x in self.absent if x.stand == stand)
+            if absent_qty:
+                title += "\nnot present: {0}".format(absent_qty)
+        self.model.set_title(stand, title)
+
+    def apply_config(self, diff):
         """
-        Current transformer polling thread
+        Applying the changed configuration from the GitLab server without reconnecting
+
+        The devices of the changed seats are updated in place, the added seats of the connected stands get new
+        devices at the end of the device table, the removed seats and stands are not polled anymore.
+        Polling of the unchanged stands continues.
+
+        Args:
+            :param diff: Differences between the applied and the received configuration
+            :type diff: library.reload.ConfigDiff
+
+        Returns:
+            :return: None
+        """
+
+        device_table = sw_cfg.device_table
+        ports = set()
+        # Renaming the stands keeping their rows
+        for old, new in diff.renamed.items():
+            if old not in sw_cfg.stand_list:
+                continue
+            sw_cfg.stand_list[sw_cfg.stand_list.index(old)] = new
+            sw_cfg.stand_ports[new] = sw_cfg.stand_ports.pop(old)
+            self.model.rename_stand(old, new)
+            for device in device_table:
+                if device.stand == old:
+                    device.stand = new
+
+        # Stopping the polling of the removed stands
+        for stand in diff.removed:
+            if stand not in sw_cfg.stand_list:
+                continue
+            self.removed.add(stand)
+            for device in device_table:
+                if device.stand == stand and device.active:
+                    self.remove_device(device)
+                    ports.add(device.port)
+
+        # Updating the seats of the connected stands
+        devices = {(device.stand, device.place): device for device in device_table}
+        added = False
+        for stand, seats in diff.seats.items():
+            if stand not in sw_cfg.stand_list:
+                continue
+            for place, (old_address, address) in seats.items():
+                device = devices.get((stand, place))
+                if address is None:
+                    if device is not None and device.active:
+                        self.remove_device(device)
+                        ports.add(device.port)
+                    continue
+                if device is None:
+                    device = Device(len(device_table), address, stand, place, sw_cfg.stand_ports[stand])
+                    device_table.append(device)
+                    added = True
+                device.address = address
+                device.active = True
+                self.absent.discard(device)
+                ports.add(device.port)
+
+        # Resizing the arrays of the whole bus before the new devices are polled
+        if added:
+            self.state.resize(len(device_table))
+            self.history.resize(len(device_table))
+        # Updating the seats of the rows, the changed seats are shown as not answered yet
+        self.model.set_devices(sw_cfg.stand_list, device_table)
+        for stand, seats in diff.seats.items():
+            for place, (old_address, address) in seats.items():
+                device = devices.get((stand, place))
+                if address is not None and device is not None:
+                    self.model.clear(device)
+                    # The reading of the previous current transformer does not suppress the new one
+                    thread = sw_cfg.polling_threads.get(device.port)
+                    if thread is not None and thread.deadband is not None:
+                        thread.deadband.forget(device.index)
+        for stand in sw_cfg.stand_list:
+            self.set_stand_title(stand)
+        self.rules = sw_cfg.get_rules_engine(sw_cfg.auth_config, device_table)
+        if sw_cfg.telemetry_writer is not None:
+            sw_cfg.telemetry_writer.set_devices(device_table)
+        if sw_cfg.fanout_server is not None:
+            sw_cfg.fanout_server.set_devices(device_table)
+        self.set_polling(sorted(ports))
+
+    def remove_device(self, device):
+        """
+        Stopping the polling of the device removed from the configuration, the seat is not shown anymore
+
+        Args:
+            :param device: Device of the current transformer
+            :type device: library.polling.table.Device
 
         Returns:
             :return: None
         """
 
-        # Getting the polling thread
-        polling_thread = currentThread()
-        # The primary polling cycle during the do_run = True
-        while getattr(polling_thread, "do_run"):
-            # Getting the data from current transformers during the do_pause = False
-            while not getattr(polling_thread, "do_pause"):
-                # Checking for the polling stop do_run = False
-                if not getattr(polling_thread, "do_run"):
-                    break
-                # Continue polling
-                for stand in sw_cfg.stand_list:
-                    for place in sw_cfg.git_config[stand]:
-                        # Checking for the polling stop do_run = False or the polling pause do_pause = True
-                        if not getattr(polling_thread, "do_run") or getattr(polling_thread, "do_pause"):
-                            break
-                        # Highlighting of the current polling current transformer
-                        self.interface["cmri_{0}{1}".format(stand, place)].setStyleSheet("color: rgb(255, 0, 0);")
-                        # Setting the address of the polled current transformer
-                        device = int(sw_cfg.git_config[stand][place], 16)
-
-                        # Getting status
-                        get_status = sw_cfg.cmri_dll.CMRI_GetStatus(byref(c_long(device)), byref(sw_cfg.GetStatus))
-                        # Checking for the presence of a current transformer on the line
-                        if get_status is not 0:
-                            # Removing the highlight of the polled device and proceeding to the next one
-                            self.interface["cmri_{0}{1}".format(stand, place)].setStyleSheet("")
-                            continue
-
-                        # Getting a list of phases with an error
-                        phase_list = list()
-                        for index in range(len(sw_cfg.phase_bits), 0, -1):
-                            for sequence in combinations(sw_cfg.phase_bits, index):
-                                if sum(sequence) == sw_cfg.GetStatus.value:
-                                    for bit in list(sequence):
-                                        phase_list.append(sw_cfg.phase_bits.index(bit) + 1)
-
-                        # Setting the corresponding indication in the presence and absence of errors
-                        for idx in range(1, 4):
-                            if idx in phase_list:
-                                self.interface["L{0}_{1}{2}".format(idx, stand, place)].setColor(QColor("red"))
-                            else:
-                                self.interface["L{0}_{1}{2}".format(idx, stand, place)].setColor(QColor("green"))
-
-                        # Getting voltage
-                        sw_cfg.cmri_dll.CMRI_GetVoltage(c_long(device), c_int(1), byref(sw_cfg.GetVoltage_1))
-                        sw_cfg.cmri_dll.CMRI_GetVoltage(c_long(device), c_int(2), byref(sw_cfg.GetVoltage_2))
-                        sw_cfg.cmri_dll.CMRI_GetVoltage(c_long(device), c_int(3), byref(sw_cfg.GetVoltage_3))
-                        # Getting current
-                        sw_cfg.cmri_dll.CMRI_GetCurrent(c_long(device), c_int(1), byref(sw_cfg.GetCurrent_1))
-                        sw_cfg.cmri_dll.CMRI_GetCurrent(c_long(device), c_int(2), byref(sw_cfg.GetCurrent_2))
-                        sw_cfg.cmri_dll.CMRI_GetCurrent(c_long(device), c_int(3), byref(sw_cfg.GetCurrent_3))
-                        # Getting temperature
-                        sw_cfg.cmri_dll.CMRI_GetTemp(c_long(device), byref(sw_cfg.GetTemp))
-                        # Setting tooltip
-                        self.interface["cmri_{0}{1}".format(stand, place)].setToolTip(
-                            "<b>Voltage L1: </b>" + str(sw_cfg.GetVoltage_1.value) + " В <br>" +
-                            "<b>Voltage L2: </b>" + str(sw_cfg.GetVoltage_2.value) + " В <br>" +
-                            "<b>Voltage L3: </b>" + str(sw_cfg.GetVoltage_3.value) + " В <br>" +
-                            "<b>Current L1: </b>" + str(sw_cfg.GetCurrent_1.value) + " А <br>" +
-                            "<b>Current L2: </b>" + str(sw_cfg.GetCurrent_2.value) + " А <br>" +
-                            "<b>Current L3: </b>" + str(sw_cfg.GetCurrent_3.value) + " А <br>" +
-                            "<b>Temperature: </b>" + str(sw_cfg.GetTemp.value) + " °C")
-                        # Removing the highlight of the polled device
-                        self.interface["cmri_{0}{1}".format(stand, place)].setStyleSheet("")
-                        # Suspending execution of the polling thread for the given number of seconds
-                        sleep(sw_cfg.polling_time)
-            # Actions when the do_pause = True set
-            while getattr(polling_thread, "do_pause"):
-                # Checking for the polling stop do_run = False
-                if not getattr(polling_thread, "do_run"):
-                    break
-                # Resetting the specified address
-                sw_cfg.cmri_dll.CMRI_Reset(c_long(sw_cfg.reset_id))
-                # Exiting from the pause
-                sw_cfg.polling_thread.do_pause = False
+        device.active = False
+        self.absent.discard(device)
+
+    def apply_readings(self):
+        """
+        Applying the readings published by the polling threads since the previous frame
+
+        Only the latest reading of every device is applied, only the cells with the changed indication are repainted.
+
+        Returns:
+            :return: None
+        """
+
+        # Coalescing the readings of every device, the history receives all readings
+        latest = dict()
+        readings = self.readings
+        history = self.history
+        while readings:
+            reading = readings.popleft()
+            latest[reading.index] = reading
+            if reading.present:
+                history.append(reading.index, reading.time,
+                               reading.voltage + reading.current + (reading.temp, reading.status))
+
+        # Highlighting of the current polling current transformers
+        model = self.model
+        model.set_highlighted({x.current.index for x in sw_cfg.polling_threads.values() if x.current is not None})
+
+        if not latest:
+            return
+        # Evaluating the alarms of the whole bus with the new readings
+        for reading in latest.values():
+            self.state.update(reading)
+        alarms = self.rules.evaluate(self.state)
+
+        changed_stands = set()
+        device_table = sw_cfg.device_table
+        for index, reading in latest.items():
+            device = device_table[index]
+            # The reading polled before the seat was removed from the configuration
+            if not device.active:
+                continue
+            if device in self.absent and reading.present:
+                self.absent.discard(device)
+                changed_stands.add(device.stand)
+            if not reading.present:
+                if device not in self.absent:
+                    self.absent.add(device)
+                    changed_stands.add(device.stand)
+                model.set_absent(device)
+                continue
+            model.set_alarms(device, int(alarms[index]))
+
+        # Showing the number of absent seats in the stand title
+        for stand in changed_stands:
+            self.set_stand_title(stand)
+        # Flashing the LEDs while the temperature of any device is outside the limits
+        if model.flashing and not self.flash_timer.isActive():
+            self.flash_timer.start(FLASH_RATE)
+        elif not model.flashing and self.flash_timer.isActive():
+            self.flash_timer.stop()
+            model.flash_state = True
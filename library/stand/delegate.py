@@ -0,0 +1,54 @@
+# Seat cell data roles
+from library.stand.model import LEDS_ROLE
+# Pre-rendered LED images
+from library.stand.led import led_pixmap
+
+# PyQt5 modules
+from PyQt5.QtGui import QPalette
+from PyQt5.QtCore import Qt, QSize, QRect
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QApplication
+
+# Size of the seat cell, px
+CELL_SIZE = QSize(90, 60)
+# LED diameter, px
+LED_DIAMETER = 20
+# Height of the seat title, px
+TITLE_HEIGHT = 18
+
+
+class LedDelegate(QStyledItemDelegate):
+    """
+    Painting the seat cell: the seat title and the LEDs of the three phases
+
+    The LEDs are drawn from the pre-rendered images, the absent seat is painted with the disabled colors.
+    """
+
+    def sizeHint(self, option, index):
+        return CELL_SIZE
+
+    def paint(self, painter, option, index):
+        leds = index.data(LEDS_ROLE)
+        if leds is None:
+            return
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, widget)
+
+        rect = option.rect
+        enabled = bool(option.state & QStyle.State_Enabled)
+        foreground = index.data(Qt.ForegroundRole)
+        if foreground is None or not enabled:
+            foreground = option.palette.color(QPalette.Active if enabled else QPalette.Disabled, QPalette.Text)
+        painter.save()
+        painter.setPen(foreground)
+        painter.drawText(QRect(rect.x() + 6, rect.y() + 2, rect.width() - 12, TITLE_HEIGHT),
+                         Qt.AlignLeft | Qt.AlignVCenter, index.data(Qt.DisplayRole))
+
+        # The LEDs are spread evenly under the title
+        ratio = widget.devicePixelRatioF() if widget is not None else 1.0
+        step = rect.width() // len(leds)
+        y = rect.y() + TITLE_HEIGHT + (rect.height() - TITLE_HEIGHT - LED_DIAMETER) // 2
+        for number, (color, lit) in enumerate(leds):
+            x = rect.x() + number * step + (step - LED_DIAMETER) // 2
+            painter.drawPixmap(x, y, led_pixmap(color, lit, LED_DIAMETER, ratio))
+        painter.restore()
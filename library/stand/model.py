@@ -0,0 +1,317 @@
+# Alarm bits of the device
+from library.polling.rules import PHASE_FAULT, PHASE_ALARMS, TEMP_ALARM
+
+# PyQt5 modules
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# LED colors of the absent seat, the phase fault, the readings outside the limits and the normal readings
+GRAY = QColor("gray")
+RED = QColor("red")
+ORANGE = QColor("orange")
+GREEN = QColor("green")
+# Colors of the LEDs of the seat that has not answered yet or is absent
+OFF = (GRAY, GRAY, GRAY)
+
+# Roles of the seat cell data: device of the cell and [(color, lit), ...] of the phase LEDs
+DEVICE_ROLE = Qt.UserRole
+LEDS_ROLE = Qt.UserRole + 1
+
+
+class StandModel(QAbstractTableModel):
+    """
+    Seats of the connected stands in the configuration order, the seats of the stand fill one or more rows
+
+    The indication of every device is kept by the device index, the view requests the data of the visible
+    cells only and the changed cells are repainted only. The cells after the last seat of the stand are empty.
+    """
+
+    def __init__(self, state, columns, parent=None):
+        """
+        Args:
+            :param state: Latest readings of the whole bus shown in the tooltips
+            :type state: library.polling.state.BusState
+            :param columns: The number of seats in the row
+            :type columns: int
+            :param parent: Parent object
+        """
+
+        super(StandModel, self).__init__(parent)
+        self.state = state
+        self.columns = columns
+        # Stand of every row, active devices of every row and the cell of every device {index: (row, column)}
+        self.stands = list()
+        self.rows = list()
+        self.cells = dict()
+        # Stand titles {stand: title}
+        self.titles = dict()
+        # LED colors and the enabled seats by the device index
+        self.colors = list()
+        self.enabled = list()
+        # Indices of the devices with the flashing LEDs and of the highlighted devices
+        self.flashing = set()
+        self.highlighted = set()
+        # The flashing LEDs are lit
+        self.flash_state = True
+
+    def set_devices(self, stands, devices):
+        """
+        Setting the stands and the devices, the indication of the remaining devices is kept
+
+        Args:
+            :param stands: Stand names of the rows
+            :type stands: list
+            :param devices: Device table
+            :type devices: list
+
+        Returns:
+            :return: None
+        """
+
+        self.beginResetModel()
+        seats = {stand: list() for stand in stands}
+        for device in devices:
+            if device.active and device.stand in seats:
+                seats[device.stand].append(device)
+        # The stand without seats keeps one empty row for its title
+        self.stands = list()
+        self.rows = list()
+        for stand in stands:
+            for start in range(0, max(len(seats[stand]), 1), self.columns):
+                self.stands.append(stand)
+                self.rows.append(seats[stand][start:start + self.columns])
+        self.cells = {device.index: (row, column)
+                      for row, row_devices in enumerate(self.rows) for column, device in enumerate(row_devices)}
+        # The new devices are shown as not answered yet
+        self.colors.extend(OFF for _ in range(len(devices) - len(self.colors)))
+        self.enabled.extend(True for _ in range(len(devices) - len(self.enabled)))
+        self.flashing &= set(self.cells)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.columns
+
+    def device(self, index):
+        """
+        Getting the device of the cell
+
+        Args:
+            :param index: Cell index
+            :type index: QModelIndex
+
+        Returns:
+            :return: Device of the cell, None for the empty cell
+            :rtype: library.polling.table.Device
+        """
+
+        if not index.isValid():
+            return None
+        row_devices = self.rows[index.row()]
+        return row_devices[index.column()] if index.column() < len(row_devices) else None
+
+    def data(self, index, role=Qt.DisplayRole):
+        device = self.device(index)
+        if device is None:
+            return None
+        if role == Qt.DisplayRole:
+            return "{0} - {1:X}".format(device.place, device.address)
+        if role == LEDS_ROLE:
+            lit = self.flash_state or device.index not in self.flashing
+            return [(color, lit) for color in self.colors[device.index]]
+        if role == Qt.ForegroundRole:
+            return RED if device.index in self.highlighted else None
+        if role == Qt.ToolTipRole:
+            return self.tooltip(device)
+        if role == DEVICE_ROLE:
+            return device
+        return None
+
+    def flags(self, index):
+        device = self.device(index)
+        # The absent seat is disabled and is not clicked
+        if device is None or not self.enabled[device.index]:
+            return Qt.ItemNeverHasChildren
+        return Qt.ItemIsEnabled | Qt.ItemNeverHasChildren
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or orientation != Qt.Vertical:
+            return None
+        # The title is shown in the first row of the stand
+        stand = self.stands[section]
+        if section and self.stands[section - 1] == stand:
+            return ""
+        return self.titles.get(stand, stand)
+
+    def tooltip(self, device):
+        """
+        Getting the tooltip with the latest readings of the device, the tooltip is built when it is shown
+
+        Args:
+            :param device: Device of the current transformer
+            :type device: library.polling.table.Device
+
+        Returns:
+            :return: Tooltip text, None for the seat that has not answered yet
+            :rtype: str
+        """
+
+        if not self.enabled[device.index]:
+            return "Not present"
+        state = self.state
+        index = device.index
+        if not state.present[index]:
+            return None
+        voltage = state.voltage[index]
+        current = state.current[index]
+        return ("<b>Voltage L1: </b>" + str(float(voltage[0])) + " В <br>" +
+                "<b>Voltage L2: </b>" + str(float(voltage[1])) + " В <br>" +
+                "<b>Voltage L3: </b>" + str(float(voltage[2])) + " В <br>" +
+                "<b>Current L1: </b>" + str(float(current[0])) + " А <br>" +
+                "<b>Current L2: </b>" + str(float(current[1])) + " А <br>" +
+                "<b>Current L3: </b>" + str(float(current[2])) + " А <br>" +
+                "<b>Temperature: </b>" + str(float(state.temp[index])) + " °C")
+
+    def _changed(self, index):
+        cell = self.cells.get(index)
+        if cell is not None:
+            model_index = self.index(*cell)
+            self.dataChanged.emit(model_index, model_index)
+
+    def set_alarms(self, device, alarms):
+        """
+        Showing the alarms of the present current transformer
+
+        The phase fault is red, the readings outside the limits are orange, the temperature outside the limits
+        flashes the LEDs. The cell is repainted only when its indication is changed.
+
+        Args:
+            :param device: Device of the current transformer
+            :type device: library.polling.table.Device
+            :param alarms: Alarm bits of the device
+            :type alarms: int
+
+        Returns:
+            :return: None
+        """
+
+        index = device.index
+        colors = tuple(RED if alarms & fault else ORANGE if alarms & phase_alarms else GREEN
+                       for fault, phase_alarms in zip(PHASE_FAULT, PHASE_ALARMS))
+        flashing = bool(alarms & TEMP_ALARM)
+        if colors == self.colors[index] and self.enabled[index] and flashing == (index in self.flashing):
+            return
+        self.colors[index] = colors
+        self.enabled[index] = True
+        if flashing:
+            self.flashing.add(index)
+        else:
+            self.flashing.discard(index)
+        self._changed(index)
+
+    def set_absent(self, device):
+        """
+        Showing the current transformer as not present, the LEDs are turned off
+
+        Args:
+            :param device: Device of the current transformer
+            :type device: library.polling.table.Device
+
+        Returns:
+            :return: None
+        """
+
+        index = device.index
+        if not self.enabled[index] and self.colors[index] == OFF:
+            return
+        self.colors[index] = OFF
+        self.enabled[index] = False
+        self.flashing.discard(index)
+        self._changed(index)
+
+    def clear(self, device):
+        """
+        Showing the current transformer as not answered yet, e.g. after its address is changed
+
+        Args:
+            :param device: Device of the current transformer
+            :type device: library.polling.table.Device
+
+        Returns:
+            :return: None
+        """
+
+        index = device.index
+        self.colors[index] = OFF
+        self.enabled[index] = True
+        self.flashing.discard(index)
+        self._changed(index)
+
+    def set_highlighted(self, highlighted):
+        """
+        Highlighting the devices
+
+        Args:
+            :param highlighted: Indices of the highlighted devices
+            :type highlighted: set
+
+        Returns:
+            :return: None
+        """
+
+        changed = self.highlighted ^ highlighted
+        self.highlighted = highlighted
+        for index in changed:
+            self._changed(index)
+
+    def set_title(self, stand, title):
+        """
+        Setting the stand title shown in the row header
+
+        Args:
+            :param stand: Stand name
+            :type stand: str
+            :param title: Stand title
+            :type title: str
+
+        Returns:
+            :return: None
+        """
+
+        if self.titles.get(stand) == title:
+            return
+        self.titles[stand] = title
+        if stand in self.stands:
+            row = self.stands.index(stand)
+            self.headerDataChanged.emit(Qt.Vertical, row, row)
+
+    def rename_stand(self, old, new):
+        """
+        Renaming the stand keeping its rows
+
+        Args:
+            :param old: Previous stand name
+            :type old: str
+            :param new: New stand name
+            :type new: str
+
+        Returns:
+            :return: None
+        """
+
+        self.stands = [new if stand == old else stand for stand in self.stands]
+        self.titles.pop(old, None)
+
+    def flash(self):
+        """
+        Switching the flashing LEDs, all LEDs flash in phase
+
+        Returns:
+            :return: None
+        """
+
+        self.flash_state = not self.flash_state
+        for index in self.flashing:
+            self._changed(index)
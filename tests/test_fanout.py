@@ -0,0 +1,140 @@
+# Server under the test
+from library.polling.fanout import FanoutServer
+# Readings and devices of the stands
+from library.polling.poller import Reading
+from library.polling.table import Device
+
+# Subscribers over the local TCP connection
+import socket
+# JSON lines of the server
+from json import loads
+# Waiting for the server thread
+from time import sleep, monotonic, time
+
+import pytest
+
+# Interval between the messages of the server, s
+INTERVAL = 0.05
+# Waiting for the expected state, s
+TIMEOUT = 5.0
+
+
+def wait_for(condition):
+    """
+    Waiting until the condition is true
+
+    Args:
+        :param condition: Checked condition
+        :type condition: callable
+
+    Returns:
+        :return: The condition became true before the timeout
+        :rtype: bool
+    """
+
+    deadline = monotonic() + TIMEOUT
+    while monotonic() < deadline:
+        if condition():
+            return True
+        sleep(0.01)
+    return condition()
+
+
+def reading(index, voltage=57.0):
+    return Reading(index, True, 0, (voltage,) * 3, (1.0,) * 3, 25.0, time())
+
+
+def connect(server, receive_buffer=None):
+    """
+    Connecting the subscriber to the server
+
+    Args:
+        :param server: Started server
+        :type server: FanoutServer
+        :param receive_buffer: Receive buffer of the subscriber, bytes, None - the default one
+        :type receive_buffer: int
+
+    Returns:
+        :return: Connection and its reader of the lines
+        :rtype: tuple
+    """
+
+    connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if receive_buffer is not None:
+        connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    connection.settimeout(TIMEOUT)
+    connection.connect(server.address[:2])
+    return connection, connection.makefile("rb")
+
+
+@pytest.fixture
+def devices():
+    return [Device(index, index + 1, "SIM{0}".format(index // 16 + 1), str(index % 16 + 1), "COM3")
+            for index in range(2000)]
+
+
+@pytest.fixture
+def server(devices):
+    server = FanoutServer(devices, port=0, interval=INTERVAL)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_snapshot_then_delta(server):
+    # The reading received before the subscriber connected is a part of its snapshot
+    server.publish(reading(0))
+    assert wait_for(lambda: 0 in server.latest)
+    connection, lines = connect(server)
+    snapshot = loads(lines.readline())
+    assert snapshot["type"] == "snapshot"
+    assert len(snapshot["seats"]) == 2000
+    assert snapshot["seats"][0] == {"stand": "SIM1", "place": "1", "address": "1"}
+    assert [x["address"] for x in snapshot["readings"]] == ["1"]
+
+    server.publish(reading(5, 58.0))
+    delta = loads(lines.readline())
+    assert delta["type"] == "delta"
+    assert [x["address"] for x in delta["readings"]] == ["6"]
+    assert delta["readings"][0]["voltage"] == [58.0, 58.0, 58.0]
+    connection.close()
+
+
+def test_stalled_subscriber_gets_one_snapshot(server, devices):
+    connection, lines = connect(server, receive_buffer=4096)
+    assert loads(lines.readline())["type"] == "snapshot"
+
+    # Every delta changes all seats and exceeds the buffers of the connection, the subscriber does not read
+    voltage = 50.0
+    for _ in range(20):
+        voltage += 0.1
+        for device in devices:
+            server.publish(reading(device.index, voltage))
+        sleep(INTERVAL)
+    subscriber = next(iter(server.subscribers.values()))
+    assert subscriber.stale
+
+    # The unsent delta is followed by the latest full state instead of the missed deltas
+    messages = list()
+    while not messages or messages[-1]["type"] != "snapshot":
+        messages.append(loads(lines.readline()))
+    assert len(messages) <= 2
+    assert all(x["type"] == "delta" for x in messages[:-1])
+    latest = messages[-1]["readings"]
+    assert len(latest) == len(devices)
+    assert all(x["voltage"] == [voltage] * 3 for x in latest)
+    assert wait_for(lambda: not subscriber.stale)
+    # Nothing of the missed deltas follows the snapshot
+    connection.settimeout(INTERVAL * 4)
+    with pytest.raises(socket.timeout):
+        lines.readline()
+    connection.close()
+
+
+def test_disconnected_subscriber_is_removed(server):
+    connection, lines = connect(server)
+    assert loads(lines.readline())["type"] == "snapshot"
+    assert len(server.subscribers) == 1
+    lines.close()
+    connection.close()
+    assert wait_for(lambda: not server.subscribers)
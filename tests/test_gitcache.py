@@ -0,0 +1,149 @@
+# Configuration stages under the test
+from library import config as sw_cfg
+from library.gitcache import cache_path, load_cached
+
+# Stand-in GitLab server
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from threading import Thread
+from urllib.parse import urlsplit, parse_qs, unquote
+from base64 import b64encode
+from json import dumps
+# Settings of the software
+from configparser import ConfigParser
+from glob import glob
+
+import pytest
+
+# Project of the configuration in the stand-in server
+PROJECT_ID = "52"
+# Configuration file of the project
+CONFIG_RAW = "[SIM1]\n1 = 1\n2 = 2\n"
+
+
+class StubGitLab(object):
+    """
+    Stand-in GitLab API: the latest commit of config.ini and the file of that commit
+    """
+
+    def __init__(self):
+        self.commit = "a" * 40
+        self.raw = CONFIG_RAW
+        # Requests (path, query) in the order of arrival
+        self.requests = list()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                stub.requests.append((unquote(url.path), parse_qs(url.query)))
+                prefix = "/api/v4/projects/{0}/repository/".format(PROJECT_ID)
+                path = unquote(url.path)
+                if path == prefix + "commits":
+                    self.reply([{"id": stub.commit, "short_id": stub.commit[:8], "title": "config"}])
+                elif path == prefix + "files/config.ini":
+                    self.reply({"file_name": "config.ini", "file_path": "config.ini", "ref": stub.commit,
+                                "blob_id": "b" * 40, "encoding": "base64",
+                                "content": b64encode(stub.raw.encode("utf-8")).decode("ascii")})
+                else:
+                    self.send_error(404)
+
+            def reply(self, data):
+                body = dumps(data).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:{0}".format(self.server.server_address[1])
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def paths(self, name):
+        return [query for path, query in self.requests if path.endswith("/repository/" + name)]
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    stub = StubGitLab()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def settings(stub, tmp_path, monkeypatch):
+    # The cache is written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    config = ConfigParser()
+    config.read_dict({"AUTH": {"GIT_SERVER": stub.url, "GIT_TOKEN": "token", "GIT_API_VERSION": "4",
+                               "PROJ_ID": PROJECT_ID, "GIT_TIMEOUT": "2"}})
+    for name in ("auth_config", "git_entry", "git_config", "git_offline"):
+        monkeypatch.setattr(sw_cfg, name, getattr(sw_cfg, name))
+    sw_cfg.auth_config = config
+    return config
+
+
+def test_unchanged_commit_is_not_downloaded(stub, settings):
+    sw_cfg.init_git()
+    assert len(stub.paths("commits")) == 1
+    assert len(stub.paths("files/config.ini")) == 1
+    assert not sw_cfg.git_offline
+    assert sw_cfg.git_config.sections() == ["SIM1"]
+    # The latest commit of the configuration file in the branch is requested by the query parameters
+    query = stub.paths("commits")[0]
+    assert query["path"] == ["config.ini"]
+    assert query["ref_name"] == ["master"]
+
+    # The second start requests the commit only
+    stub.requests.clear()
+    sw_cfg.init_git()
+    assert len(stub.paths("commits")) == 1
+    assert stub.paths("files/config.ini") == []
+    assert sw_cfg.git_entry["commit"] == stub.commit
+
+
+def test_new_commit_is_downloaded_once(stub, settings):
+    sw_cfg.init_git()
+    stub.commit = "c" * 40
+    stub.raw = CONFIG_RAW + "[SIM2]\n1 = 11\n"
+    stub.requests.clear()
+
+    sw_cfg.init_git()
+    assert len(stub.paths("commits")) == 1
+    assert [x["ref"] for x in stub.paths("files/config.ini")] == [["c" * 40]]
+    assert sw_cfg.git_config.sections() == ["SIM1", "SIM2"]
+    cached = load_cached(cache_path(stub.url, PROJECT_ID))
+    assert cached["commit"] == "c" * 40
+    assert cached["raw"] == stub.raw
+
+
+def test_stopped_server_starts_from_cache(stub, settings):
+    sw_cfg.init_git()
+    assert len(glob("cache/git/*.json")) == 1
+    stub.stop()
+
+    sw_cfg.git_entry = sw_cfg.git_config = None
+    sw_cfg.init_git()
+    assert sw_cfg.git_offline
+    assert sw_cfg.git_entry["commit"] == stub.commit
+    assert sw_cfg.git_config.sections() == ["SIM1"]
+
+    # The offline start does not request the server at all
+    sw_cfg.git_entry = sw_cfg.git_config = None
+    sw_cfg.init_git_cached()
+    assert sw_cfg.git_offline
+    assert sw_cfg.git_config.sections() == ["SIM1"]
+
+
+def test_stopped_server_without_cache_fails(stub, settings):
+    stub.stop()
+    with pytest.raises(Exception):
+        sw_cfg.init_git()
@@ -0,0 +1,87 @@
+# Comparison under the test
+from library.reload import diff_config
+
+# Configurations from the GitLab server
+from configparser import ConfigParser
+
+
+def config(stands):
+    """
+    Creating the configuration from the GitLab server
+
+    Args:
+        :param stands: Address of every seat of every stand {stand: {place: address}}
+        :type stands: dict
+
+    Returns:
+        :return: Configuration in the ConfigParser format
+        :rtype: ConfigParser
+    """
+
+    parsed = ConfigParser()
+    parsed.read_dict({stand: {place: "{0:x}".format(address) for place, address in seats.items()}
+                      for stand, seats in stands.items()})
+    return parsed
+
+
+SEATS = {"1": 0x10, "2": 0x11, "3": 0x12}
+OTHER = {"1": 0x20, "2": 0x21}
+
+
+def test_unchanged():
+    diff = diff_config(config({"A": SEATS}), config({"A": SEATS}))
+    assert diff == ({}, [], [], {})
+
+
+def test_rename_with_identical_seats():
+    diff = diff_config(config({"A": SEATS, "D": OTHER}), config({"B": SEATS, "D": OTHER}))
+    assert diff.renamed == {"A": "B"}
+    assert diff.added == []
+    assert diff.removed == []
+    assert diff.seats == {}
+
+
+def test_ambiguous_rename_is_not_guessed():
+    # Both added stands have the seats of the removed one
+    diff = diff_config(config({"A": SEATS}), config({"B": SEATS, "C": SEATS}))
+    assert diff.renamed == {}
+    assert diff.added == ["B", "C"]
+    assert diff.removed == ["A"]
+
+    # Both removed stands have the seats of the added one
+    diff = diff_config(config({"A": SEATS, "C": SEATS}), config({"B": SEATS}))
+    assert diff.renamed == {}
+    assert diff.added == ["B"]
+    assert diff.removed == ["A", "C"]
+
+
+def test_rename_next_to_ambiguous_one():
+    diff = diff_config(config({"A": SEATS, "D": OTHER}), config({"B": SEATS, "C": SEATS, "E": OTHER}))
+    assert diff.renamed == {"D": "E"}
+    assert diff.added == ["B", "C"]
+    assert diff.removed == ["A"]
+
+
+def test_added_and_removed_stands():
+    diff = diff_config(config({"A": SEATS}), config({"A": SEATS, "B": OTHER}))
+    assert diff == ({}, ["B"], [], {})
+    diff = diff_config(config({"A": SEATS, "B": OTHER}), config({"A": SEATS}))
+    assert diff == ({}, [], ["B"], {})
+
+
+def test_changed_seats():
+    new = dict(SEATS)
+    # Added seat, removed seat and changed address
+    new["4"] = 0x13
+    del new["1"]
+    new["2"] = 0x31
+    diff = diff_config(config({"A": SEATS}), config({"A": new}))
+    assert diff.renamed == {}
+    assert diff.seats == {"A": {"1": (0x10, None), "2": (0x11, 0x31), "4": (None, 0x13)}}
+
+
+def test_changed_seats_are_not_renamed():
+    # The stand with other seats under the new name is removed and added
+    new = dict(SEATS, **{"4": 0x13})
+    diff = diff_config(config({"A": SEATS}), config({"B": new}))
+    assert diff == ({}, ["B"], ["A"], {})
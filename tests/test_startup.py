@@ -0,0 +1,54 @@
+# Cached configuration of the GitLab server and the simulated stands
+from library.gitcache import cache_path, save_cached
+from library.bus.simulator import SimulatedBus
+
+# Running the software in a separate interpreter
+import os
+import sys
+import subprocess
+# Configuration of the started software
+from os.path import abspath, dirname, join
+from re import sub
+
+# Root of the repository
+ROOT = dirname(dirname(abspath(__file__)))
+# GitLab server that refuses the connection, the software starts with the cached configuration
+GIT_SERVER = "http://127.0.0.1:9/"
+# Running the software and reporting the loaded modules when it exits
+RUNNER = """
+import runpy, sys
+sys.path.insert(0, {root!r})
+sys.argv = [{script!r}, "--startup-check"]
+try:
+    runpy.run_path({script!r}, run_name="__main__")
+except SystemExit as error:
+    print("numpy loaded:", "numpy" in sys.modules, file=sys.stderr)
+    raise
+"""
+
+
+def test_startup_check(tmp_path):
+    # Software settings with the simulated bus and the unavailable GitLab server
+    with open(join(ROOT, "config.ini"), encoding="utf-8") as config_file:
+        config = config_file.read()
+    config = sub(r"(?m)^BACKEND = .*$", "BACKEND = sim", config)
+    config = sub(r"(?m)^GIT_SERVER = .*$", "GIT_SERVER = " + GIT_SERVER, config)
+    config = sub(r"(?m)^GIT_RELOAD = .*$", "GIT_RELOAD = 0", config)
+    with open(join(str(tmp_path), "config.ini"), "w", encoding="utf-8") as config_file:
+        config_file.write(config)
+    # Last known good configuration of the project
+    project_id = next(line.split("=", 1)[1].strip() for line in config.splitlines() if line.startswith("PROJ_ID"))
+    save_cached(join(str(tmp_path), cache_path(GIT_SERVER, project_id)),
+                {"project": project_id, "ref": "master", "commit": "0" * 40, "blob_id": "0" * 40,
+                 "raw": SimulatedBus.stand_config(2, 16)})
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    env.pop("CMRI_PROFILE", None)
+    runner = RUNNER.format(root=ROOT, script=join(ROOT, "CMRIChecker.py"))
+    result = subprocess.run([sys.executable, "-c", runner], cwd=str(tmp_path), env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, timeout=60)
+
+    # The startup completed within the budget, numpy is loaded at the first connection only
+    assert result.returncode == 0, result.stderr
+    assert "Startup profile" in result.stderr
+    assert "numpy loaded: False" in result.stderr, result.stderr
@@ -0,0 +1,74 @@
+# Log under the test
+from library.polling.telemetry import TelemetryWriter, RECORD, CSV_HEADER, open_log, export_csv
+# Readings and devices of the stands
+from library.polling.poller import Reading
+from library.polling.table import Device
+
+# Log files of the writer
+from os import listdir
+from os.path import join, basename
+# Distinct names of the rotated files
+from time import sleep
+# Values of the absent device
+from math import isnan
+
+
+def devices():
+    return [Device(index, index + 1, "SIM1", str(index + 1), "COM3") for index in range(16)]
+
+
+def test_records_round_trip(tmp_path):
+    writer = TelemetryWriter(devices(), directory=str(tmp_path))
+    readings = [Reading(0, True, 2, (57.5, 57.25, 57.0), (1.5, 1.25, 1.0), 25.5, 1500000000.125),
+                Reading(7, False, 0, None, None, None, 1500000001.5),
+                Reading(15, True, 0, (100.0,) * 3, (5.0,) * 3, -10.0, 1500000002.0)]
+    for reading in readings:
+        writer.publish(reading)
+    writer.flush()
+    writer._file.close()
+
+    # Every reading is one fixed-size record
+    assert RECORD.itemsize == 44
+    records = open_log(writer.path)
+    assert len(records) == 3
+    assert list(records["time"]) == [x.time for x in readings]
+    assert list(records["address"]) == [1, 8, 16]
+    assert list(records["status"]) == [2, -1, 0]
+    assert list(records["values"][0]) == [57.5, 57.25, 57.0, 1.5, 1.25, 1.0, 25.5]
+    assert all(isnan(x) for x in records["values"][1])
+    del records
+
+    csv_path = join(str(tmp_path), "log.csv")
+    assert export_csv(writer.path, csv_path) == 3
+    with open(csv_path, encoding="utf-8") as csv_file:
+        lines = csv_file.read().splitlines()
+    assert lines[0] == CSV_HEADER
+    assert lines[1] == "1500000000.125,1,2,57.5,57.25,57,1.5,1.25,1,25.5"
+    assert lines[2].startswith("1500000001.500,8,-1,nan,")
+    assert lines[3] == "1500000002.000,16,0,100,100,100,5,5,5,-10"
+
+
+def test_incomplete_record_is_not_mapped(tmp_path):
+    writer = TelemetryWriter(devices(), directory=str(tmp_path))
+    writer.publish(Reading(0, True, 0, (57.0,) * 3, (1.0,) * 3, 25.0, 1500000000.0))
+    writer.flush()
+    writer._file.write(b"\0" * 10)
+    writer._file.close()
+    assert len(open_log(writer.path)) == 1
+
+
+def test_oldest_files_are_removed(tmp_path):
+    # Every batch starts a new file
+    writer = TelemetryWriter(devices(), directory=str(tmp_path), max_age=0, max_files=2)
+    paths = list()
+    for index in range(4):
+        writer.publish(Reading(index, True, 0, (57.0,) * 3, (1.0,) * 3, 25.0, 1500000000.0 + index))
+        writer.flush()
+        paths.append(writer.path)
+        sleep(0.01)
+    writer._file.close()
+
+    assert len(set(paths)) == 4
+    # The two latest files are kept
+    assert sorted(listdir(str(tmp_path))) == sorted(basename(x) for x in paths[2:])
+    assert list(open_log(paths[-1])["address"]) == [4]